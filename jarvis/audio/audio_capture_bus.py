@@ -0,0 +1,102 @@
+import logging
+import threading
+import numpy as np
+import sounddevice as sd
+
+from jarvis.audio.audio_ring_buffer import AudioRingBuffer
+
+class AudioCaptureBus:
+    """
+    Dauerhaft geöffneter Mikrofon-Eingang für alle Audio-Konsumenten.
+
+    Ein einziger ``sd.InputStream`` schreibt jeden Block in einen gemeinsamen Ringpuffer
+    und verteilt ihn an die angemeldeten Abonnenten (z. B. Wake-Word-Erkennung). Die
+    Aufnahme liest anschließend direkt aus dem Ringpuffer ab einem beliebigen früheren
+    Sample-Index, sodass nach dem Wake-Word weder das Gerät neu geöffnet wird noch die
+    ersten Silben verloren gehen.
+    """
+
+    _shared = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, samplerate=16000, blocksize=512, buffer_seconds=60.0, device=None):
+        """
+        Args:
+            samplerate (int): Abtastrate des Eingangs.
+            blocksize (int): Samples pro Callback, standardmäßig die Frame-Länge von Porcupine.
+            buffer_seconds (float): Im Ringpuffer vorgehaltene Audiodauer; begrenzt Pre-Roll und Äußerungslänge.
+            device: Eingabegerät für sounddevice, standardmäßig das Systemgerät.
+        """
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.samplerate = samplerate
+        self.blocksize = blocksize
+        self.device = device
+        self.ring_buffer = AudioRingBuffer(int(samplerate * buffer_seconds))
+        self._subscribers = []
+        self._subscribers_lock = threading.Lock()
+        self._stream = None
+
+    @classmethod
+    def shared(cls):
+        """Gemeinsamer Eingang für Wake-Word-Erkennung und Spracherkennung."""
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls()
+            return cls._shared
+
+    @property
+    def written(self):
+        """Absoluter Sample-Index hinter dem zuletzt empfangenen Sample."""
+        return self.ring_buffer.written
+
+    def start(self):
+        """Öffnet den Eingang, falls er noch nicht läuft."""
+        if self._stream is not None:
+            return
+        self._stream = sd.InputStream(samplerate=self.samplerate, channels=1, dtype=np.int16,
+                                      blocksize=self.blocksize, device=self.device,
+                                      callback=self._audio_callback)
+        self._stream.start()
+        self.logger.info("🎙 Audio-Eingang geöffnet (%d Hz, %d Samples pro Block)", self.samplerate, self.blocksize)
+
+    def stop(self):
+        """Schließt den Eingang."""
+        if self._stream is None:
+            return
+        self._stream.stop()
+        self._stream.close()
+        self._stream = None
+        self.logger.info("🔇 Audio-Eingang geschlossen")
+
+    def subscribe(self, callback):
+        """
+        Meldet einen Abonnenten an, der jeden Block als ``callback(samples, end_index)`` erhält.
+
+        Der Aufruf erfolgt im Audio-Thread und muss daher kurz bleiben.
+        """
+        with self._subscribers_lock:
+            if callback not in self._subscribers:
+                self._subscribers = self._subscribers + [callback]
+
+    def unsubscribe(self, callback):
+        with self._subscribers_lock:
+            self._subscribers = [subscriber for subscriber in self._subscribers if subscriber is not callback]
+
+    def index_before(self, seconds):
+        """Sample-Index, der ``seconds`` vor dem aktuellen Schreibstand liegt (für Pre-Roll)."""
+        return max(0, self.written - int(seconds * self.samplerate))
+
+    def _audio_callback(self, indata, frames, time, status):
+        if status:
+            self.logger.debug("⚠️ Audio-Eingang: %s", status)
+
+        samples = indata[:, 0]
+        self.ring_buffer.write(samples)
+        end_index = self.ring_buffer.written
+
+        # Liste wird bei Änderungen ersetzt, daher ohne Lock lesbar
+        for subscriber in self._subscribers:
+            try:
+                subscriber(samples, end_index)
+            except Exception as e:
+                self.logger.error("❌ Fehler in Audio-Abonnent: %s", e)
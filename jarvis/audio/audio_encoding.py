@@ -0,0 +1,21 @@
+import wave
+from io import BytesIO
+
+def encode_wav(samples, samplerate, channels=1):
+    """Kodiert int16-Samples im Speicher als WAV, ohne die Samples vorher zu kopieren."""
+    wav_io = BytesIO()
+    with wave.open(wav_io, "wb") as wf:
+        wf.setnchannels(channels)
+        wf.setsampwidth(2)
+        wf.setframerate(samplerate)
+        wf.writeframes(memoryview(samples).cast("B"))
+    return wav_io.getvalue()
+
+def compress_audio(samples, samplerate, audio_format, channels=1):
+    """Komprimiert int16-Samples im Speicher (z. B. "mp3", "ogg", "flac"); benötigt FFmpeg."""
+    from pydub import AudioSegment
+
+    segment = AudioSegment(data=samples.tobytes(), sample_width=2, frame_rate=samplerate, channels=channels)
+    compressed_io = BytesIO()
+    segment.export(compressed_io, format=audio_format)
+    return compressed_io.getvalue()
@@ -0,0 +1,216 @@
+from time import perf_counter
+import logging
+import threading
+from collections import deque
+import numpy as np
+import sounddevice as sd
+
+class PcmSource:
+    """
+    Eine Audioquelle im Mixer, z. B. ein gesprochener Satz oder ein Soundeffekt.
+
+    Der Erzeuger hängt Samples mit ``write`` an und schließt mit ``finish`` ab; der
+    Audio-Callback liest sie blockweise. ``done`` wird gesetzt, sobald die Quelle
+    vollständig abgespielt oder abgebrochen wurde. ``first_audio_at`` hält den
+    ``time.perf_counter()``-Zeitpunkt fest, zu dem ihre ersten Samples hörbar werden.
+    """
+
+    def __init__(self, bus, prebuffer_samples=0):
+        self.bus = bus
+        self.prebuffer_samples = prebuffer_samples
+        self.done = threading.Event()
+        self.first_audio_at = None
+        self._chunks = deque()
+        self._offset = 0
+        self._available = 0
+        self._started = False
+        self._finished = False
+        self._cancelled = False
+        self._lock = threading.Lock()
+
+    def write(self, samples):
+        """Hängt int16-Samples (Array oder PCM-Bytes) an."""
+        if isinstance(samples, (bytes, bytearray, memoryview)):
+            samples = np.frombuffer(samples, dtype=np.int16)
+        if len(samples) == 0:
+            return
+        with self._lock:
+            self._chunks.append(samples)
+            self._available += len(samples)
+
+    def finish(self):
+        """Markiert das Ende der Daten; die Quelle endet, sobald alles abgespielt ist."""
+        with self._lock:
+            self._finished = True
+            if self._available == 0:
+                self.done.set()
+
+    def cancel(self):
+        """Bricht die Quelle ab; sie verstummt mit dem nächsten Audio-Block."""
+        with self._lock:
+            self._cancelled = True
+            self._chunks.clear()
+            self._available = 0
+        self.done.set()
+
+    def wait(self, timeout=None):
+        return self.done.wait(timeout)
+
+    @property
+    def active(self):
+        return not self.done.is_set()
+
+    def read_into(self, out, gain):
+        """
+        Mischt bis zu ``len(out)`` Samples in ``out`` und gibt deren Anzahl zurück.
+        Wird nur aus dem Audio-Callback aufgerufen.
+        """
+        with self._lock:
+            if self._cancelled:
+                return 0
+            if not self._started:
+                # Erst abspielen, wenn der Vorpuffer gefüllt oder der Text vollständig ist
+                if self._available < self.prebuffer_samples and not self._finished:
+                    return 0
+                self._started = True
+
+            position = 0
+            while position < len(out) and self._chunks:
+                chunk = self._chunks[0]
+                count = min(len(out) - position, len(chunk) - self._offset)
+                out[position:position + count] += chunk[self._offset:self._offset + count] * (gain / 32768.0)
+                position += count
+                self._offset += count
+                self._available -= count
+                if self._offset >= len(chunk):
+                    self._chunks.popleft()
+                    self._offset = 0
+
+            if self._finished and self._available == 0:
+                self.done.set()
+            return position
+
+
+class AudioOutputEngine:
+    """
+    Gemeinsame, callback-gesteuerte Audioausgabe für Sprache und Soundeffekte.
+
+    Ein einziger ``sd.OutputStream`` mischt in jedem Block alle aktiven Quellen. Sprache
+    wird leiser geregelt (Ducking), solange ein Effekt läuft, und ``flush`` lässt alle
+    ausstehende Sprache innerhalb eines Audio-Blocks verstummen. Es gibt weder Polling
+    noch eine globale Sperre zwischen den Abspielern.
+    """
+
+    SPEECH = "speech"
+    CUE = "cue"
+
+    _shared = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, samplerate=24000, blocksize=480, duck_gain=0.35, duck_ramp_seconds=0.05, device=None):
+        """
+        Args:
+            samplerate (int): Ausgaberate; Quellen müssen in dieser Rate vorliegen.
+            blocksize (int): Samples pro Callback, bestimmt die Reaktionszeit von ``flush`` (480 = 20 ms).
+            duck_gain (float): Lautstärke der Sprache, während ein Effekt läuft.
+            duck_ramp_seconds (float): Übergangszeit beim Absenken und Anheben der Sprache.
+            device: Ausgabegerät für sounddevice, standardmäßig das Systemgerät.
+        """
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.samplerate = samplerate
+        self.blocksize = blocksize
+        self.duck_gain = duck_gain
+        self.device = device
+        self._duck_step = blocksize / max(1.0, duck_ramp_seconds * samplerate) * (1.0 - duck_gain)
+        self._speech_gain = 1.0
+        self._sources = []
+        self._sources_lock = threading.Lock()
+        self._stream = None
+        self._stream_lock = threading.Lock()
+        self._output_latency = 0.0
+
+    @classmethod
+    def shared(cls):
+        """Gemeinsame Ausgabe für VoiceGenerator und SoundPlayer."""
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls()
+            return cls._shared
+
+    def start(self):
+        """Öffnet die Ausgabe, falls sie noch nicht läuft."""
+        with self._stream_lock:
+            if self._stream is not None:
+                return
+            self._stream = sd.OutputStream(samplerate=self.samplerate, channels=1, dtype=np.float32,
+                                           blocksize=self.blocksize, device=self.device,
+                                           callback=self._audio_callback)
+            self._stream.start()
+            self._output_latency = float(self._stream.latency or 0.0)
+            self.logger.info("🔊 Audio-Ausgabe geöffnet (%d Hz, %d Samples pro Block)", self.samplerate, self.blocksize)
+
+    def stop(self):
+        """Schließt die Ausgabe und bricht alle Quellen ab."""
+        self.flush()
+        with self._stream_lock:
+            if self._stream is None:
+                return
+            self._stream.stop()
+            self._stream.close()
+            self._stream = None
+
+    def open_source(self, bus=SPEECH, prebuffer_seconds=0.0):
+        """Legt eine Quelle an, in die während der Wiedergabe weiter geschrieben werden kann."""
+        source = PcmSource(bus, int(prebuffer_seconds * self.samplerate))
+        with self._sources_lock:
+            self._sources = self._sources + [source]
+        self.start()
+        return source
+
+    def play(self, samples, bus=CUE):
+        """Spielt vollständig vorliegende int16-Samples ab und kehrt sofort zurück."""
+        source = self.open_source(bus)
+        source.write(samples)
+        source.finish()
+        return source
+
+    def flush(self, bus=None):
+        """Bricht alle Quellen (bzw. die eines Busses) ab; sie verstummen mit dem nächsten Block."""
+        with self._sources_lock:
+            cancelled = [source for source in self._sources if bus is None or source.bus == bus]
+            self._sources = [source for source in self._sources if source not in cancelled]
+        for source in cancelled:
+            source.cancel()
+
+    def is_busy(self, bus=None):
+        return any(source.active for source in self._sources if bus is None or source.bus == bus)
+
+    def _audio_callback(self, outdata, frames, time, status):
+        if status:
+            self.logger.debug("⚠️ Audio-Ausgabe: %s", status)
+
+        mix = np.zeros(frames, dtype=np.float32)
+        # Liste wird bei Änderungen ersetzt, daher ohne Sperre lesbar
+        sources = self._sources
+
+        ducking = any(source.bus == self.CUE and source.active for source in sources)
+        target_gain = self.duck_gain if ducking else 1.0
+        if self._speech_gain > target_gain:
+            self._speech_gain = max(target_gain, self._speech_gain - self._duck_step)
+        elif self._speech_gain < target_gain:
+            self._speech_gain = min(target_gain, self._speech_gain + self._duck_step)
+
+        finished = False
+        for source in sources:
+            gain = self._speech_gain if source.bus == self.SPEECH else 1.0
+            if source.read_into(mix, gain) and source.first_audio_at is None:
+                # Nur ein Zeitstempel; ausgewertet wird er vom Erzeuger der Quelle
+                source.first_audio_at = perf_counter() + self._output_latency
+            finished = finished or not source.active
+
+        np.clip(mix, -1.0, 1.0, out=mix)
+        outdata[:, 0] = mix
+
+        if finished:
+            with self._sources_lock:
+                self._sources = [source for source in self._sources if source.active]
@@ -0,0 +1,64 @@
+import threading
+import numpy as np
+
+class AudioRingBuffer:
+    """
+    Vorab allokierter Ringpuffer für Mono-Samples.
+
+    Geschrieben wird aus dem Audio-Callback, gelesen über absolute Sample-Indizes
+    (Anzahl seit dem letzten reset geschriebener Samples). Leser warten blockierend
+    auf neue Daten, statt die Queue zu pollen.
+    """
+
+    def __init__(self, capacity, dtype=np.int16):
+        self.capacity = int(capacity)
+        self._buffer = np.zeros(self.capacity, dtype=dtype)
+        self._written = 0
+        self._condition = threading.Condition()
+
+    @property
+    def written(self):
+        """Absoluter Index hinter dem zuletzt geschriebenen Sample."""
+        return self._written
+
+    def reset(self):
+        with self._condition:
+            self._written = 0
+
+    def write(self, samples):
+        """Kopiert Samples in den Puffer; bei Überlauf werden die ältesten überschrieben."""
+        total = len(samples)
+        if total == 0:
+            return
+        # Von einem übergroßen Block passt nur das Ende in den Puffer, gezählt wird aber alles
+        samples = samples[-self.capacity:]
+        count = len(samples)
+
+        with self._condition:
+            position = (self._written + total - count) % self.capacity
+            first_part = min(count, self.capacity - position)
+            self._buffer[position:position + first_part] = samples[:first_part]
+            if first_part < count:
+                self._buffer[:count - first_part] = samples[first_part:]
+            self._written += total
+            self._condition.notify_all()
+
+    def wait_for(self, index, timeout=None):
+        """Wartet, bis mindestens ``index`` Samples geschrieben wurden, und liefert den aktuellen Schreibindex."""
+        with self._condition:
+            self._condition.wait_for(lambda: self._written >= index, timeout)
+            return self._written
+
+    def read(self, start, end):
+        """Liefert eine Kopie der Samples im Bereich [start, end); bereits überschriebene Samples fehlen."""
+        with self._condition:
+            start = max(start, self._written - self.capacity, 0)
+            end = min(end, self._written)
+            if end <= start:
+                return self._buffer[:0].copy()
+
+            first = start % self.capacity
+            last = first + (end - start)
+            if last <= self.capacity:
+                return self._buffer[first:last].copy()
+            return np.concatenate((self._buffer[first:], self._buffer[:last - self.capacity]))
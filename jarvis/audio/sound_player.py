@@ -1,46 +1,66 @@
 import threading
-import pygame
 import os
+import numpy as np
 from pydub import AudioSegment
-from io import BytesIO
 
-# Umstellen auf 
+from jarvis.audio.audio_output_engine import AudioOutputEngine
 
 class SoundPlayer:
-    """Verwaltet das Abspielen des Wake-Word-Sounds in einem separaten Thread."""
-    
-    def __init__(self, file_path):
-        self.base_path = os.path.dirname(__file__)
-        self._setup_pygame()
-        self._audio_lock = threading.Lock()
-        
-        full_path = os.path.join(self.base_path, file_path)
-        self.sound = AudioSegment.from_file(full_path)
+    """
+    Spielt kurze Soundeffekte (z. B. den Wake-Word-Sound) mit minimaler Latenz ab.
 
-    def _setup_pygame(self):
-        pygame.mixer.init()
+    Die Dateien werden einmalig in das Format der gemeinsamen Audioausgabe dekodiert und
+    als Samples vorgehalten. Abgespielt wird als Effekt-Quelle im Mixer, die laufende
+    Sprache wird dabei abgesenkt statt unterbrochen – ohne Kodierung oder Thread pro Aufruf.
+    """
 
-    def _play_audio_thread(self):
-        with self._audio_lock:
-            try:
-                audio_io = BytesIO()
-                self.sound.export(audio_io, format="wav")
-                audio_io.seek(0)
+    def __init__(self, file_path=None, name="default", output_engine=None):
+        """
+        Args:
+            file_path (str, optional): Sound, der unter ``name`` registriert wird (relativ zu diesem Modul).
+            name (str): Name des Sounds für ``play``.
+            output_engine (AudioOutputEngine, optional): Gemeinsame Audioausgabe, standardmäßig ``AudioOutputEngine.shared()``.
+        """
+        self.base_path = os.path.dirname(__file__)
+        self.output_engine = output_engine or AudioOutputEngine.shared()
+        self._lock = threading.Lock()
+        self._sounds = {}
+        self._playing = {}
 
-                pygame.mixer.music.load(audio_io)
-                pygame.mixer.music.play()
+        if file_path:
+            self.register(name, file_path)
 
-                while pygame.mixer.music.get_busy():
-                    pygame.time.wait(100)
+    def register(self, name, file_path):
+        """Dekodiert eine Audiodatei einmalig und registriert sie unter ``name``."""
+        full_path = os.path.join(self.base_path, file_path)
+        segment = (AudioSegment.from_file(full_path)
+                   .set_frame_rate(self.output_engine.samplerate)
+                   .set_channels(1)
+                   .set_sample_width(2))
+        samples = np.frombuffer(segment.raw_data, dtype=np.int16)
+        with self._lock:
+            self._sounds[name] = samples
 
+    def play(self, name="default"):
+        """Startet den Sound sofort und kehrt ohne Warten zurück; derselbe Sound wird dabei neu gestartet."""
+        with self._lock:
+            samples = self._sounds.get(name)
+            if samples is None:
+                print(f"❌ Unbekannter Sound: {name}")
+                return
+            previous = self._playing.get(name)
+            if previous:
+                previous.cancel()
+            try:
+                self._playing[name] = self.output_engine.play(samples, AudioOutputEngine.CUE)
             except Exception as e:
                 print(f"❌ Playback error: {e}")
-            finally:
-                pygame.mixer.music.stop()
-                audio_io.close()
 
     def play_audio(self):
-        threading.Thread(
-            target=self._play_audio_thread,
-            daemon=True
-        ).start()
\ No newline at end of file
+        self.play()
+
+    def stop(self):
+        with self._lock:
+            for source in self._playing.values():
+                source.cancel()
+            self._playing.clear()
@@ -0,0 +1,114 @@
+import os
+import time
+import sqlite3
+import hashlib
+import tempfile
+import threading
+
+
+class TTSAudioCache:
+    """
+    Inhaltsadressierter Cache für synthetisierte Sprache.
+
+    Die Audiodaten liegen als rohes PCM in einzelnen Dateien, ein SQLite-Index merkt sich
+    Größe, Erstellungs- und letzten Zugriffszeitpunkt. Verdrängt wird nach Alter und,
+    sobald die Gesamtgröße überschritten ist, nach längster Nichtbenutzung (LRU).
+    """
+
+    def __init__(self, cache_dir, max_bytes=200 * 1024 * 1024, max_age_seconds=30 * 24 * 3600):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.max_age_seconds = max_age_seconds
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(os.path.join(self.cache_dir, "index.sqlite3"), check_same_thread=False)
+        self._connection.execute(
+            """CREATE TABLE IF NOT EXISTS entries (
+                key TEXT PRIMARY KEY,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                last_used REAL NOT NULL
+            )"""
+        )
+        self._connection.commit()
+        self._evict()
+
+    @staticmethod
+    def make_key(model, voice, text):
+        return hashlib.sha256(f"{model}\0{voice}\0{text}".encode("utf-8")).hexdigest()
+
+    def get(self, key):
+        """Liefert die PCM-Daten zum Schlüssel oder None."""
+        with self._lock:
+            row = self._connection.execute("SELECT created_at FROM entries WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+
+            if time.time() - row[0] > self.max_age_seconds:
+                self._remove(key)
+                self._connection.commit()
+                return None
+
+            try:
+                with open(self._path(key), "rb") as f:
+                    data = f.read()
+            except OSError:
+                self._remove(key)
+                self._connection.commit()
+                return None
+
+            self._connection.execute("UPDATE entries SET last_used = ? WHERE key = ?", (time.time(), key))
+            self._connection.commit()
+            return data
+
+    def put(self, key, pcm_data):
+        """Speichert PCM-Daten und verdrängt bei Bedarf alte Einträge."""
+        if not pcm_data:
+            return
+
+        # Eigene temporäre Datei je Schreibvorgang, damit parallele put-Aufrufe sich nicht vermischen
+        with tempfile.NamedTemporaryFile(dir=self.cache_dir, prefix=f"{key}.", suffix=".tmp", delete=False) as f:
+            tmp_path = f.name
+            f.write(pcm_data)
+        try:
+            os.replace(tmp_path, self._path(key))
+        except OSError:
+            os.remove(tmp_path)
+            raise
+
+        now = time.time()
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO entries (key, size, created_at, last_used) VALUES (?, ?, ?, ?)",
+                (key, len(pcm_data), now, now)
+            )
+            self._evict()
+            self._connection.commit()
+
+    def _evict(self):
+        expired = self._connection.execute(
+            "SELECT key FROM entries WHERE created_at < ?", (time.time() - self.max_age_seconds,)
+        ).fetchall()
+        for (key,) in expired:
+            self._remove(key)
+
+        total_size = self._connection.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if total_size > self.max_bytes:
+            for key, size in self._connection.execute("SELECT key, size FROM entries ORDER BY last_used").fetchall():
+                if total_size <= self.max_bytes:
+                    break
+                self._remove(key)
+                total_size -= size
+
+        self._connection.commit()
+
+    def _remove(self, key):
+        self._connection.execute("DELETE FROM entries WHERE key = ?", (key,))
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.pcm")
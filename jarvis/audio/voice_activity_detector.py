@@ -0,0 +1,127 @@
+from collections import deque
+import numpy as np
+
+class EnergyVAD:
+    """
+    Energiebasierte Sprachaktivitätserkennung mit adaptivem Rauschpegel und Nachlaufzeit.
+
+    Die Samples werden in Frames zerlegt, deren RMS-Pegel vektorisiert berechnet wird.
+    Ein Frame gilt als Sprache, wenn sein Pegel über der festen Schwelle und deutlich
+    über dem gleitend geschätzten Rauschpegel liegt. Der Rauschpegel startet unterhalb der
+    festen Schwelle, damit Sprache ab dem ersten Frame nicht als Rauschen gilt, und wird in
+    Pausen nachgeführt; bleibt selbst der leiseste Frame der letzten Sekunden deutlich darüber,
+    wird er auf dieses Minimum angehoben (laute Umgebung). Sprache beginnt nach einigen
+    aufeinanderfolgenden Sprach-Frames und endet erst, wenn die Nachlaufzeit (Hangover)
+    ohne Sprache verstrichen ist.
+    """
+
+    def __init__(self, samplerate=16000, frame_ms=20, threshold_db=-45.0, noise_margin_db=10.0,
+                 speech_start_ms=80, hangover_ms=1500, noise_adaptation=0.05, noise_window_ms=2000):
+        """
+        Args:
+            samplerate (int): Abtastrate der Samples.
+            frame_ms (int): Länge eines Analyse-Frames.
+            threshold_db (float): Absolute Mindestlautstärke für Sprache in dBFS.
+            noise_margin_db (float): Abstand zum geschätzten Rauschpegel, ab dem ein Frame als Sprache zählt.
+            speech_start_ms (int): Dauer durchgehender Sprache, bevor der Sprachbeginn gemeldet wird.
+            hangover_ms (int): Stille nach dem letzten Sprach-Frame, bis das Sprachende gemeldet wird.
+            noise_adaptation (float): Anpassungsrate des Rauschpegels (0..1) in Sprachpausen.
+            noise_window_ms (int): Zeitfenster, dessen leisester Frame den Rauschpegel nach oben korrigiert.
+        """
+        self.frame_length = int(samplerate * frame_ms / 1000)
+        self.threshold_db = threshold_db
+        self.noise_margin_db = noise_margin_db
+        self.speech_start_frames = max(1, speech_start_ms // frame_ms)
+        self.hangover_frames = max(1, hangover_ms // frame_ms)
+        self.noise_adaptation = noise_adaptation
+        self.noise_window_frames = max(1, noise_window_ms // frame_ms)
+        self.reset()
+
+    def reset(self):
+        self._remainder = np.zeros(0, dtype=np.int16)
+        self._processed = 0
+        self._noise_floor_db = self.threshold_db - self.noise_margin_db
+        self._recent_levels = deque(maxlen=self.noise_window_frames)
+        self._speech_run = 0
+        self._silence_run = 0
+        self.in_speech = False
+        self.speech_start = None
+        self.speech_end = None
+        self._last_speech_frame_end = None
+
+    def calibrate(self, samples, percentile=20):
+        """
+        Schätzt den Rauschpegel aus bereits vorliegendem Audio, z. B. der Zeit vor dem Wake-Word.
+
+        Ohne Kalibrierung startet der Rauschpegel knapp unter der festen Schwelle und passt
+        sich in lauter Umgebung erst nach ``noise_window_ms`` an. Ein niedriges Perzentil
+        ignoriert Sprachanteile.
+        """
+        frame_count = len(samples) // self.frame_length
+        if frame_count == 0:
+            return
+        frames = samples[:frame_count * self.frame_length].reshape(frame_count, self.frame_length)
+        self._noise_floor_db = float(np.percentile(self.frame_levels_db(frames), percentile))
+
+    def process(self, samples):
+        """
+        Verarbeitet neue Samples. Danach geben ``speech_start`` und ``speech_end`` die
+        absoluten Sample-Indizes von Sprachbeginn bzw. -ende an (oder None).
+        """
+        if len(self._remainder):
+            samples = np.concatenate((self._remainder, samples))
+
+        frame_count = len(samples) // self.frame_length
+        self._remainder = samples[frame_count * self.frame_length:].copy()
+        if frame_count == 0:
+            return
+
+        frames = samples[:frame_count * self.frame_length].reshape(frame_count, self.frame_length)
+        levels_db = self.frame_levels_db(frames)
+
+        for offset, level_db in enumerate(levels_db):
+            frame_end = self._processed + (offset + 1) * self.frame_length
+            self._process_frame(level_db, frame_end)
+
+        self._processed += frame_count * self.frame_length
+
+    @staticmethod
+    def frame_levels_db(frames):
+        """RMS-Pegel je Frame in dBFS (vektorisiert)."""
+        normalized = frames.astype(np.float32) / 32768.0
+        rms = np.sqrt(np.mean(normalized * normalized, axis=1))
+        return 20.0 * np.log10(rms + 1e-10)
+
+    def _process_frame(self, level_db, frame_end):
+        self._recent_levels.append(level_db)
+        if len(self._recent_levels) == self.noise_window_frames:
+            # Minimum-Statistik: Sprache hat Pausen, dauerhaftes Rauschen nicht
+            window_min = min(self._recent_levels)
+            if window_min > self._noise_floor_db + self.noise_margin_db:
+                self._noise_floor_db = window_min
+                if self.in_speech and self.speech_end is None:
+                    # Die vermeintliche Sprache war das Umgebungsrauschen
+                    self.in_speech = False
+                    self.speech_start = None
+                    self._speech_run = 0
+
+        threshold = max(self.threshold_db, self._noise_floor_db + self.noise_margin_db)
+        is_speech = level_db > threshold
+
+        if is_speech:
+            self._speech_run += 1
+            self._silence_run = 0
+            self._last_speech_frame_end = frame_end
+            if not self.in_speech and self._speech_run >= self.speech_start_frames:
+                self.in_speech = True
+                if self.speech_start is None:
+                    self.speech_start = frame_end - self._speech_run * self.frame_length
+                self.speech_end = None
+        else:
+            self._speech_run = 0
+            self._silence_run += 1
+            # Rauschpegel nur in Pausen nachführen, damit Sprache ihn nicht anhebt
+            self._noise_floor_db += self.noise_adaptation * (level_db - self._noise_floor_db)
+            if self.in_speech and self._silence_run >= self.hangover_frames:
+                self.in_speech = False
+                self.speech_end = self._last_speech_frame_end
@@ -0,0 +1,153 @@
+import asyncio
+import logging
+from typing import List, Optional
+
+import tiktoken
+from langchain.schema import AIMessage, BaseMessage, HumanMessage, SystemMessage
+
+class ConversationMemory:
+    """
+    Gesprächsverlauf mit festem Token-Budget.
+
+    Die jüngsten Runden bleiben wörtlich erhalten. Überschreiten sie das Budget, werden die
+    ältesten Runden schrittweise in eine laufende Zusammenfassung eingearbeitet (bzw. ohne
+    Zusammenfassungsmodell verworfen). Abgerufener Kontext gehört nur in die jeweilige
+    Anfrage und wird hier nie gespeichert.
+    """
+
+    SUMMARY_PROMPT = (
+        "Fasse das bisherige Gespräch zwischen Nutzer und Jarvis knapp zusammen. "
+        "Behalte Fakten, Namen, Entscheidungen und offene Fragen, lasse Füllwörter weg. "
+        "Höchstens {max_words} Wörter.\n\n"
+        "Bisherige Zusammenfassung:\n{summary}\n\n"
+        "Neue Gesprächsteile:\n{turns}"
+    )
+
+    def __init__(self, system_prompt: str, max_tokens: int = 3000, min_recent_turns: int = 2,
+                 summarizer=None, summary_max_words: int = 150, model_name: str = "gpt-4o-mini"):
+        """
+        Args:
+            system_prompt (str): Fester Systemprompt, der jeder Anfrage vorangestellt wird.
+            max_tokens (int): Budget für Zusammenfassung und wörtlich behaltene Runden.
+            min_recent_turns (int): Runden, die unabhängig vom Budget wörtlich bleiben.
+            summarizer (BaseChatModel, optional): Modell für die Zusammenfassung; ohne Modell werden alte Runden verworfen.
+            summary_max_words (int): Zielumfang der Zusammenfassung.
+            model_name (str): Modell, dessen Tokenizer für die Zählung genutzt wird.
+        """
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.system_prompt = system_prompt
+        self.max_tokens = max_tokens
+        self.min_recent_turns = min_recent_turns
+        self.summarizer = summarizer
+        self.summary_max_words = summary_max_words
+        self.summary = ""
+        self.turns: List[List[BaseMessage]] = []
+        self._compacting = False
+
+        try:
+            self._encoding = tiktoken.encoding_for_model(model_name)
+        except KeyError:
+            self._encoding = tiktoken.get_encoding("cl100k_base")
+
+    def count_tokens(self, text: str) -> int:
+        return len(self._encoding.encode(text))
+
+    def add_turn(self, question: str, answer: str):
+        """Speichert eine abgeschlossene Runde, ohne abgerufenen Kontext."""
+        self.turns.append([HumanMessage(content=question), AIMessage(content=answer)])
+
+    def has_history(self) -> bool:
+        return bool(self.turns or self.summary)
+
+    def messages(self, context: Optional[str] = None) -> List[BaseMessage]:
+        """
+        Nachrichten für die nächste Anfrage: Systemprompt, Zusammenfassung und jüngste Runden.
+
+        Args:
+            context (str, optional): Abgerufener Kontext, der nur in diese Anfrage eingeht.
+        """
+        system_content = self.system_prompt
+        if self.summary:
+            system_content += f"\n\nZusammenfassung des bisherigen Gesprächs:\n{self.summary}"
+
+        messages: List[BaseMessage] = [SystemMessage(content=system_content)]
+        for turn in self.turns:
+            messages.extend(turn)
+
+        if context:
+            messages.append(SystemMessage(
+                content=f"Nutze folgende Kontextinformationen, um die Anfrage zu beantworten:\n\n{context}\n\n"
+                        "Falls die Informationen relevant sind, beziehe sie in deine Antwort ein. "
+                        "Wenn nicht, antworte basierend auf deinem allgemeinen Wissen."
+            ))
+        return messages
+
+    def token_count(self) -> int:
+        """Tokens von Zusammenfassung und gespeicherten Runden."""
+        return self.count_tokens(self.summary) + sum(self._turn_tokens(turn) for turn in self.turns)
+
+    def compact(self):
+        """Bringt den Verlauf synchron unter das Budget."""
+        evicted = self._select_evicted_turns()
+        if not evicted:
+            return
+        summary = self.summary
+        if self.summarizer:
+            summary = self.summarizer.invoke(self._summary_prompt(evicted)).content.strip()
+        self._apply(evicted, summary)
+
+    async def acompact(self):
+        """
+        Wie ``compact``, aber ohne den Event-Loop zu blockieren. Kann nach einer Antwort im
+        Hintergrund laufen; bis die Zusammenfassung fertig ist, bleiben die Runden erhalten.
+        """
+        if self._compacting:
+            return
+        evicted = self._select_evicted_turns()
+        if not evicted:
+            return
+
+        self._compacting = True
+        try:
+            summary = self.summary
+            if self.summarizer:
+                response = await self.summarizer.ainvoke(self._summary_prompt(evicted))
+                summary = response.content.strip()
+            self._apply(evicted, summary)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            # Lieber verwerfen als das Budget dauerhaft zu überschreiten
+            self.logger.error("❌ Zusammenfassung fehlgeschlagen, alte Runden werden verworfen: %s", e)
+            self._apply(evicted, self.summary)
+        finally:
+            self._compacting = False
+
+    def clear(self):
+        self.summary = ""
+        self.turns = []
+
+    def _select_evicted_turns(self) -> List[List[BaseMessage]]:
+        total = self.token_count()
+        evicted = []
+        for turn in self.turns[:max(0, len(self.turns) - self.min_recent_turns)]:
+            if total <= self.max_tokens:
+                break
+            evicted.append(turn)
+            total -= self._turn_tokens(turn)
+        return evicted
+
+    def _apply(self, evicted, summary):
+        self.turns = [turn for turn in self.turns if not any(turn is old for old in evicted)]
+        self.summary = summary
+        self.logger.info("🧠 %d alte Runde(n) zusammengefasst, Verlauf: %d Tokens", len(evicted), self.token_count())
+
+    def _summary_prompt(self, evicted) -> str:
+        turns = "\n".join(
+            f"{'Nutzer' if isinstance(message, HumanMessage) else 'Jarvis'}: {message.content}"
+            for turn in evicted for message in turn
+        )
+        return self.SUMMARY_PROMPT.format(max_words=self.summary_max_words, summary=self.summary or "-", turns=turns)
+
+    def _turn_tokens(self, turn) -> int:
+        return sum(self.count_tokens(message.content) for message in turn)
@@ -1,21 +1,33 @@
 import os
 import asyncio
+from dataclasses import dataclass, field
+from typing import AsyncIterator, List
 
 from dotenv import load_dotenv
-from langchain_openai import ChatOpenAI, OpenAIEmbeddings
+from langchain_openai import ChatOpenAI
 from langchain_chroma import Chroma
-from langchain.schema import SystemMessage, HumanMessage, AIMessage
-from langchain.chains.conversational_retrieval.base import ConversationalRetrievalChain
+from langchain_core.documents import Document
+from langchain_core.messages import HumanMessage, SystemMessage
 
 from experiments.rag.notion.notion_vector_db_updater import NotionVectorDBUpdater
+from jarvis.core.conversation_memory import ConversationMemory
+from rag.embedding_cache import create_cached_embeddings
+
+@dataclass
+class AssistantStreamEvent:
+    """Ereignis aus ``JarvisAssistant.astream_query``: die Quelldokumente oder ein Antwort-Token."""
+    type: str
+    content: str = ""
+    documents: List[Document] = field(default_factory=list)
 
 class JarvisAssistant:
-    def __init__(self, model_name: str = "gpt-4o-mini"):
+    def __init__(self, model_name: str = "gpt-4o-mini", history_max_tokens: int = 3000):
         """
         Initialisiert den Jarvis-Assistenten mit Vektor-DB und Chat-Modell.
         
         Args:
             model_name (str): Name des zu verwendenden Chat-Modells.
+            history_max_tokens (int): Token-Budget des Gesprächsverlaufs.
         """
         # Lade Umgebungsvariablen
         load_dotenv()
@@ -24,7 +36,7 @@ class JarvisAssistant:
         self.chat_model = ChatOpenAI(model=model_name)
 
         # Initialisiere Embeddings und Vektor-Datenbank
-        self.embeddings = OpenAIEmbeddings(model="text-embedding-3-small")
+        self.embeddings = create_cached_embeddings(model="text-embedding-3-small")
         
         # Pfad zur Chroma-Datenbank
         current_dir = os.path.dirname(os.path.abspath(__file__))
@@ -43,20 +55,15 @@ class JarvisAssistant:
         # Konfiguriere Retriever
         self.retriever = self.vectordb.as_retriever()
 
-        # Initialisiere Konversations-Retrieval-Kette
-        self.conversation_chain = ConversationalRetrievalChain.from_llm(
-            llm=self.chat_model,
-            retriever=self.retriever,
-            return_source_documents=True
+        # Chat-Verlauf mit Token-Budget; ältere Runden werden zusammengefasst
+        self.memory = ConversationMemory(
+            system_prompt="Du bist ein hilfreicher KI-Assistent namens Jarvis. "
+                          "Nutze verfügbare Kontextinformationen, um präzise und intelligent zu antworten.",
+            max_tokens=history_max_tokens,
+            summarizer=self.chat_model,
+            model_name=model_name
         )
-
-        # Chat-Verlauf
-        self.chat_history = [
-            SystemMessage(
-                content="Du bist ein hilfreicher KI-Assistent namens Jarvis. "
-                "Nutze verfügbare Kontextinformationen, um präzise und intelligent zu antworten."
-            )
-        ]
+        self._compaction_task = None
 
         # Initialisiere Notion Vector DB Updater
         self.notion_updater = NotionVectorDBUpdater()
@@ -66,6 +73,31 @@ class JarvisAssistant:
         update_task = asyncio.create_task(self.notion_updater.start_scheduled_updates())
         return update_task
 
+    async def acondense_question(self, query: str) -> str:
+        """
+        Formuliert Folgefragen („Und wann war das?“) für die Suche als eigenständige Frage um.
+        Ohne bisherigen Verlauf ist die Frage bereits eigenständig und es entfällt der LLM-Aufruf.
+        """
+        if not self.memory.has_history():
+            return query
+
+        messages = self.memory.messages()
+        messages.append(SystemMessage(
+            content="Formuliere die folgende Nachfrage des Nutzers als eigenständige Suchanfrage, "
+                    "die ohne den Gesprächsverlauf verständlich ist. Antworte nur mit der Frage."
+        ))
+        messages.append(HumanMessage(content=query))
+        response = await self.chat_model.ainvoke(messages)
+        return response.content.strip() or query
+
+    async def aretrieve_documents(self, query: str) -> List[Document]:
+        """Holt die relevanten Dokumente, ohne den Event-Loop zu blockieren."""
+        return await self.retriever.ainvoke(query)
+
+    @staticmethod
+    def format_context(docs: List[Document]) -> str:
+        return "\n\n---\n\n".join([doc.page_content for doc in docs])
+
     def retrieve_context(self, query: str) -> str:
         """
         Hole relevante Kontextinformationen für eine Anfrage.
@@ -77,11 +109,10 @@ class JarvisAssistant:
             str: Kontextinformationen
         """
         # Hole relevante Dokumente
-        docs = self.retriever.get_relevant_documents(query)
+        docs = self.retriever.invoke(query)
         
         # Formatiere Kontext
-        context = "\n\n---\n\n".join([doc.page_content for doc in docs])
-        return context
+        return self.format_context(docs)
 
     async def process_query(self, query: str) -> str:
         """
@@ -93,29 +124,49 @@ class JarvisAssistant:
         Returns:
             str: KI-Antwort
         """
-        # Hole Kontext
-        context = self.retrieve_context(query)
-        
-        # Erweitere Systemprompt mit Kontext
-        system_message = SystemMessage(
-            content=f"Nutze folgende Kontextinformationen, um die Anfrage zu beantworten:\n\n{context}\n\n"
-                    "Falls die Informationen relevant sind, beziehe sie in deine Antwort ein. "
-                    "Wenn nicht, antworte basierend auf deinem allgemeinen Wissen."
-        )
-        
-        # Aktualisiere Chat-Verlauf
-        self.chat_history.append(system_message)
-        self.chat_history.append(HumanMessage(content=query))
+        # Genau eine Suche pro Runde; Verlauf und Kontext pflegt astream_query
+        answer_parts = []
+        async for event in self.astream_query(query):
+            if event.type == "token":
+                answer_parts.append(event.content)
         
-        # Generiere Antwort
-        response = await asyncio.to_thread(
-            self.conversation_chain.invoke, 
-            {"question": query, "chat_history": self.chat_history}
-        )
-        
-        answer = response['answer']
-        
-        # Aktualisiere Chat-Verlauf
-        self.chat_history.append(AIMessage(content=answer))
-        
-        return answer
\ No newline at end of file
+        return "".join(answer_parts)
+
+    async def astream_query(self, query: str) -> AsyncIterator[AssistantStreamEvent]:
+        """
+        Beantwortet eine Anfrage als Stream.
+
+        Zuerst wird ein ``sources``-Ereignis mit den abgerufenen Dokumenten geliefert, danach
+        je ein ``token``-Ereignis pro Antwortstück, sodass die Sprachausgabe schon mit dem
+        ersten Satz beginnen kann. Die Ereignisse haben ein ``content``-Attribut und lassen
+        sich daher direkt an ``TextToSpeechStreamer.aprocess_stream`` übergeben.
+
+        Wird der Generator geschlossen oder der Task abgebrochen (Barge-in), endet auch die
+        Anfrage an das Modell; der bis dahin erzeugte Teil der Antwort bleibt im Verlauf.
+        """
+        search_query = await self.acondense_question(query)
+        docs = await self.aretrieve_documents(search_query)
+        yield AssistantStreamEvent(type="sources", documents=docs)
+
+        messages = self.memory.messages(context=self.format_context(docs))
+        messages.append(HumanMessage(content=query))
+
+        answer_parts = []
+        completed = False
+        stream = self.chat_model.astream(messages)
+        try:
+            async for chunk in stream:
+                if chunk.content:
+                    answer_parts.append(chunk.content)
+                    yield AssistantStreamEvent(type="token", content=chunk.content)
+            completed = True
+        finally:
+            await stream.aclose()
+            answer = "".join(answer_parts)
+            if answer:
+                self.memory.add_turn(query, answer if completed else answer + " …")
+                self._schedule_compaction()
+
+    def _schedule_compaction(self):
+        if self._compaction_task is None or self._compaction_task.done():
+            self._compaction_task = asyncio.create_task(self.memory.acompact())
\ No newline at end of file
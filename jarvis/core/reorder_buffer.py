@@ -0,0 +1,38 @@
+import queue
+import threading
+
+class ReorderBuffer:
+    """Gibt Elemente strikt in Sequenzreihenfolge heraus, unabhängig davon, in welcher Reihenfolge sie eintreffen."""
+
+    def __init__(self):
+        self._items = {}
+        self._next_seq = 0
+        self._condition = threading.Condition()
+
+    def put(self, seq, item):
+        """Legt das Element zur Sequenznummer ab. Bereits belegte oder übersprungene Nummern werden ignoriert."""
+        with self._condition:
+            if seq < self._next_seq or seq in self._items:
+                return
+            self._items[seq] = item
+            self._condition.notify_all()
+
+    def get(self, timeout=None):
+        """Liefert das nächste Element in Reihenfolge oder wirft queue.Empty nach Ablauf des Timeouts."""
+        with self._condition:
+            if not self._condition.wait_for(lambda: self._next_seq in self._items, timeout):
+                raise queue.Empty
+            item = self._items.pop(self._next_seq)
+            self._next_seq += 1
+            return item
+
+    def skip_to(self, seq):
+        """Verwirft alle Elemente vor der Sequenznummer."""
+        with self._condition:
+            self._next_seq = max(self._next_seq, seq)
+            self._items = {key: item for key, item in self._items.items() if key >= self._next_seq}
+            self._condition.notify_all()
+
+    @property
+    def next_seq(self):
+        return self._next_seq
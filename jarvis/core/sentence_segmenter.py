@@ -0,0 +1,143 @@
+import re
+from typing import List
+
+class SentenceSegmenter:
+    """
+    Zerlegt einen Token-Stream inkrementell in sprechbare Einheiten an Satzgrenzen.
+
+    Kurze Sätze werden bis zur Mindestlänge zusammengefasst, überlange Passagen an
+    Kommas bzw. Leerzeichen getrennt. Abkürzungen (z. B., usw., e.g., Dr.) und
+    Ordinalzahlen bzw. Aufzählungen ("3. März", "1. Punkt") beenden keinen Satz.
+    """
+
+    ABBREVIATIONS = {
+        # Deutsch
+        "z.b.", "d.h.", "u.a.", "o.ä.", "u.ä.", "usw.", "bzw.", "ca.", "etc.", "vgl.", "inkl.", "exkl.",
+        "ggf.", "evtl.", "bspw.", "sog.", "nr.", "str.", "tel.", "abs.", "abb.", "bzgl.", "zzgl.", "max.",
+        "min.", "mio.", "mrd.", "jh.", "dr.", "prof.", "hr.", "fr.", "st.",
+        # Englisch
+        "e.g.", "i.e.", "vs.", "mr.", "mrs.", "ms.", "jr.", "sr.", "approx.", "no.", "fig.", "dept.",
+        "jan.", "feb.", "mar.", "apr.", "jun.", "jul.", "aug.", "sep.", "sept.", "oct.", "nov.", "dec.",
+    }
+
+    # Satzende nur, wenn danach bereits Leerraum angekommen ist; Absätze sind immer Grenzen
+    _BOUNDARY = re.compile(r"\n\s*\n|[.!?…]+[\"'»«“”)\]]*(?=\s)")
+    _BOUNDARY_HINT = re.compile(r"[\s.!?…]")
+    _SOFT_BREAK = re.compile(r"[,;:–—]\s")
+    _LAST_TOKEN = re.compile(r"(\S+)$")
+
+    def __init__(self, min_chars: int = 40, max_chars: int = 250, first_min_chars: int = 15):
+        """
+        Args:
+            min_chars (int): Mindestlänge einer Einheit; kürzere Sätze werden mit dem nächsten zusammengefasst.
+            max_chars (int): Maximale Länge, ab der auch ohne Satzende getrennt wird.
+            first_min_chars (int): Mindestlänge der ersten Einheit, damit die Sprachausgabe früh beginnt.
+        """
+        self.min_chars = min_chars
+        self.max_chars = max_chars
+        self.first_min_chars = first_min_chars
+        self._parts: List[str] = []
+        self._pending_length = 0
+        self._scan_pos = 0
+        self._short_sentence_end = None
+        self._emitted = 0
+
+    def feed(self, text: str) -> List[str]:
+        """Nimmt neuen Text entgegen und liefert alle Einheiten, die jetzt vollständig sind."""
+        if not text:
+            return []
+
+        self._parts.append(text)
+        self._pending_length += len(text)
+
+        # Ohne Satzzeichen oder Leerraum kann keine neue Grenze entstanden sein
+        if not self._BOUNDARY_HINT.search(text) and self._pending_length <= self.max_chars:
+            return []
+
+        return self._extract_segments()
+
+    def flush(self) -> List[str]:
+        """Liefert den verbleibenden Rest als letzte Einheit."""
+        remaining = "".join(self._parts).strip()
+        self._parts = []
+        self._pending_length = 0
+        self._scan_pos = 0
+        self._short_sentence_end = None
+        if not remaining:
+            return []
+        self._emitted += 1
+        return [remaining]
+
+    def _extract_segments(self) -> List[str]:
+        buffer = "".join(self._parts)
+        segments = []
+        start = 0
+        # Letztes Satzende, das nur wegen der Mindestlänge nicht getrennt wurde
+        short_sentence_end = self._short_sentence_end
+
+        for match in self._BOUNDARY.finditer(buffer, self._scan_pos):
+            is_paragraph = match.group().strip() == ""
+            if not is_paragraph and not self._is_sentence_end(buffer, start, match):
+                continue
+
+            candidate = buffer[start:match.end()].strip()
+            if not candidate:
+                start = match.end()
+                continue
+            if not is_paragraph and len(candidate) < self._current_min_chars():
+                short_sentence_end = match.end() - start
+                continue
+
+            segments.append(candidate)
+            self._emitted += 1
+            start = match.end()
+            short_sentence_end = None
+
+        remaining = buffer[start:]
+        while len(remaining) > self.max_chars:
+            cut = short_sentence_end or self._find_forced_cut(remaining)
+            short_sentence_end = None
+            segments.append(remaining[:cut].strip())
+            self._emitted += 1
+            remaining = remaining[cut:]
+
+        self._parts = [remaining] if remaining else []
+        self._pending_length = len(remaining)
+        self._short_sentence_end = short_sentence_end
+        # Ein Satzzeichen am Ende wird erneut geprüft, sobald der nächste Token da ist
+        self._scan_pos = max(0, len(remaining) - 4)
+        return [segment for segment in segments if segment]
+
+    def _current_min_chars(self) -> int:
+        return self.first_min_chars if self._emitted == 0 else self.min_chars
+
+    def _is_sentence_end(self, buffer: str, start: int, match: re.Match) -> bool:
+        if not match.group().startswith("."):
+            return True
+
+        token_match = self._LAST_TOKEN.search(buffer, start, match.start())
+        if not token_match:
+            return True
+
+        token = token_match.group(1).lstrip("(\"'»«“„")
+        if f"{token.lower()}." in self.ABBREVIATIONS:
+            return False
+        # Initialen und Einzelbuchstaben ("z. B.", "J. R. R.")
+        if len(token) == 1 and token.isalpha():
+            return False
+        # Ordinalzahlen und Aufzählungen ("am 3. März", "1. Punkt")
+        if token.isdigit() and len(token) <= 2:
+            return False
+        return True
+
+    def _find_forced_cut(self, text: str) -> int:
+        window = text[:self.max_chars]
+
+        soft_breaks = list(self._SOFT_BREAK.finditer(window))
+        if soft_breaks and soft_breaks[-1].end() > self.min_chars:
+            return soft_breaks[-1].end()
+
+        last_space = window.rfind(" ")
+        if last_space > self.min_chars:
+            return last_space + 1
+        return self.max_chars
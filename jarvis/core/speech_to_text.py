@@ -1,78 +1,233 @@
-import queue
-import wave
 import os
 import time
+from contextlib import nullcontext
+from collections import deque
 import sounddevice as sd
 import numpy as np
 from openai import OpenAI
 from dotenv import load_dotenv
 
+from jarvis.audio.audio_encoding import compress_audio, encode_wav
+from jarvis.audio.audio_ring_buffer import AudioRingBuffer
+from jarvis.audio.voice_activity_detector import EnergyVAD
+from jarvis.core.speech_to_text.incremental_transcriber import IncrementalTranscriber
+from jarvis.core.speech_to_text.openai_transcription_backend import OpenAITranscriptionBackend
+
 class SpeechToText:
-    def __init__(self, samplerate=16000):
-        """Initialisiert die OpenAI Whisper API-Anbindung"""
+    def __init__(self, samplerate=16000, max_duration=30.0, preroll_seconds=0.3, speech_start_timeout=5.0,
+                 silence_duration=1.5, min_speech_duration=0.3, backend=None, compression_format=None, language="de",
+                 capture_bus=None, calibration_seconds=1.0, wakeword_seconds=1.0):
+        """
+        Initialisiert die OpenAI Whisper API-Anbindung und die Aufnahme
+
+        Args:
+            samplerate (int): Abtastrate der Aufnahme.
+            max_duration (float): Maximale Länge einer Äußerung in Sekunden.
+            preroll_seconds (float): Audio vor dem erkannten Sprachbeginn, das mit aufgenommen wird.
+            speech_start_timeout (float): Wartezeit auf Sprache, bevor die Aufnahme ohne Ergebnis endet.
+            silence_duration (float): Stille, nach der das Sprachende erkannt wird.
+            min_speech_duration (float): Kürzere Äußerungen werden verworfen.
+            backend (TranscriptionBackend, optional): Transkriptions-Backend, standardmäßig OpenAI Whisper.
+            compression_format (str, optional): Audio vor dem Upload komprimieren (z. B. "mp3", "ogg"), sonst WAV.
+            language (str, optional): Sprache der Aufnahme für die Transkription.
+            capture_bus (AudioCaptureBus, optional): Gemeinsamer, dauerhaft geöffneter Audio-Eingang.
+                Ohne Bus wird für jede Aufnahme ein eigener Stream geöffnet.
+            calibration_seconds (float): Nur mit Capture-Bus: Audio vor der Aufnahme, aus dem der Rauschpegel geschätzt wird.
+            wakeword_seconds (float): Nur mit Capture-Bus: Audio vor ``start_index``, das noch das Wake-Word enthält
+                und daher nicht in die Kalibrierung eingeht.
+        """
         self.openai = OpenAI()
         self.set_open_ai_key()
+        self.backend = backend or OpenAITranscriptionBackend(self.openai)
+        self.compression_format = compression_format
+        self.language = language
+        self.last_speech_end_time = None
+        self.last_utterance_start = None
+        self.transcription_latencies = deque(maxlen=100)
         self.samplerate = samplerate
-        self.audio_queue = queue.Queue()
+        self.max_duration = max_duration
+        self.preroll_seconds = preroll_seconds
+        self.speech_start_timeout = speech_start_timeout
+        self.min_speech_duration = min_speech_duration
+        self.calibration_seconds = calibration_seconds
+        self.wakeword_seconds = wakeword_seconds
         self.is_recording = False
 
+        self.capture_bus = capture_bus
+        if capture_bus:
+            self.samplerate = capture_bus.samplerate
+            self.ring_buffer = capture_bus.ring_buffer
+        else:
+            capacity = int(samplerate * (max_duration + preroll_seconds + speech_start_timeout))
+            self.ring_buffer = AudioRingBuffer(capacity)
+        self._utterance_base = 0
+        self.vad = EnergyVAD(samplerate=self.samplerate, hangover_ms=int(silence_duration * 1000))
+
     def audio_callback(self, indata, frames, time, status):
-        """Fügt Audiodaten zum Queue hinzu"""
+        """Schreibt Audiodaten ohne Allokation in den Ringpuffer"""
         if self.is_recording:
-            self.audio_queue.put(indata.copy())
+            self.ring_buffer.write(indata[:, 0])
 
-    def record_audio(self, filename="./temp/recorded_audio.mp3", silence_threshold=0.1, silence_duration=1.5):
+    def record_audio(self, filename="./temp/recorded_audio.mp3"):
         """Nimmt Sprache auf und speichert sie als WAV-Datei."""
         os.makedirs(os.path.dirname(filename), exist_ok=True)
-        
+
+        audio_data = self.record_utterance()
+        if audio_data is None:
+            return None
+
+        with open(filename, "wb") as f:
+            f.write(encode_wav(audio_data, self.samplerate))
+
+        return filename
+
+    def record_utterance(self, incremental=None, start_index=None):
+        """
+        Nimmt eine Äußerung auf, bis die Sprachaktivitätserkennung das Sprachende meldet.
+
+        Args:
+            incremental (IncrementalTranscriber, optional): Transkribiert schon während der Aufnahme mit.
+            start_index (int, optional): Nur mit Capture-Bus: Sample-Index, ab dem ausgewertet wird,
+                z. B. ``WakeWordListener.last_detection_index``. Standardmäßig der aktuelle Stand
+                abzüglich ``preroll_seconds``.
+
+        Returns:
+            np.ndarray: Samples ab kurz vor dem Sprachbeginn bis zum Sprachende oder None, falls nicht gesprochen wurde.
+        """
+        if self.capture_bus:
+            self.capture_bus.start()
+            base = start_index if start_index is not None else self.capture_bus.index_before(self.preroll_seconds)
+            # Nicht weiter zurück als der Ringpuffer noch vorhält
+            base = max(base, self.ring_buffer.written - self.ring_buffer.capacity)
+        else:
+            self.ring_buffer.reset()
+            base = 0
+
+        self.vad.reset()
+        if self.capture_bus:
+            # Kalibrieren auf Umgebungsgeräusch vor dem Wake-Word, nicht auf das Wake-Word selbst
+            calibration_end = base - int(self.wakeword_seconds * self.samplerate) if start_index is not None else base
+            calibration_start = calibration_end - int(self.calibration_seconds * self.samplerate)
+            self.vad.calibrate(self.ring_buffer.read(calibration_start, calibration_end))
+        self.last_speech_end_time = None
+        self._utterance_base = base
+        processed = base
+        max_samples = int(self.samplerate * self.max_duration)
+        start_deadline = time.monotonic() + self.speech_start_timeout
+
         self.is_recording = True
-        buffer = []
-        start_time = time.time()
         print("🎙 Aufnahme gestartet...")
+        if incremental:
+            incremental.start(self.ring_buffer, self._absolute_speech_start)
 
-        with sd.InputStream(samplerate=self.samplerate, channels=1,
-                            dtype=np.int16,
-                            blocksize=int(self.samplerate * 0.1),  # 100ms Blocks
-                            callback=self.audio_callback):
-            while True:
-                if not self.audio_queue.empty():
-                    current_audio = self.audio_queue.get()
-                    buffer.append(current_audio)
-                        
-                    # Nur die letzten 0.5 Sekunden analysieren
-                    window_size = int(self.samplerate * 0.5)  # halbe Sekunde
-                    recent_samples = np.concatenate(buffer[-5:]) if len(buffer) > 5 else np.concatenate(buffer)
-                    if len(recent_samples) > window_size:
-                        recent_samples = recent_samples[-window_size:]
-                        
-                    volume = np.max(np.abs(recent_samples)) / 32767.0
-
-                    if volume < silence_threshold:
-                        if time.time() - start_time > silence_duration:
-                            print("⏸ Stille erkannt, Aufnahme stoppt.")
-                            break
-                    else:
-                        start_time = time.time()
+        try:
+            with self._input_stream():
+                while True:
+                    # Blockierend auf neue Samples warten statt die Queue zu pollen
+                    available = self.ring_buffer.wait_for(processed + 1, timeout=0.5)
+                    if available > processed:
+                        self.vad.process(self.ring_buffer.read(processed, available))
+                        processed = available
 
+                    if self.vad.speech_end is not None:
+                        self.last_speech_end_time = time.perf_counter()
+                        print("⏸ Stille erkannt, Aufnahme stoppt.")
+                        break
+                    if self.vad.speech_start is None and time.monotonic() > start_deadline:
+                        print("⏸ Keine Sprache erkannt, Aufnahme stoppt.")
+                        break
+                    if self.vad.speech_start is not None and processed - self._absolute_speech_start() >= max_samples:
+                        self.last_speech_end_time = time.perf_counter()
+                        print("⏸ Maximale Aufnahmedauer erreicht.")
+                        break
+        finally:
+            self.is_recording = False
+            if incremental:
+                incremental.stop()
+        return self._extract_utterance(processed)
 
-        self.is_recording = False
+    def _input_stream(self):
+        if self.capture_bus:
+            return nullcontext()
+        return sd.InputStream(samplerate=self.samplerate, channels=1,
+                              dtype=np.int16,
+                              blocksize=int(self.samplerate * 0.02),  # 20ms Blocks
+                              callback=self.audio_callback)
 
-        if len(buffer) < 20:
+    def _absolute_speech_start(self):
+        # Die VAD zählt ab Aufnahmebeginn, der Ringpuffer des Capture-Bus ab Programmstart
+        if self.vad.speech_start is None:
             return None
+        return self._utterance_base + self.vad.speech_start
 
-        audio_data = np.concatenate(buffer, axis=0)
-        
-        with wave.open(filename, "wb") as wf:
-            wf.setnchannels(1)
-            wf.setsampwidth(2)
-            wf.setframerate(self.samplerate)
-            wf.writeframes(audio_data.tobytes())
+    def listen_and_transcribe(self, on_partial=None, start_index=None):
+        """
+        Nimmt eine Äußerung auf und transkribiert sie.
+
+        Args:
+            on_partial (callable, optional): Erhält schon während des Sprechens Zwischentranskripte,
+                z. B. um die LLM-Anfrage oder die Suche vorzubereiten. Nach dem Sprachende muss dann
+                nur noch das letzte Audiofenster transkribiert werden.
+            start_index (int, optional): Siehe ``record_utterance``.
+
+        Returns:
+            str: Erkannter Text oder None, falls nicht gesprochen wurde.
+        """
+        if on_partial is None:
+            audio_data = self.record_utterance(start_index=start_index)
+            if audio_data is None:
+                return None
+            return self.transcribe(audio_data)
+
+        incremental = IncrementalTranscriber(self.backend, self.samplerate, self.language, on_partial=on_partial)
+        audio_data = self.record_utterance(incremental, start_index)
+        if audio_data is None:
+            return None
+
+        text = incremental.finalize(audio_data, self.last_utterance_start)
+        self._record_latency(time.perf_counter())
+        return text
+
+    def transcribe(self, audio_data):
+        """Kodiert die Samples im Speicher, überträgt sie an das Backend und misst die Latenz ab Sprachende."""
+        encode_start = time.perf_counter()
+        if self.compression_format:
+            audio_bytes = compress_audio(audio_data, self.samplerate, self.compression_format)
+            file_name = f"utterance.{self.compression_format}"
+        else:
+            audio_bytes = encode_wav(audio_data, self.samplerate)
+            file_name = "utterance.wav"
+        encode_seconds = time.perf_counter() - encode_start
+
+        text = self.backend.transcribe(audio_bytes, file_name, self.language)
+
+        self._record_latency(encode_start, f" (Kodierung {encode_seconds * 1000:.0f} ms, {len(audio_bytes) / 1024:.0f} KB)")
+        return text
+
+    def _record_latency(self, fallback_reference, details=""):
+        latency = time.perf_counter() - (self.last_speech_end_time or fallback_reference)
+        self.transcription_latencies.append(latency)
+        print(f"⏱️ Sprachende bis Transkript: {latency * 1000:.0f} ms{details}")
+
+    def _extract_utterance(self, processed):
+        if self.vad.speech_start is None:
+            return None
+
+        speech_start = self._absolute_speech_start()
+        speech_end = self._utterance_base + self.vad.speech_end if self.vad.speech_end is not None else processed
+        if speech_end - speech_start < self.samplerate * self.min_speech_duration:
+            return None
+
+        # Der Vorlauf reicht nie vor den Aufnahmebeginn, also z. B. nicht zurück ins Wake-Word
+        start = max(self._utterance_base, speech_start - int(self.samplerate * self.preroll_seconds))
+        self.last_utterance_start = start
+        # Kurzen Ausklang behalten, damit das letzte Wort nicht abgeschnitten wird
+        end = min(processed, speech_end + int(self.samplerate * 0.2))
+        return self.ring_buffer.read(start, end)
 
-        return filename
-        
     def set_open_ai_key(self):
-        load_dotenv()  
-        
+        load_dotenv()
+
         self.open_ai_key = os.getenv("OPENAI_API_KEY")
         if not self.open_ai_key:
-            raise ValueError("❌ Kein OpenAI API Key gefunden!")
\ No newline at end of file
+            raise ValueError("❌ Kein OpenAI API Key gefunden!")
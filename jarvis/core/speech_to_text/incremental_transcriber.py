@@ -0,0 +1,176 @@
+import re
+import threading
+from typing import Callable, List, Optional
+
+from jarvis.audio.audio_encoding import encode_wav
+from jarvis.core.speech_to_text.transcription_backend import TranscriptionBackend
+
+class IncrementalTranscriber:
+    """
+    Transkribiert eine laufende Aufnahme fortlaufend in überlappenden Fenstern.
+
+    Während gesprochen wird, schickt ein Hintergrund-Thread nach jedem ``step_seconds`` neuen
+    Audio das aktuelle Fenster an das Backend und meldet eine zusammengesetzte Zwischenhypothese.
+    Wird ein Fenster zu lang, wird sein stabiler Teil festgeschrieben und das nächste Fenster
+    beginnt mit etwas Überlappung; doppelte Wörter im Überlappungsbereich werden beim
+    Zusammensetzen entfernt. Nach dem Sprachende wird nur noch das letzte Fenster transkribiert.
+    """
+
+    def __init__(self, backend: TranscriptionBackend, samplerate: int, language: Optional[str] = None,
+                 on_partial: Optional[Callable[[str], None]] = None, step_seconds: float = 1.0,
+                 window_seconds: float = 8.0, overlap_seconds: float = 1.5, unstable_tail_words: int = 2,
+                 join_timeout: float = 2.0):
+        """
+        Args:
+            on_partial (callable, optional): Erhält jede neue Zwischenhypothese als Text.
+            step_seconds (float): Neues Audio, nach dem das Fenster erneut transkribiert wird.
+            window_seconds (float): Fensterlänge, ab der der stabile Teil festgeschrieben wird.
+            overlap_seconds (float): Überlappung zum nächsten Fenster; muss die ``unstable_tail_words`` abdecken.
+            unstable_tail_words (int): Wörter am Fensterende, die erst im nächsten Fenster festgeschrieben werden.
+            join_timeout (float): Maximale Wartezeit in Sekunden auf das Ende des Hintergrund-Threads.
+        """
+        self.backend = backend
+        self.samplerate = samplerate
+        self.language = language
+        self.on_partial = on_partial
+        self.step_samples = int(step_seconds * samplerate)
+        self.window_samples = int(window_seconds * samplerate)
+        self.overlap_samples = int(overlap_seconds * samplerate)
+        self.unstable_tail_words = unstable_tail_words
+        self.join_timeout = join_timeout
+
+        self._committed: List[str] = []
+        self._window_start: Optional[int] = None
+        self._window_advanced = False
+        self._last_end: Optional[int] = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self, ring_buffer, speech_start: Callable[[], Optional[int]]):
+        """Startet die Zwischentranskription für den Ringpuffer; ``speech_start`` liefert den Sprachbeginn."""
+        self.stop()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, args=(ring_buffer, speech_start), daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """
+        Beendet die Zwischentranskription und wartet höchstens ``join_timeout`` Sekunden auf den
+        Hintergrund-Thread. Ergebnisse einer danach noch laufenden Anfrage werden verworfen.
+        """
+        self._stop.set()
+        thread = self._thread
+        if thread is None or thread is threading.current_thread():
+            return
+        thread.join(self.join_timeout)
+        if thread.is_alive():
+            print(f"⚠️ Zwischentranskription nach {self.join_timeout:.1f} s noch aktiv, Ergebnis wird verworfen")
+        else:
+            self._thread = None
+
+    def finalize(self, audio_data, audio_start: int) -> str:
+        """
+        Liefert das endgültige Transkript der Äußerung.
+
+        Args:
+            audio_data (np.ndarray): Die gesamte aufgenommene Äußerung.
+            audio_start (int): Absoluter Sample-Index des ersten Samples von ``audio_data``.
+        """
+        self.stop()
+        with self._lock:
+            # Solange nichts festgeschrieben wurde, wird die ganze Äußerung samt Vorlauf transkribiert
+            window_start = self._window_start if self._window_advanced else audio_start
+            committed = list(self._committed)
+
+        offset = max(0, window_start - audio_start)
+        text = self._transcribe(audio_data[offset:])
+        return " ".join(self.stitch(committed, self._split_words(text)))
+
+    def _run(self, ring_buffer, speech_start):
+        while not self._stop.is_set():
+            start = speech_start()
+            if start is None:
+                ring_buffer.wait_for(ring_buffer.written + self.step_samples, timeout=0.2)
+                continue
+
+            with self._lock:
+                if self._window_start is None:
+                    self._window_start = start
+                window_start = self._window_start
+                target = (self._last_end or start) + self.step_samples
+
+            available = ring_buffer.wait_for(target, timeout=0.2)
+            if self._stop.is_set() or available < target:
+                continue
+
+            try:
+                text = self._transcribe(ring_buffer.read(window_start, available))
+            except Exception as e:
+                print(f"❌ Fehler bei der Zwischentranskription: {e}")
+                with self._lock:
+                    self._last_end = available
+                continue
+
+            with self._lock:
+                if self._stop.is_set():
+                    return
+                partial = self._update(self._split_words(text), available)
+
+            if self.on_partial:
+                self.on_partial(partial)
+
+    def _update(self, words: List[str], window_end: int) -> str:
+        self._last_end = window_end
+        partial = " ".join(self.stitch(self._committed, words))
+
+        if window_end - self._window_start >= self.window_samples:
+            # Stabilen Teil festschreiben, das Ende wird im nächsten Fenster erneut gehört
+            stable = words[:-self.unstable_tail_words] if self.unstable_tail_words else words
+            self._committed = self.stitch(self._committed, stable)
+            self._window_start = window_end - self.overlap_samples
+            self._window_advanced = True
+
+        return partial
+
+    def _transcribe(self, audio_data) -> str:
+        if len(audio_data) == 0:
+            return ""
+        return self.backend.transcribe(encode_wav(audio_data, self.samplerate), "partial.wav", self.language)
+
+    @staticmethod
+    def _split_words(text: str) -> List[str]:
+        return text.split()
+
+    @staticmethod
+    def _normalize(word: str) -> str:
+        return re.sub(r"[^\w]", "", word.lower())
+
+    @classmethod
+    def stitch(cls, committed: List[str], words: List[str], max_overlap: int = 12) -> List[str]:
+        """
+        Hängt eine neue Hypothese an den festgeschriebenen Text an und entfernt die Wörter,
+        die wegen der Fensterüberlappung doppelt erkannt wurden.
+        """
+        if not committed:
+            return list(words)
+        if not words:
+            return list(committed)
+
+        normalized_committed = [cls._normalize(word) for word in committed]
+        normalized_words = [cls._normalize(word) for word in words]
+        tail_start = max(0, len(committed) - max_overlap)
+
+        # Längste Übereinstimmung zwischen Ende des festen Texts und Anfang der Hypothese
+        for start in range(tail_start, len(committed)):
+            overlap = len(committed) - start
+            if normalized_committed[start:] == normalized_words[:overlap]:
+                return committed + words[overlap:]
+
+        # Sonst an zwei übereinstimmenden Wörtern verankern und das Ende durch die neue Hypothese ersetzen
+        if len(words) >= 2:
+            for start in range(tail_start, len(committed) - 1):
+                if normalized_committed[start:start + 2] == normalized_words[:2]:
+                    return committed[:start] + words
+
+        return committed + words
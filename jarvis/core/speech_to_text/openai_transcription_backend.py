@@ -0,0 +1,20 @@
+from typing import Optional
+from openai import OpenAI
+
+from jarvis.core.speech_to_text.transcription_backend import TranscriptionBackend
+
+class OpenAITranscriptionBackend(TranscriptionBackend):
+    """Transkribiert Audio über die OpenAI Whisper API."""
+
+    def __init__(self, client: Optional[OpenAI] = None, model: str = "whisper-1"):
+        self.client = client or OpenAI()
+        self.model = model
+
+    def transcribe(self, audio_bytes: bytes, file_name: str, language: Optional[str] = None) -> str:
+        kwargs = {"language": language} if language else {}
+        result = self.client.audio.transcriptions.create(
+            model=self.model,
+            file=(file_name, audio_bytes),
+            **kwargs
+        )
+        return result.text.strip()
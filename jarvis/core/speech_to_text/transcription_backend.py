@@ -0,0 +1,10 @@
+from abc import ABC, abstractmethod
+from typing import Optional
+
+class TranscriptionBackend(ABC):
+    """Strategie-Interface für die Umwandlung einer Audiodatei in Text."""
+
+    @abstractmethod
+    def transcribe(self, audio_bytes: bytes, file_name: str, language: Optional[str] = None) -> str:
+        """Transkribiert die kodierte Audiodatei (Format anhand der Dateiendung)."""
+        pass
@@ -1,40 +1,152 @@
-from collections import deque
-import time
+import asyncio
 
+from jarvis.core.sentence_segmenter import SentenceSegmenter
 from jarvis.core.speech_to_text.stream_content_extractor import StreamContentExtractor
-from jarvis.core.voice_generator import VoiceGenerator
+from jarvis.core.voice_generator import ERROR_MESSAGE, VoiceGenerator
 
 class TextToSpeechStreamer:
-    def __init__(self, voice_generator: VoiceGenerator, extractor: StreamContentExtractor):
+    def __init__(self, voice_generator: VoiceGenerator, extractor: StreamContentExtractor,
+                 min_chars: int = 40, max_chars: int = 250):
         self.tts = voice_generator
-        self.extractor = extractor  
-        self.paragraphs = deque()  
+        self.extractor = extractor
+        self.min_chars = min_chars
+        self.max_chars = max_chars
+        self._active_task = None
+        self._active_loop = None
+        self._interrupt_requested = False
 
     def process_stream(self, openai_stream):
-        buffer = ""
+        """Gibt jeden Satz an die Sprachausgabe weiter, sobald er im Stream vollständig ist."""
+        segmenter = SentenceSegmenter(min_chars=self.min_chars, max_chars=self.max_chars)
+        segments = []
 
         for chunk in openai_stream:
             part = self.extractor.extract(chunk)
-            buffer += part
 
-            while "\n\n" in buffer:
-                paragraph, buffer = buffer.split("\n\n", 1)
-                self.paragraphs.append(paragraph.strip())
+            for segment in segmenter.feed(part):
+                segments.append(segment)
+                print(f"\n📝 Neuer Satz erkannt:\n{segment}")
+                self.speak_text(segment)
 
-                print(f"\n📝 Neuer Absatz erkannt:\n{paragraph.strip()}")
-                self.speak_text(paragraph.strip())
+        for segment in segmenter.flush():
+            segments.append(segment)
+            print(f"\n📝 Letzter Satz:\n{segment}")
+            self.speak_text(segment)
 
-        if buffer.strip():
-            self.paragraphs.append(buffer.strip())
-            print(f"\n📝 Letzter Absatz:\n{buffer.strip()}")
-            self.speak_text(buffer.strip())
+        return segments
 
-        return list(self.paragraphs)
+    async def aprocess_stream(self, model_stream, max_pending_segments: int = 3):
+        """
+        Asynchrone Variante für ``astream()``-Ausgaben von LangChain-Chatmodellen.
+
+        Der Stream wird im Event-Loop gelesen, Sätze laufen über eine begrenzte Queue an
+        die Sprachausgabe. Ist die Queue voll bzw. liegt die Synthese zu weit vor der
+        Wiedergabe, wird das Lesen des Streams gebremst. ``interrupt()`` bricht ab (Barge-in);
+        ein Abbruch durch den Aufrufer oder ein Fehler wird nach dem Aufräumen weitergereicht.
+
+        Returns:
+            list: Die bis zum Ende bzw. Abbruch erkannten Sätze.
+        """
+        task = asyncio.current_task()
+        loop = asyncio.get_running_loop()
+        self._interrupt_requested = False
+        self._active_task = task
+        self._active_loop = loop
+
+        # Die Wiedergabe meldet Fortschritt aus ihrem Thread, statt dass hier gepollt wird
+        playback_progress = asyncio.Event()
+        listener = lambda: loop.call_soon_threadsafe(playback_progress.set)
+        if self.tts:
+            self.tts.add_progress_listener(listener)
+
+        segmenter = SentenceSegmenter(min_chars=self.min_chars, max_chars=self.max_chars)
+        segment_queue = asyncio.Queue(maxsize=max_pending_segments)
+        speaker = asyncio.create_task(self._speak_segments(segment_queue, max_pending_segments, playback_progress))
+        segments = []
+        completed = False
+        failed = False
+
+        try:
+            async for chunk in model_stream:
+                part = self.extractor.extract(chunk)
+
+                for segment in segmenter.feed(part):
+                    segments.append(segment)
+                    print(f"\n📝 Neuer Satz erkannt:\n{segment}")
+                    await segment_queue.put(segment)
+
+            for segment in segmenter.flush():
+                segments.append(segment)
+                print(f"\n📝 Letzter Satz:\n{segment}")
+                await segment_queue.put(segment)
+
+            await segment_queue.put(None)
+            await speaker
+            completed = True
+
+        except asyncio.CancelledError:
+            # Nur den eigenen Abbruch aus interrupt() zurücknehmen; weitere Abbrüche gehören dem Aufrufer
+            if not self._interrupt_requested or task.uncancel() > 0:
+                raise
+            print("⏹️ Ausgabe durch Nutzer unterbrochen.")
+
+        except Exception:
+            failed = True
+            raise
+
+        finally:
+            # Bei Abbruch oder Fehler Sprecher und Wiedergabe beenden, bevor die Ausgabe zurückkehrt
+            if not completed:
+                speaker.cancel()
+                if self.tts:
+                    self.tts.stop()
+                    if failed:
+                        # Vorab im Cache, erklingt daher ohne weiteren API-Aufruf
+                        self.tts.speak(ERROR_MESSAGE)
+                if hasattr(model_stream, "aclose"):
+                    await model_stream.aclose()
+            await asyncio.gather(speaker, return_exceptions=True)
+            if self.tts:
+                self.tts.remove_progress_listener(listener)
+            self._active_task = None
+            self._active_loop = None
+
+        return segments
+
+    def interrupt(self):
+        """Bricht eine laufende ``aprocess_stream``-Ausgabe samt Wiedergabe ab. Thread-sicher."""
+        task, loop = self._active_task, self._active_loop
+        if task and loop:
+            loop.call_soon_threadsafe(self._cancel_active_task, task)
+        if self.tts:
+            self.tts.stop()
+
+    def _cancel_active_task(self, task):
+        # Läuft im Event-Loop; höchstens ein eigener Abbruch pro Ausgabe
+        if task is self._active_task and not self._interrupt_requested and not task.done():
+            self._interrupt_requested = True
+            task.cancel()
+
+    async def _speak_segments(self, segment_queue: asyncio.Queue, max_pending_segments: int,
+                              playback_progress: asyncio.Event):
+        while True:
+            segment = await segment_queue.get()
+            if segment is None:
+                return
+
+            # Synthese nicht beliebig weit vor der Wiedergabe laufen lassen
+            while self.tts and self.tts.pending_segments() >= max_pending_segments:
+                playback_progress.clear()
+                if self.tts.pending_segments() < max_pending_segments:
+                    break
+                await playback_progress.wait()
+
+            self.speak_text(segment)
 
     def speak_text(self, text):
         if self.tts:
-            print(f"🔊 TTS: Spreche Absatz ...")
+            print(f"🔊 TTS: Spreche Satz ...")
+            # Die Reihenfolge garantiert der VoiceGenerator, daher keine Pause nötig
             self.tts.speak(text)
-            time.sleep(0.5)  
         else:
-            print(f"🔇 Kein TTS-System vorhanden, Absatz: {text}")
+            print(f"🔇 Kein TTS-System vorhanden, Satz: {text}")
@@ -1,37 +1,109 @@
 import os
 import shutil
+from collections import deque
 from openai import OpenAI
 from io import BytesIO
 from pydub import AudioSegment
-import pygame
+import numpy as np
 import threading
 import queue
 import time
-import uuid
+
+from jarvis.audio.audio_output_engine import AudioOutputEngine
+from jarvis.audio.tts_audio_cache import TTSAudioCache
+from jarvis.core.reorder_buffer import ReorderBuffer
+
+# OpenAI TTS liefert PCM als 24 kHz, 16 Bit, Mono
+PCM_SAMPLE_RATE = 24000
+PCM_SAMPLE_WIDTH = 2
+
+# Feste Phrasen, die beim Start vorab synthetisiert werden und danach ohne API-Aufruf erklingen
+GREETING = "Hallo, ich bin Jarvis. Wie kann ich helfen?"
+ACKNOWLEDGEMENTS = ("Ja?", "Alles klar.", "Einen Moment bitte.")
+ERROR_MESSAGE = "Entschuldigung, da ist etwas schiefgelaufen."
+NO_TODOS_MESSAGE = "Keine offenen TODOs vorhanden."
+FIXED_PHRASES = (GREETING, *ACKNOWLEDGEMENTS, ERROR_MESSAGE, NO_TODOS_MESSAGE)
+
+class StreamingSpeech:
+    """Audio eines Textes, das während der Wiedergabe noch aus der TTS-Antwort nachgeladen wird."""
+
+    def __init__(self, text, requested_at):
+        self.text = text
+        self.requested_at = requested_at
+        self.chunks = queue.Queue()
+
+    def put(self, chunk):
+        self.chunks.put(chunk)
+
+    def finish(self):
+        self.chunks.put(None)
 
 class VoiceGenerator:
-    def __init__(self, voice="nova", cache_dir="/tmp/tts_cache"):
-        """Initialisiert den TTS Generator mit OpenAI API und Vorausverarbeitung"""
+    def __init__(self, voice="nova", cache_dir="/tmp/tts_cache", streaming=True, prebuffer_seconds=0.3,
+                 model="tts-1", cache_max_bytes=200 * 1024 * 1024, cache_max_age_seconds=30 * 24 * 3600,
+                 synthesis_workers=3, output_engine=None, prewarm_phrases=FIXED_PHRASES):
+        """
+        Initialisiert den TTS Generator mit OpenAI API und Vorausverarbeitung
+
+        Args:
+            voice (str): OpenAI-Stimme.
+            cache_dir (str): Verzeichnis des TTS-Caches.
+            streaming (bool): Audio als PCM-Stream abspielen, sobald die ersten Daten ankommen.
+            prebuffer_seconds (float): Audiomenge, die im Streaming-Modus vor Wiedergabestart gepuffert wird.
+            model (str): OpenAI TTS-Modell.
+            cache_max_bytes (int): Maximale Größe des TTS-Caches.
+            cache_max_age_seconds (int): Maximales Alter eines Cache-Eintrags.
+            synthesis_workers (int): Anzahl paralleler Synthese-Threads, die der Wiedergabe vorauslaufen.
+            output_engine (AudioOutputEngine, optional): Gemeinsame Audioausgabe, standardmäßig ``AudioOutputEngine.shared()``.
+            prewarm_phrases (iterable): Phrasen, die beim Start im Hintergrund in den Cache synthetisiert werden.
+        """
         self.openai = OpenAI()
         self.voice = voice
+        self.model = model
         self.cache_dir = cache_dir
+        self.streaming = streaming
+        self.prebuffer_seconds = prebuffer_seconds
+        self.output_engine = output_engine or AudioOutputEngine.shared()
+        if self.output_engine.samplerate != PCM_SAMPLE_RATE:
+            raise ValueError(f"❌ Audioausgabe muss mit {PCM_SAMPLE_RATE} Hz laufen")
+        self.first_audio_latencies = deque(maxlen=100)
         
-        os.makedirs(self.cache_dir, exist_ok=True)
+        self.audio_cache = TTSAudioCache(cache_dir, max_bytes=cache_max_bytes, max_age_seconds=cache_max_age_seconds)
+        self._remove_legacy_cache_files()
         
         self._setup_ffmpeg()
-        self._setup_pygame()
-        self._audio_lock = threading.Lock()
+        self._stop_stream = threading.Event()
+        # Schützt das Zurücksetzen von _stop_stream vor einem gleichzeitigen stop()
+        self._stop_lock = threading.Lock()
+        # Erste Sequenznummer, die nach dem letzten stop() eingereiht wurde
+        self._resume_seq = 0
+        # Ende der letzten Wiedergabe; ab dann steht das nächste Audio vorn in der Warteschlange
+        self._last_playback_end = 0.0
         
         self.text_queue = queue.Queue()
-        self.audio_queue = queue.Queue()  
+        # Synthese läuft parallel, die Wiedergabe holt die Audios dennoch in Sprechreihenfolge
+        self.audio_queue = ReorderBuffer()
+        self._sequence_lock = threading.Lock()
+        self._next_sequence = 0
+        self._progress_listeners = []
         
         self.active = True
-        self.tts_worker = threading.Thread(target=self._process_tts_queue, daemon=True)
-        self.tts_worker.start()
+        self.tts_workers = [
+            threading.Thread(target=self._process_tts_queue, daemon=True)
+            for _ in range(max(1, synthesis_workers))
+        ]
+        for worker in self.tts_workers:
+            worker.start()
         
         self.playback_worker = threading.Thread(target=self._process_audio_queue, daemon=True)
         self.playback_worker.start()
         
+        # Im Hintergrund, damit der Start nicht auf die TTS-API wartet
+        self.prewarm_worker = None
+        if prewarm_phrases:
+            self.prewarm_worker = threading.Thread(target=self.prewarm, args=(list(prewarm_phrases),), daemon=True)
+            self.prewarm_worker.start()
+        
     def _setup_ffmpeg(self):
         """Überprüft und setzt den FFmpeg-Pfad, falls nötig"""
         ffmpeg_path = shutil.which("ffmpeg")
@@ -41,48 +113,70 @@ class VoiceGenerator:
             print("❌ FFmpeg nicht gefunden! Bitte installieren oder Pfad setzen.")
             os.environ["PATH"] += os.pathsep + r"C:\ffmpeg-2025-02-17-git-b92577405b-essentials_build\bin"
             
-    def _setup_pygame(self):
-        """Initialisiert den pygame Mixer für die Audiowiedergabe"""
-        try:
-            pygame.mixer.quit()  
-            pygame.mixer.init(frequency=44100, size=-16, channels=2, buffer=2048)
-        except Exception as e:
-            print(f"❌ Pygame Initialisierungsfehler: {e}")
-    
     def _process_tts_queue(self):
         """Worker-Thread, der Texte in Audio umwandelt und zur Wiedergabe vorbereitet"""
         while self.active:
             try:
-                text = self.text_queue.get(timeout=0.5)
-                
-                if not text.strip():
-                    self.text_queue.task_done()
-                    continue
-                
-                audio_data = self._generate_speech(text)
-                
-                if audio_data:
-                    self.audio_queue.put((text, audio_data))
-                
-                self.text_queue.task_done()
-                
+                seq, text, requested_at = self.text_queue.get(timeout=0.5)
             except queue.Empty:
-                pass
+                continue
+            
+            try:
+                self._synthesize(seq, text, requested_at)
             except Exception as e:
                 print(f"❌ TTS-Verarbeitungsfehler: {e}")
+            finally:
+                # Platzhalter, damit ein fehlgeschlagener Absatz die Wiedergabe nicht blockiert
+                self.audio_queue.put(seq, None)
+                self.text_queue.task_done()
+    
+    def _synthesize(self, seq, text, requested_at):
+        cache_key = TTSAudioCache.make_key(self.model, self.voice, text)
+        cached_pcm = self.audio_cache.get(cache_key)
+        
+        if self.streaming:
+            speech = StreamingSpeech(text, requested_at)
+            # Sofort einreihen, damit die Wiedergabe mit den ersten Bytes beginnen kann
+            self.audio_queue.put(seq, (seq, text, speech))
+            if cached_pcm:
+                speech.put(cached_pcm)
+                speech.finish()
+            else:
+                self._stream_speech(speech, cache_key)
+        elif cached_pcm:
+            self.audio_queue.put(seq, (seq, text, self._pcm_to_segment(cached_pcm)))
+        else:
+            audio_data = self._generate_speech(text, cache_key)
+            
+            if audio_data:
+                self.audio_queue.put(seq, (seq, text, audio_data))
     
     def _process_audio_queue(self):
-        """Worker-Thread, der vorbereitete Audiodateien abspielt"""
+        """Worker-Thread, der vorbereitete Audiodateien in Sprechreihenfolge abspielt"""
         while self.active:
             try:
-                # Hole die nächste Audio-Datei aus der Queue
-                text, audio_data = self.audio_queue.get(timeout=0.5)
+                # Vor dem Entnehmen zurücksetzen, damit ein stop() ab jetzt das entnommene Audio trifft
+                with self._stop_lock:
+                    self._stop_stream.clear()
+                # Hole das nächste Audio in Reihenfolge
+                item = self.audio_queue.get(timeout=0.5)
+                self._notify_progress()
+                if item is None:
+                    continue
+                seq, text, audio_data = item
+                with self._stop_lock:
+                    # Ein stop() während des Wartens gilt nicht für danach gesprochene Texte
+                    if seq >= self._resume_seq:
+                        self._stop_stream.clear()
                 
                 # Spiele die Audio-Datei ab
-                self._play_audio(audio_data)
-                
-                # Markiere Aufgabe als erledigt
-                self.audio_queue.task_done()
+                try:
+                    if isinstance(audio_data, StreamingSpeech):
+                        self._play_stream(audio_data)
+                    else:
+                        self._play_audio(audio_data)
+                finally:
+                    self._last_playback_end = time.perf_counter()
                 
             except queue.Empty:
                 # Queue Timeout, setze Schleife fort
@@ -90,71 +184,185 @@ class VoiceGenerator:
             except Exception as e:
                 print(f"❌ Audio-Wiedergabefehler: {e}")
     
-    def _generate_speech(self, text):
-        """Generiert Sprache mit OpenAI TTS und gibt das Audio-Segment zurück"""
+    def _stream_speech(self, speech, cache_key):
+        """Lädt die TTS-Antwort als PCM-Stream, reicht die Chunks direkt an die Wiedergabe weiter und cacht sie"""
+        pcm_data = bytearray()
         try:
-            # Generiere eine eindeutige ID für diese Anfrage
-            text_hash = str(uuid.uuid4())[:8]
-            cache_path = os.path.join(self.cache_dir, f"tts_{text_hash}.mp3")
+            with self.openai.audio.speech.with_streaming_response.create(
+                model=self.model,
+                voice=self.voice,
+                input=speech.text,
+                response_format="pcm"
+            ) as response:
+                for chunk in response.iter_bytes(chunk_size=4096):
+                    speech.put(chunk)
+                    pcm_data.extend(chunk)
             
+            self.audio_cache.put(cache_key, bytes(pcm_data))
+        except Exception as e:
+            print(f"❌ Fehler beim Sprach-Streaming: {e}")
+        finally:
+            speech.finish()
+    
+    def _generate_speech(self, text, cache_key):
+        """Generiert Sprache mit OpenAI TTS, legt sie als PCM im Cache ab und gibt das Audio-Segment zurück"""
+        try:
             # Generiere die Sprachdatei mit OpenAI
             response = self.openai.audio.speech.create(
-                model="tts-1",
+                model=self.model,
                 voice=self.voice,
                 input=text
             )
             
-            # Speichere die MP3 im Cache
-            with open(cache_path, "wb") as f:
-                f.write(response.content)
-            
             # Lade die MP3 direkt aus der API-Antwort
             audio_stream = BytesIO(response.content)
             audio = AudioSegment.from_file(audio_stream, format="mp3")
             
+            # Im Cache einheitlich als 24 kHz Mono-PCM ablegen
+            pcm_audio = audio.set_frame_rate(PCM_SAMPLE_RATE).set_channels(1).set_sample_width(PCM_SAMPLE_WIDTH)
+            self.audio_cache.put(cache_key, pcm_audio.raw_data)
+            
             return audio
             
         except Exception as e:
             print(f"❌ Fehler bei der Sprachgenerierung: {e}")
             return None
     
+    def _pcm_to_segment(self, pcm_data):
+        return AudioSegment(data=pcm_data, sample_width=PCM_SAMPLE_WIDTH, frame_rate=PCM_SAMPLE_RATE, channels=1)
+    
+    def _remove_legacy_cache_files(self):
+        """Entfernt die früher mit zufälligen Namen abgelegten MP3-Dateien, die nie wiederverwendet wurden"""
+        for file_name in os.listdir(self.cache_dir):
+            if file_name.startswith("tts_") and file_name.endswith(".mp3"):
+                try:
+                    os.remove(os.path.join(self.cache_dir, file_name))
+                except OSError:
+                    pass
+    
     def _play_audio(self, audio_data):
-        """Spielt die Audiodaten ab mit Sperrmechanismus zur Vermeidung überlappender Wiedergabe"""
-        with self._audio_lock:
-            try:
-                if not pygame.mixer.get_init():
-                    self._setup_pygame()
-                
-                audio_io = BytesIO()
-                audio_data.export(audio_io, format="wav")
-                audio_io.seek(0)
-                
-                pygame.mixer.music.load(audio_io)
-                pygame.mixer.music.play()
+        """Spielt ein vollständiges Audio-Segment über die gemeinsame Ausgabe ab und wartet auf dessen Ende"""
+        try:
+            pcm_audio = audio_data.set_frame_rate(PCM_SAMPLE_RATE).set_channels(1).set_sample_width(PCM_SAMPLE_WIDTH)
+            if self._stop_stream.is_set():
+                return
+            source = self.output_engine.play(pcm_audio.raw_data, AudioOutputEngine.SPEECH)
+            source.wait()
+        except Exception as e:
+            print(f"❌ Wiedergabefehler: {e}")
+
+    def _play_stream(self, speech):
+        """Reicht PCM-Chunks direkt an die Ausgabe weiter; sie startet, sobald der Vorpuffer gefüllt ist"""
+        # Frühestens ab hier kann dieser Text hörbar werden, vorher lief noch der vorige
+        head_at = max(speech.requested_at, self._last_playback_end)
+        source = self.output_engine.open_source(AudioOutputEngine.SPEECH, self.prebuffer_seconds)
+        try:
+            pending = bytearray()
+            
+            while not self._stop_stream.is_set():
+                try:
+                    # Mit Timeout, damit ein stop() auch bei stockender TTS-Antwort greift
+                    chunk = speech.chunks.get(timeout=0.1)
+                except queue.Empty:
+                    continue
+                if chunk is None:
+                    break
+                pending.extend(chunk)
                 
-                while pygame.mixer.music.get_busy():
-                    pygame.time.wait(100)
-                    
+                # Nur ganze Samples weitergeben
+                writable = len(pending) - len(pending) % PCM_SAMPLE_WIDTH
+                source.write(bytes(pending[:writable]))
+                del pending[:writable]
+            
+            source.finish()
+            source.wait()
+            # Der Audio-Callback stempelt, wann die ersten Samples tatsächlich ausgegeben wurden
+            if source.first_audio_at is not None and not self._stop_stream.is_set():
+                self._record_first_audio(source.first_audio_at - head_at)
+            
+        except Exception as e:
+            print(f"❌ Streaming-Wiedergabefehler: {e}")
+        finally:
+            source.cancel()
+    
+    def _record_first_audio(self, latency):
+        self.first_audio_latencies.append(latency)
+        print(f"⏱️ Time-to-first-audio: {latency * 1000:.0f} ms")
+    
+    def get_first_audio_latency_stats(self):
+        """
+        Liefert Kennzahlen zur Zeit bis zum ersten hörbaren Audio in Sekunden. Gemessen wird ab
+        speak() bzw., falls noch ein vorheriger Text lief, ab dessen Ende.
+        """
+        if not self.first_audio_latencies:
+            return {}
+        latencies = np.array(self.first_audio_latencies)
+        return {
+            "count": len(latencies),
+            "last": float(latencies[-1]),
+            "median": float(np.median(latencies)),
+            "p95": float(np.percentile(latencies, 95))
+        }
+
+    def prewarm(self, phrases):
+        """Synthetisiert feste Phrasen (Bestätigungen, Begrüßungen) vorab in den Cache, ohne sie abzuspielen"""
+        for text in phrases:
+            cache_key = TTSAudioCache.make_key(self.model, self.voice, text)
+            if self.audio_cache.get(cache_key):
+                continue
+            try:
+                response = self.openai.audio.speech.create(
+                    model=self.model,
+                    voice=self.voice,
+                    input=text,
+                    response_format="pcm"
+                )
+                self.audio_cache.put(cache_key, response.content)
             except Exception as e:
-                print(f"❌ Wiedergabefehler: {e}")
-            finally:
-                pygame.mixer.music.stop()
-                audio_io.close()
+                print(f"❌ Fehler beim Vorwärmen des TTS-Caches: {e}")
 
     def speak(self, text):
+        """Reiht einen Text zur Sprachausgabe ein. Texte werden in der Reihenfolge der Aufrufe gesprochen."""
         if not text.strip():
             return
 
-        self._interrupt_playback()
-        self.text_queue.put(text)
-            
-    def _interrupt_playback(self):
-        with self._audio_lock:
-            if pygame.mixer.get_init():
-                pygame.mixer.music.stop()
+        with self._sequence_lock:
+            seq = self._next_sequence
+            self._next_sequence += 1
+        self.text_queue.put((seq, text, time.perf_counter()))
+
+    def pending_segments(self):
+        """Anzahl eingereihter, noch nicht zur Wiedergabe gelangter Texte"""
+        return self._next_sequence - self.audio_queue.next_seq
+
+    def add_progress_listener(self, listener):
+        """Registriert einen Callback, der aufgerufen wird, sobald ``pending_segments()`` sinkt (aus Worker-Threads)."""
+        self._progress_listeners = self._progress_listeners + [listener]
+
+    def remove_progress_listener(self, listener):
+        self._progress_listeners = [item for item in self._progress_listeners if item is not listener]
+
+    def _notify_progress(self):
+        for listener in self._progress_listeners:
+            try:
+                listener()
+            except Exception as e:
+                print(f"❌ Fehler im Fortschritts-Callback: {e}")
 
     def clear_queues(self):
+        """Verwirft alle ausstehenden Texte und Audios und liefert die nächste freie Sequenznummer"""
         with self.text_queue.mutex:
             self.text_queue.queue.clear()
-        with self.audio_queue.mutex:
-            self.audio_queue.queue.clear()
\ No newline at end of file
+        with self._sequence_lock:
+            resume_seq = self._next_sequence
+            self.audio_queue.skip_to(resume_seq)
+        self._notify_progress()
+        return resume_seq
+
+    def stop(self):
+        """Bricht die laufende Wiedergabe ab und verwirft alle ausstehenden Texte und Audios"""
+        with self._stop_lock:
+            self._resume_seq = self.clear_queues()
+            self._stop_stream.set()
+        # Bereits an die Ausgabe übergebene Sprache verstummt innerhalb eines Audio-Blocks
+        self.output_engine.flush(AudioOutputEngine.SPEECH)
@@ -1,9 +1,9 @@
 import os
 from dotenv import load_dotenv
 import pvporcupine
-import pyaudio
 import numpy as np
-from audio.sound_player import SoundPlayer
+from jarvis.audio.audio_capture_bus import AudioCaptureBus
+from jarvis.audio.sound_player import SoundPlayer
 import threading
 import time
 import logging
@@ -11,8 +11,14 @@ import logging
 class WakeWordListener:
     """Erkennt das Wake-Word und gibt ein Signal aus."""
 
-    def __init__(self, wakeword="jarvis"):
-        """Initialisiert die Wake-Word-Erkennung."""
+    def __init__(self, wakeword="jarvis", capture_bus=None):
+        """
+        Initialisiert die Wake-Word-Erkennung.
+
+        Args:
+            wakeword (str): Zu erkennendes Wort.
+            capture_bus (AudioCaptureBus, optional): Gemeinsamer Audio-Eingang, standardmäßig ``AudioCaptureBus.shared()``.
+        """
         self.logger = logging.getLogger(self.__class__.__name__)
         self.logger.info("🔧 Initialisiere Wake-Word Listener mit Wort: %s", wakeword)
         
@@ -22,42 +28,52 @@ class WakeWordListener:
             keywords=[wakeword]
         )
 
-        # Separate PyAudio-Instanz für Input
-        self.pa_input = pyaudio.PyAudio()
-        self.stream = self.pa_input.open(
-            format=pyaudio.paInt16,
-            channels=1,
-            rate=16000,
-            input=True,
-            frames_per_buffer=self.handle.frame_length,
-            stream_callback=self._audio_callback
-        )
-        
+        # Gemeinsamer Eingang statt eigenem Stream, damit die Aufnahme nahtlos anschließt
+        self.capture_bus = capture_bus or AudioCaptureBus.shared()
+        self._pending = np.zeros(0, dtype=np.int16)
+        self.capture_bus.subscribe(self._audio_callback)
+
         # Flags für Status
         self.is_listening = False
         self.should_stop = False
         self._detection_event = threading.Event()
+        self.last_detection_index = None
         
         self.sound_player = SoundPlayer("./wakesound.mp3")
 
-    def _audio_callback(self, in_data, frame_count, time_info, status):
+    def _audio_callback(self, samples, end_index):
         """Callback für Audio-Processing"""
-        if self.is_listening and not self.should_stop:
-            pcm = np.frombuffer(in_data, dtype=np.int16)
-            keyword_index = self.handle.process(pcm)
-            
-            if keyword_index >= 0:
+        if not self.is_listening or self.should_stop:
+            return
+
+        frame_length = self.handle.frame_length
+        if len(samples) != frame_length or len(self._pending):
+            # Blöcke abweichender Größe auf Porcupine-Frames umpacken
+            self._pending = np.concatenate((self._pending, samples))
+            frame_count = len(self._pending) // frame_length
+            frames = [self._pending[i * frame_length:(i + 1) * frame_length] for i in range(frame_count)]
+            self._pending = self._pending[frame_count * frame_length:]
+        else:
+            frames = [samples]
+
+        for frame in frames:
+            if self.handle.process(frame) >= 0:
                 self.logger.info("🚀 Wake-Word erkannt!")
+                # Alles ab hier gehört zur Anfrage und kann direkt aus dem Ringpuffer gelesen werden
+                self.last_detection_index = end_index - len(self._pending)
                 self._detection_event.set()
                 self.sound_player.play_audio()
-        
-        return (in_data, pyaudio.paContinue)
 
     def listen_for_wakeword(self):
-        """Hört auf das Wake-Word und gibt True zurück, wenn erkannt."""
+        """
+        Hört auf das Wake-Word und gibt True zurück, wenn erkannt.
+
+        ``last_detection_index`` gibt danach den Sample-Index direkt hinter dem Wake-Word an,
+        ab dem ``SpeechToText.record_utterance`` die Anfrage aufnehmen kann.
+        """
         self.logger.info("🎤 Warte auf Wake-Word...")
         self.is_listening = True
-        self.stream.start_stream()
+        self.capture_bus.start()
         
         # Warten auf Erkennung mit Timeout
         while not self.should_stop:
@@ -76,11 +92,7 @@ class WakeWordListener:
         # Warte kurz, damit laufende Operationen beendet werden können
         time.sleep(0.2)
         
-        if self.stream:
-            self.stream.stop_stream()
-            self.stream.close()
-        if self.pa_input:
-            self.pa_input.terminate()
+        self.capture_bus.unsubscribe(self._audio_callback)
         if self.handle:
             self.handle.delete()
         
@@ -92,8 +104,9 @@ class WakeWordListener:
         return os.getenv("PICO_ACCESS_KEY")
 
     def pause_listening(self):
-        """Pausiert die Wake-Word-Erkennung temporär"""
+        """Pausiert die Wake-Word-Erkennung temporär; der Audio-Eingang bleibt geöffnet"""
         self.is_listening = False
+        self._pending = np.zeros(0, dtype=np.int16)
         
     def resume_listening(self):
         """Setzt die Wake-Word-Erkennung fort"""
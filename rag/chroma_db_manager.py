@@ -1,23 +1,40 @@
 import os
+import hashlib
 import logging
+from dataclasses import dataclass, field
+from typing import List
 from dotenv import load_dotenv
 
+import chromadb
 from langchain_chroma import Chroma
-from langchain_openai import OpenAIEmbeddings
 from langchain.text_splitter import MarkdownTextSplitter
+from langchain_core.documents import Document
+from langchain_core.output_parsers import StrOutputParser
 from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
 from langchain.chains.history_aware_retriever import create_history_aware_retriever
 from langchain.chains.retrieval import create_retrieval_chain
 from langchain.chains.combine_documents import create_stuff_documents_chain
 from langchain_openai import ChatOpenAI
 
+from rag.embedding_cache import create_cached_embeddings
+from rag.semantic_answer_cache import SemanticAnswerCache
+
 load_dotenv()
 
+@dataclass
+class PageSyncPlan:
+    """Ergebnis des Abgleichs der Chunks einer Seite mit der Datenbank."""
+    new_docs: List[Document] = field(default_factory=list)
+    kept_docs: List[Document] = field(default_factory=list)
+    stale_ids: List[str] = field(default_factory=list)
+
 class ChromaDBManager:
     """
     Erweiterter ChromaDBManager für Notion Vector Database mit semantischer Suche.
     """
 
+    COLLECTION_NAME = "langchain"
+
     def __init__(self):
         """
         Initialisiert den ChromaDBManager für Notion-Seiten.
@@ -30,12 +47,17 @@ class ChromaDBManager:
         self.persistent_directory = os.path.join(current_dir, "chroma_db")
         os.makedirs(self.persistent_directory, exist_ok=True)
 
-        self.embeddings = OpenAIEmbeddings(model="text-embedding-3-small")
+        self.embeddings = create_cached_embeddings(model="text-embedding-3-small")
         self._initialize_retriever()
+        self.answer_cache = SemanticAnswerCache(self.db, self.embeddings)
         
         
     def _initialize_retriever(self):
-        self.db = Chroma(persist_directory=self.persistent_directory, embedding_function=self.embeddings)
+        # Eigener Client, damit Vektoren und Metadaten über die öffentliche chromadb-API
+        # geschrieben werden können; der Name entspricht der bisherigen Standard-Collection
+        self.client = chromadb.PersistentClient(path=self.persistent_directory)
+        self.collection = self.client.get_or_create_collection(self.COLLECTION_NAME)
+        self.db = Chroma(client=self.client, collection_name=self.COLLECTION_NAME, embedding_function=self.embeddings)
 
         self.retriever = self.db.as_retriever(verbose=True)
 
@@ -46,6 +68,8 @@ class ChromaDBManager:
             MessagesPlaceholder("chat_history"),
             ("human", "{input}"),
         ])
+        # Einzeln nutzbar, wenn die Suche selbst an anderer Stelle läuft (SmartRAGManager)
+        self.condense_question_chain = contextualize_q_prompt | self.llm | StrOutputParser()
         self.history_aware_retriever = create_history_aware_retriever(self.llm, self.retriever, contextualize_q_prompt)
 
         # Antwortgenerierung mit Dokumenten
@@ -67,21 +91,88 @@ class ChromaDBManager:
     def delete_page_docs(self, page_id: str):
         """Löscht Dokumente einer bestimmten Notion-Seite."""
         self.db.delete(where={"source": page_id})
+        SemanticAnswerCache.invalidate_pages_everywhere([page_id])
         self.logger.info(f"Alte Einträge für Seite {page_id} gelöscht")
 
     def add_page_documents(self, page_id: str, markdown_text: str, last_edited_time: str):
         """
         Fügt Dokumente für eine Notion-Seite zur Datenbank hinzu.
         """
+        docs = self.split_page_documents(page_id, markdown_text, last_edited_time)
+
+        self.db.add_documents(docs, ids=[doc.id for doc in docs])
+        SemanticAnswerCache.invalidate_pages_everywhere([page_id])
+        self.logger.info(f"{len(docs)} neue Chunks für Seite {page_id} gespeichert")
+
+    def sync_page_documents(self, page_id: str, markdown_text: str, last_edited_time: str) -> dict:
+        """
+        Gleicht die Chunks einer Seite inkrementell mit der Datenbank ab.
+
+        Chunks werden über den Hash ihres Inhalts identifiziert: nur neue Chunks werden
+        eingebettet, verschwundene gelöscht und unveränderte lediglich mit dem neuen
+        Bearbeitungszeitpunkt versehen.
+
+        Returns:
+            dict: Anzahl hinzugefügter, gelöschter und unveränderter Chunks.
+        """
+        docs = self.split_page_documents(page_id, markdown_text, last_edited_time)
+        plan = self.plan_page_sync(page_id, docs)
+        embeddings = self.embeddings.embed_documents([doc.page_content for doc in plan.new_docs]) if plan.new_docs else []
+
+        return self.write_page_chunks(page_id, plan, embeddings)
+
+    def split_page_documents(self, page_id: str, markdown_text: str, last_edited_time: str) -> List[Document]:
+        """Zerlegt den Seiteninhalt in Chunks mit inhaltsbasierten IDs."""
         text_splitter = MarkdownTextSplitter(chunk_size=500, chunk_overlap=100)
         docs = text_splitter.create_documents([markdown_text])
 
-        # Metadaten für jeden Chunk hinzufügen
+        occurrences = {}
         for doc in docs:
-            doc.metadata = {"source": page_id, "last_edited": last_edited_time}
-
-        self.db.add_documents(docs)
-        self.logger.info(f"{len(docs)} neue Chunks für Seite {page_id} gespeichert")
+            content_hash = hashlib.sha256(doc.page_content.encode("utf-8")).hexdigest()
+            # Identische Chunks innerhalb einer Seite bekommen eine laufende Nummer
+            occurrence = occurrences.get(content_hash, 0)
+            occurrences[content_hash] = occurrence + 1
+
+            doc.id = f"{page_id}:{content_hash}:{occurrence}"
+            doc.metadata = {"source": page_id, "last_edited": last_edited_time, "content_hash": content_hash}
+
+        return docs
+
+    def plan_page_sync(self, page_id: str, docs: List[Document]) -> PageSyncPlan:
+        """Ermittelt, welche Chunks einer Seite neu, unverändert oder veraltet sind."""
+        existing_ids = set(self.db.get(where={"source": page_id}, include=[])["ids"])
+
+        return PageSyncPlan(
+            new_docs=[doc for doc in docs if doc.id not in existing_ids],
+            kept_docs=[doc for doc in docs if doc.id in existing_ids],
+            stale_ids=list(existing_ids - {doc.id for doc in docs})
+        )
+
+    def write_page_chunks(self, page_id: str, plan: PageSyncPlan, embeddings: List[List[float]]) -> dict:
+        """Schreibt einen Synchronisationsplan mit bereits berechneten Embeddings in die Datenbank."""
+        if plan.stale_ids:
+            self.db.delete(ids=plan.stale_ids)
+        if plan.new_docs:
+            self.collection.upsert(
+                ids=[doc.id for doc in plan.new_docs],
+                embeddings=embeddings,
+                metadatas=[doc.metadata for doc in plan.new_docs],
+                documents=[doc.page_content for doc in plan.new_docs]
+            )
+        if plan.kept_docs:
+            # Nur Metadaten aktualisieren, ohne erneut einzubetten
+            self.collection.update(
+                ids=[doc.id for doc in plan.kept_docs],
+                metadatas=[doc.metadata for doc in plan.kept_docs]
+            )
+        if plan.new_docs or plan.stale_ids:
+            # Antworten auf Basis des alten Seiteninhalts sind nicht mehr gültig
+            SemanticAnswerCache.invalidate_pages_everywhere([page_id])
+
+        self.logger.info(
+            f"Seite {page_id}: {len(plan.new_docs)} Chunks hinzugefügt, {len(plan.stale_ids)} gelöscht, {len(plan.kept_docs)} unverändert"
+        )
+        return {"added": len(plan.new_docs), "deleted": len(plan.stale_ids), "unchanged": len(plan.kept_docs)}
 
     def query_semantic(self, query: str, chat_history=None) -> str:
         """
@@ -97,6 +188,12 @@ class ChromaDBManager:
         if chat_history is None:
             chat_history = []
 
+        # Folgefragen hängen vom Verlauf ab und werden daher nicht aus dem Cache beantwortet
+        if not chat_history:
+            cached_answer = self.answer_cache.lookup(query)
+            if cached_answer is not None:
+                return cached_answer
+
         result = self.rag_chain.invoke({"input": query, "chat_history": chat_history}, verbose=True)
         
         context_docs = result.get("context", "Kein Kontext gefunden.")
@@ -110,4 +207,6 @@ class ChromaDBManager:
             print(context_docs)
         print("====================================\n")
         
+        if not chat_history:
+            self.answer_cache.store(query, result["answer"], result.get("context"))
         return result["answer"]
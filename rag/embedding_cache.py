@@ -0,0 +1,195 @@
+import os
+import time
+import sqlite3
+import hashlib
+import logging
+import asyncio
+import threading
+from typing import List, Optional
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+from langchain_openai import OpenAIEmbeddings
+
+DEFAULT_CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "embedding_cache.sqlite3")
+
+
+class SQLiteEmbeddingCache:
+    """
+    Persistenter Embedding-Cache auf Basis von SQLite mit LRU-Verdrängung.
+
+    Schlüssel ist der Hash aus Modellname und Text, die Vektoren werden als float32 gespeichert.
+    Anzahl und Größe der Einträge werden beim Öffnen einmal gezählt und danach im Speicher
+    mitgeführt, damit ``put_many`` nicht bei jedem Aufruf die ganze Tabelle durchsucht.
+    """
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH, max_entries: int = 200_000, max_bytes: Optional[int] = 512 * 1024 * 1024):
+        self.logger = logging.getLogger(__name__)
+        self.path = path
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(
+            """CREATE TABLE IF NOT EXISTS embeddings (
+                key TEXT PRIMARY KEY,
+                vector BLOB NOT NULL,
+                last_used REAL NOT NULL
+            )"""
+        )
+        self._connection.execute("CREATE INDEX IF NOT EXISTS idx_embeddings_last_used ON embeddings(last_used)")
+        self._connection.commit()
+        self._entry_count, self._total_bytes = self._connection.execute(
+            "SELECT COUNT(*), COALESCE(SUM(LENGTH(vector)), 0) FROM embeddings"
+        ).fetchone()
+
+    @staticmethod
+    def make_key(model_name: str, text: str) -> str:
+        return hashlib.sha256(f"{model_name}\0{text}".encode("utf-8")).hexdigest()
+
+    def get_many(self, keys: List[str]) -> List[Optional[List[float]]]:
+        """Liefert die gespeicherten Vektoren (oder None) und markiert Treffer als zuletzt benutzt."""
+        if not keys:
+            return []
+
+        found = {}
+        with self._lock:
+            for start in range(0, len(keys), 500):
+                batch = keys[start:start + 500]
+                placeholders = ",".join("?" * len(batch))
+                rows = self._connection.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})", batch
+                ).fetchall()
+                found.update(rows)
+
+            if found:
+                now = time.time()
+                self._connection.executemany(
+                    "UPDATE embeddings SET last_used = ? WHERE key = ?", [(now, key) for key in found]
+                )
+                self._connection.commit()
+
+        return [np.frombuffer(found[key], dtype=np.float32).tolist() if key in found else None for key in keys]
+
+    def put_many(self, keys: List[str], vectors: List[List[float]]):
+        """Speichert Vektoren und verdrängt bei Bedarf die am längsten unbenutzten Einträge."""
+        if not keys:
+            return
+
+        now = time.time()
+        rows = [(key, np.asarray(vector, dtype=np.float32).tobytes(), now) for key, vector in zip(keys, vectors)]
+        rows = list({row[0]: row for row in rows}.values())
+        with self._lock:
+            # Ersetzte Einträge nicht doppelt zählen
+            replaced = {}
+            for start in range(0, len(rows), 500):
+                batch = [row[0] for row in rows[start:start + 500]]
+                placeholders = ",".join("?" * len(batch))
+                replaced.update(self._connection.execute(
+                    f"SELECT key, LENGTH(vector) FROM embeddings WHERE key IN ({placeholders})", batch
+                ).fetchall())
+
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, vector, last_used) VALUES (?, ?, ?)", rows
+            )
+            self._entry_count += len(rows) - len(replaced)
+            self._total_bytes += sum(len(row[1]) for row in rows) - sum(replaced.values())
+            self._evict()
+            self._connection.commit()
+
+    def _over_limit(self) -> bool:
+        return self._entry_count > self.max_entries or bool(self.max_bytes and self._total_bytes > self.max_bytes)
+
+    def _evict(self):
+        evicted = 0
+        while self._over_limit() and self._entry_count:
+            excess = max(1, self._entry_count - self.max_entries)
+            if self.max_bytes and self._total_bytes > self.max_bytes:
+                bytes_per_entry = self._total_bytes / self._entry_count
+                excess = max(excess, int((self._total_bytes - self.max_bytes) / bytes_per_entry) + 1)
+
+            victims = self._connection.execute(
+                "SELECT key, LENGTH(vector) FROM embeddings ORDER BY last_used LIMIT ?", (excess,)
+            ).fetchall()
+            if not victims:
+                break
+            self._connection.executemany("DELETE FROM embeddings WHERE key = ?", [(key,) for key, _ in victims])
+            self._entry_count -= len(victims)
+            self._total_bytes -= sum(size for _, size in victims)
+            evicted += len(victims)
+
+        if evicted:
+            self.logger.info("🧹 %d Embeddings aus dem Cache verdrängt", evicted)
+
+
+class CachedEmbeddings(Embeddings):
+    """Embeddings-Wrapper, der Dokument- und Query-Embeddings über einen SQLiteEmbeddingCache zwischenspeichert."""
+
+    def __init__(self, embeddings: Embeddings, model_name: str, cache: SQLiteEmbeddingCache):
+        self.embeddings = embeddings
+        self.model_name = model_name
+        self.cache = cache
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        keys = [self.cache.make_key(self.model_name, text) for text in texts]
+        vectors = self.cache.get_many(keys)
+
+        missing = [i for i, vector in enumerate(vectors) if vector is None]
+        if missing:
+            computed = self.embeddings.embed_documents([texts[i] for i in missing])
+            self._store(missing, keys, vectors, computed)
+
+        return vectors
+
+    def embed_query(self, text: str) -> List[float]:
+        key = self.cache.make_key(self.model_name, text)
+        cached = self.cache.get_many([key])[0]
+        if cached is not None:
+            return cached
+
+        vector = self.embeddings.embed_query(text)
+        self.cache.put_many([key], [vector])
+        return vector
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        keys = [self.cache.make_key(self.model_name, text) for text in texts]
+        vectors = await asyncio.to_thread(self.cache.get_many, keys)
+
+        missing = [i for i, vector in enumerate(vectors) if vector is None]
+        if missing:
+            computed = await self.embeddings.aembed_documents([texts[i] for i in missing])
+            await asyncio.to_thread(self._store, missing, keys, vectors, computed)
+
+        return vectors
+
+    async def aembed_query(self, text: str) -> List[float]:
+        key = self.cache.make_key(self.model_name, text)
+        cached = (await asyncio.to_thread(self.cache.get_many, [key]))[0]
+        if cached is not None:
+            return cached
+
+        vector = await self.embeddings.aembed_query(text)
+        await asyncio.to_thread(self.cache.put_many, [key], [vector])
+        return vector
+
+    def _store(self, missing: List[int], keys: List[str], vectors: List[Optional[List[float]]], computed: List[List[float]]):
+        for i, vector in zip(missing, computed):
+            vectors[i] = vector
+        self.cache.put_many([keys[i] for i in missing], computed)
+
+
+_shared_cache: Optional[SQLiteEmbeddingCache] = None
+_shared_cache_lock = threading.Lock()
+
+
+def create_cached_embeddings(model: str = "text-embedding-3-small") -> CachedEmbeddings:
+    """Erzeugt OpenAI-Embeddings hinter dem prozessweit geteilten Embedding-Cache."""
+    global _shared_cache
+    with _shared_cache_lock:
+        if _shared_cache is None:
+            _shared_cache = SQLiteEmbeddingCache()
+
+    return CachedEmbeddings(OpenAIEmbeddings(model=model), model, _shared_cache)
@@ -0,0 +1,136 @@
+"""
+Offline-Evaluierung des lokalen Query-Routers gegen Labels und den LLM-Router sowie der
+Trefferschwelle des semantischen Antwort-Caches gegen Fragepaare.
+
+Aufruf:
+    python -m rag.evaluate_router [--questions rag/router_eval_questions.json] [--no-llm]
+                                  [--cache-pairs rag/cache_eval_pairs.json]
+"""
+import os
+import json
+import argparse
+import statistics
+
+from dotenv import load_dotenv
+from langchain_openai import ChatOpenAI
+
+from rag.chroma_db_manager import ChromaDBManager
+from rag.query_router import LLMQueryRouter, LocalQueryRouter
+
+DEFAULT_QUESTIONS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "router_eval_questions.json")
+DEFAULT_CACHE_PAIRS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "cache_eval_pairs.json")
+
+def load_questions(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+def evaluate(questions, local_router, llm_router=None):
+    """Vergleicht lokale Entscheidungen mit den Labels und – falls vorhanden – dem LLM-Router."""
+    rows = []
+    for item in questions:
+        local = local_router.route(item["question"], allow_fallback=False)
+        llm = llm_router.route(item["question"]) if llm_router else None
+        rows.append({
+            "question": item["question"],
+            "label": item["use_retrieval"],
+            "local": local,
+            "llm": llm
+        })
+
+    local_latencies = [row["local"].duration_seconds for row in rows]
+    report = {
+        "questions": len(rows),
+        "local_accuracy": sum(row["local"].use_retrieval == row["label"] for row in rows) / len(rows),
+        "local_latency_median_ms": statistics.median(local_latencies) * 1000,
+        "local_latency_p95_ms": percentile(local_latencies, 0.95) * 1000,
+        "uncertain_rate": sum(row["local"].confidence <= 0.5 for row in rows) / len(rows),
+    }
+    if llm_router:
+        llm_latencies = [row["llm"].duration_seconds for row in rows]
+        report.update({
+            "llm_accuracy": sum(row["llm"].use_retrieval == row["label"] for row in rows) / len(rows),
+            "agreement_with_llm": sum(row["local"].use_retrieval == row["llm"].use_retrieval for row in rows) / len(rows),
+            "llm_latency_median_ms": statistics.median(llm_latencies) * 1000,
+        })
+    return report, rows
+
+def evaluate_cache(pairs, answer_cache):
+    """Prüft, ob der Antwort-Cache Fragepaare wie gelabelt als gleich bzw. verschieden behandelt."""
+    rows = []
+    for pair in pairs:
+        rows.append({
+            "question": pair["question"],
+            "other": pair["other"],
+            "label": pair["same"],
+            "similarity": answer_cache.similarity(pair["question"], pair["other"]),
+            "hit": answer_cache.is_same_question(pair["question"], pair["other"])
+        })
+
+    negatives = [row for row in rows if not row["label"]]
+    positives = [row for row in rows if row["label"]]
+    report = {
+        "pairs": len(rows),
+        "cache_threshold": answer_cache.similarity_threshold,
+        "cache_false_hits": sum(row["hit"] for row in negatives),
+        "cache_false_hit_rate": sum(row["hit"] for row in negatives) / len(negatives) if negatives else 0.0,
+        "cache_hit_rate_duplicates": sum(row["hit"] for row in positives) / len(positives) if positives else 0.0,
+    }
+    return report, rows
+
+def print_report(report, rows):
+    print("\n===== ROUTER-EVALUIERUNG =====")
+    for key, value in report.items():
+        print(f"{key}: {value:.3f}" if isinstance(value, float) else f"{key}: {value}")
+
+    print("\n--- Abweichungen ---")
+    for row in rows:
+        local = row["local"]
+        mismatched_label = local.use_retrieval != row["label"]
+        mismatched_llm = row["llm"] is not None and local.use_retrieval != row["llm"].use_retrieval
+        if mismatched_label or mismatched_llm:
+            score = f"{local.score:.2f}" if local.score is not None else "-"
+            llm = "-" if row["llm"] is None else ("yes" if row["llm"].use_retrieval else "no")
+            print(f"{row['question']}\n    Label: {'yes' if row['label'] else 'no'} | lokal: "
+                  f"{'yes' if local.use_retrieval else 'no'} ({local.source}, Score {score}) | LLM: {llm}")
+
+def print_cache_report(report, rows):
+    print("\n===== ANTWORT-CACHE-EVALUIERUNG =====")
+    for key, value in report.items():
+        print(f"{key}: {value:.3f}" if isinstance(value, float) else f"{key}: {value}")
+
+    print("\n--- Abweichungen ---")
+    for row in rows:
+        if row["hit"] != row["label"]:
+            print(f"{row['question']} | {row['other']}\n    Label: {'gleich' if row['label'] else 'verschieden'} | "
+                  f"Cache: {'Treffer' if row['hit'] else 'kein Treffer'} (Ähnlichkeit {row['similarity']:.3f})")
+
+def main():
+    parser = argparse.ArgumentParser(description="Evaluiert den lokalen Query-Router.")
+    parser.add_argument("--questions", default=DEFAULT_QUESTIONS_PATH, help="JSON-Datei mit gelabelten Fragen")
+    parser.add_argument("--no-llm", action="store_true", help="Ohne Vergleich mit dem LLM-Router")
+    parser.add_argument("--threshold", type=float, default=None, help="Abweichende Ähnlichkeitsschwelle")
+    parser.add_argument("--cache-pairs", default=DEFAULT_CACHE_PAIRS_PATH, help="JSON-Datei mit gelabelten Fragepaaren")
+    parser.add_argument("--cache-threshold", type=float, default=None, help="Abweichende Schwelle des Antwort-Caches")
+    args = parser.parse_args()
+
+    load_dotenv()
+    db_manager = ChromaDBManager()
+    local_router = LocalQueryRouter(db_manager.collection, db_manager.embeddings)
+    if args.threshold is not None:
+        local_router.similarity_threshold = args.threshold
+    llm_router = None if args.no_llm else LLMQueryRouter(ChatOpenAI(model="gpt-4o-mini"))
+
+    report, rows = evaluate(load_questions(args.questions), local_router, llm_router)
+    print_report(report, rows)
+
+    if args.cache_threshold is not None:
+        db_manager.answer_cache.similarity_threshold = args.cache_threshold
+    cache_report, cache_rows = evaluate_cache(load_questions(args.cache_pairs), db_manager.answer_cache)
+    print_cache_report(cache_report, cache_rows)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+import re
+import time
+import logging
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+from langchain_core.documents import Document
+from langchain_core.prompts import PromptTemplate
+
+@dataclass
+class RoutingDecision:
+    """Entscheidung, ob für eine Frage in der Vektor-Datenbank gesucht werden soll."""
+    use_retrieval: bool
+    confidence: float
+    source: str
+    score: Optional[float] = None
+    documents: List[Document] = field(default_factory=list)
+    duration_seconds: float = 0.0
+
+
+class LLMQueryRouter:
+    """Bisherige Entscheidung per LLM-Aufruf; dient als Rückfallebene und als Referenz für die Evaluierung."""
+
+    DECISION_PROMPT = PromptTemplate.from_template(
+        """Beantworte mit 'yes' oder 'no'.
+
+        Soll für die folgende Frage eine semantische Suche in der Datenbank genutzt werden?
+
+        Frage: {question}
+
+        Antworte mit 'yes' falls es sich um eine persönliche, projektbezogene oder spezifische Frage handelt.
+        Antworte mit 'no' falls es sich um allgemeines Wissen handelt."""
+    )
+
+    def __init__(self, llm):
+        self.chain = self.DECISION_PROMPT | llm
+
+    def route(self, question: str) -> RoutingDecision:
+        started = time.perf_counter()
+        result = self.chain.invoke({"question": question}).content.strip().lower()
+        return RoutingDecision(
+            use_retrieval=result.startswith("yes"),
+            confidence=1.0,
+            source="llm",
+            duration_seconds=time.perf_counter() - started
+        )
+
+
+class LocalQueryRouter:
+    """
+    Entscheidet lokal in Millisekunden, ob Retrieval nötig ist.
+
+    Allgemeine Wissensfragen („Was ist ein …“, „Erkläre …“) haben Vorrang. Sonst
+    entscheiden Possessiv plus Projektbegriff („mein Projekt“, „meine ToDo-Liste“) direkt
+    für Retrieval. Alle übrigen Fragen entscheidet die Kosinus-Ähnlichkeit des besten
+    Treffers in der Datenbank; einzelne Projektbegriffe wie „Notion“ senken dabei nur die
+    Schwelle. Liegt die Ähnlichkeit nahe an der Schwelle, wird – falls vorhanden – der
+    LLM-Router gefragt. Die gefundenen Dokumente werden in der Entscheidung mitgeliefert,
+    damit sie nicht erneut gesucht werden müssen.
+    """
+
+    PERSONAL_PATTERN = re.compile(
+        r"\b(mein|meine|meinem|meinen|meiner|meines|unser|unsere|unserem|unseren|unserer|unseres|my|our)\s+"
+        r"(?:[\w-]+\s+)?[\w-]*?(projekt|notiz|idee|aufgabe|todo|to-do|liste|zwischenablage|"
+        r"project|note|idea|task|list|clipboard)",
+        re.IGNORECASE
+    )
+    PROJECT_KEYWORD_PATTERN = re.compile(
+        r"\b(jarvis|notion|todo|todos|to-do|zwischenablage|clipboard|notiz|notizen)\b",
+        re.IGNORECASE
+    )
+    GENERAL_PATTERN = re.compile(
+        r"^\s*(?:jarvis\W+)?(was ist (ein|eine|der|die|das)|was sind|wer (war|ist)|wie funktioniert|wie viele|"
+        r"erkläre|erklär|definiere|warum|wieso|what is|what are|who (was|is)|how does|explain|define|why)\b",
+        re.IGNORECASE
+    )
+
+    def __init__(self, collection, embeddings, k: int = 4, similarity_threshold: float = 0.3,
+                 uncertainty_margin: float = 0.05, fallback_router: Optional[LLMQueryRouter] = None):
+        """
+        Args:
+            collection (chromadb.Collection): Collection der Vektor-Datenbank, in der gesucht wird.
+            embeddings (Embeddings): Embedding-Modell der Datenbank (idealerweise mit Cache).
+            k (int): Anzahl gesuchter Dokumente.
+            similarity_threshold (float): Kosinus-Ähnlichkeit, ab der Retrieval genutzt wird.
+            uncertainty_margin (float): Bereich um die Schwelle, in dem der Fallback-Router gefragt wird.
+            fallback_router (LLMQueryRouter, optional): Router für unsichere Fälle.
+        """
+        self.logger = logging.getLogger(__name__)
+        self.collection = collection
+        self.embeddings = embeddings
+        self.k = k
+        self.similarity_threshold = similarity_threshold
+        self.uncertainty_margin = uncertainty_margin
+        self.fallback_router = fallback_router
+
+    def route(self, question: str, allow_fallback: bool = True, search_result=None) -> RoutingDecision:
+        """
+        Args:
+            search_result (tuple, optional): Bereits vorliegendes Ergebnis von ``search`` für die Frage.
+        """
+        started = time.perf_counter()
+        decision = self._route(question, allow_fallback, search_result)
+        decision.duration_seconds = time.perf_counter() - started
+        self.logger.info(
+            "Routing: %s (Quelle %s, Score %s, %.0f ms)",
+            "Retrieval" if decision.use_retrieval else "direkt", decision.source,
+            f"{decision.score:.2f}" if decision.score is not None else "-", decision.duration_seconds * 1000
+        )
+        return decision
+
+    def _route(self, question: str, allow_fallback: bool, search_result) -> RoutingDecision:
+        general = bool(self.GENERAL_PATTERN.search(question))
+        personal = not general and bool(self.PERSONAL_PATTERN.search(question))
+        documents, score = search_result if search_result is not None else self.search(question)
+
+        if score is None:
+            # Leere Datenbank: Retrieval kann nichts beitragen
+            return RoutingDecision(False, 1.0, "empty", None)
+        if personal:
+            return RoutingDecision(True, 0.9, "keywords", score, documents)
+
+        # Allgemeine Wissensfragen brauchen einen deutlicheren Treffer, Projektbegriffe einen schwächeren
+        threshold = self.similarity_threshold
+        if general:
+            threshold += self.uncertainty_margin
+        elif self.PROJECT_KEYWORD_PATTERN.search(question):
+            threshold -= self.uncertainty_margin
+        distance = score - threshold
+        if abs(distance) >= self.uncertainty_margin:
+            return RoutingDecision(distance > 0, min(1.0, 0.5 + abs(distance)), "similarity", score, documents)
+
+        if self.fallback_router and allow_fallback:
+            decision = self.fallback_router.route(question)
+            decision.score = score
+            decision.documents = documents
+            decision.source = "llm_fallback"
+            return decision
+
+        return RoutingDecision(distance > 0, 0.5, "similarity", score, documents)
+
+    def search(self, question: str):
+        """Sucht die ``k`` ähnlichsten Chunks und liefert sie samt bester Kosinus-Ähnlichkeit."""
+        if self.collection.count() == 0:
+            return [], None
+
+        vector = self.embeddings.embed_query(question)
+        result = self.collection.query(query_embeddings=[vector], n_results=self.k,
+                                  include=["documents", "metadatas", "distances"])
+
+        space = (self.collection.metadata or {}).get("hnsw:space", "l2")
+        similarities = [self._to_cosine_similarity(distance, space) for distance in result["distances"][0]]
+        documents = [
+            Document(id=doc_id, page_content=content, metadata=metadata or {})
+            for doc_id, content, metadata in zip(result["ids"][0], result["documents"][0], result["metadatas"][0])
+        ]
+        return documents, max(similarities) if similarities else None
+
+    @staticmethod
+    def _to_cosine_similarity(distance: float, space: str) -> float:
+        # OpenAI-Embeddings sind normiert: quadrierte L2-Distanz = 2 - 2 * cos
+        if space == "l2":
+            return 1.0 - distance / 2.0
+        return 1.0 - distance
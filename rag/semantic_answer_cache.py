@@ -0,0 +1,237 @@
+import re
+import time
+import logging
+import threading
+import weakref
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime, time as day_time, timedelta
+from typing import Dict, FrozenSet, Iterable, List, Optional
+
+import numpy as np
+from langchain_core.documents import Document
+
+@dataclass
+class CachedAnswer:
+    """Eine gespeicherte Antwort samt Frage-Embedding und Stand der Quellseiten."""
+    question: str
+    answer: str
+    vector: np.ndarray
+    expires_at: float
+    entities: FrozenSet[str] = frozenset()
+    sources: Dict[str, str] = field(default_factory=dict)
+    hits: int = 0
+
+
+class SemanticAnswerCache:
+    """
+    Antwort-Cache für wiederholte Fragen.
+
+    Fragen werden über die Kosinus-Ähnlichkeit ihrer Embeddings mit früheren Fragen
+    verglichen. Da Embeddings Fragen mit anderem Datum oder anderer Zahl („am Montag“ vs.
+    „am Dienstag“) fast gleich bewerten, müssen zusätzlich Zahlen sowie Wochentage, Monate
+    und relative Zeitangaben übereinstimmen. Ein Treffer gilt nur, solange der
+    ``last_edited``-Stand aller Quellseiten in der Datenbank unverändert ist; zusätzlich
+    verwirft ``invalidate_pages`` beim Neuindizieren einer Seite sofort alle Antworten, die
+    auf ihr beruhen. Antworten ohne Quellen (direkte LLM-Antworten, leerer Kontext) lassen
+    sich so nicht invalidieren und werden gar nicht gespeichert. Fragen mit relativen
+    Zeitangaben („heute“, „am Montag“) bedeuten am nächsten Tag etwas anderes; ihre
+    Antworten verfallen deshalb um Mitternacht.
+    """
+
+    ENTITY_PATTERN = re.compile(
+        r"\b(\d+(?:[.,:/]\d+)*|montag|dienstag|mittwoch|donnerstag|freitag|samstag|sonntag|"
+        r"monday|tuesday|wednesday|thursday|friday|saturday|sunday|januar|january|februar|february|"
+        r"märz|march|april|mai|may|juni|june|juli|july|august|september|oktober|october|november|"
+        r"dezember|december|heute|morgen|gestern|übermorgen|vorgestern|today|tomorrow|yesterday|"
+        r"letzte[nmrs]?|nächste[nmrs]?|last|next)\b",
+        re.IGNORECASE
+    )
+    RELATIVE_TIME_ENTITIES = frozenset({
+        "heute", "morgen", "gestern", "übermorgen", "vorgestern", "today", "tomorrow", "yesterday",
+        "last", "next", "montag", "dienstag", "mittwoch", "donnerstag", "freitag", "samstag", "sonntag",
+        "monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday",
+    })
+
+    _instances = weakref.WeakSet()
+    _instances_lock = threading.Lock()
+
+    def __init__(self, db, embeddings, similarity_threshold: float = 0.96, max_entries: int = 500,
+                 max_age_seconds: float = 7 * 24 * 3600):
+        """
+        Args:
+            db (Chroma): Vektor-Datenbank, deren Metadaten den Stand der Quellseiten liefern.
+            embeddings (Embeddings): Embedding-Modell für die Fragen (idealerweise mit Cache).
+            similarity_threshold (float): Kosinus-Ähnlichkeit, ab der zwei Fragen als gleich gelten.
+            max_entries (int): Maximale Anzahl gespeicherter Antworten (LRU).
+            max_age_seconds (float): Maximales Alter einer Antwort.
+        """
+        self.logger = logging.getLogger(__name__)
+        self.db = db
+        self.embeddings = embeddings
+        self.similarity_threshold = similarity_threshold
+        self.max_entries = max_entries
+        self.max_age_seconds = max_age_seconds
+        self.hits = 0
+        self.misses = 0
+
+        self._entries: "OrderedDict[int, CachedAnswer]" = OrderedDict()
+        self._next_id = 0
+        self._matrix = None
+        self._matrix_ids: List[int] = []
+        self._lock = threading.Lock()
+
+        with self._instances_lock:
+            self._instances.add(self)
+
+    @classmethod
+    def invalidate_pages_everywhere(cls, page_ids: Iterable[str]):
+        """Verwirft in allen Caches des Prozesses die Antworten, die auf den Seiten beruhen."""
+        page_ids = set(page_ids)
+        with cls._instances_lock:
+            instances = list(cls._instances)
+        for cache in instances:
+            cache.invalidate_pages(page_ids)
+
+    def lookup(self, question: str) -> Optional[str]:
+        """Liefert eine gespeicherte Antwort auf eine ausreichend ähnliche Frage oder None."""
+        started = time.perf_counter()
+        with self._lock:
+            if not self._entries:
+                self.misses += 1
+                return None
+
+        vector = self._embed(question)
+        with self._lock:
+            if self._matrix is None:
+                self._rebuild_matrix()
+            if not self._matrix_ids:
+                self.misses += 1
+                return None
+
+            similarities = self._matrix @ vector
+            entities = self.extract_entities(question)
+            entry_id, entry, similarity = None, None, 0.0
+            # Ähnlichste Frage mit denselben Zeit- und Zahlenangaben
+            for index in np.argsort(-similarities):
+                if similarities[index] < self.similarity_threshold:
+                    break
+                candidate = self._entries.get(self._matrix_ids[index])
+                if candidate is not None and candidate.entities == entities:
+                    entry_id, entry, similarity = self._matrix_ids[index], candidate, float(similarities[index])
+                    break
+
+        if entry is None:
+            self.misses += 1
+            return None
+
+        if time.time() >= entry.expires_at or not self._sources_unchanged(entry):
+            self._remove(entry_id)
+            self.misses += 1
+            return None
+
+        with self._lock:
+            if entry_id in self._entries:
+                self._entries.move_to_end(entry_id)
+            entry.hits += 1
+            self.hits += 1
+
+        self.logger.info(
+            "⚡ Antwort aus dem Cache (Ähnlichkeit %.3f zu „%s“, %.0f ms)",
+            similarity, entry.question, (time.perf_counter() - started) * 1000
+        )
+        return entry.answer
+
+    def store(self, question: str, answer: str, documents: Optional[List[Document]] = None):
+        """Speichert eine Antwort mit dem aktuellen Stand ihrer Quellseiten; Antworten ohne Quellen werden verworfen."""
+        if not answer:
+            return
+
+        sources = {}
+        for doc in documents or []:
+            page_id = doc.metadata.get("source")
+            if page_id:
+                sources[page_id] = max(sources.get(page_id, ""), doc.metadata.get("last_edited") or "")
+        if not sources:
+            return
+
+        entities = self.extract_entities(question)
+        entry = CachedAnswer(question=question, answer=answer, vector=self._embed(question),
+                             expires_at=self._expires_at(entities), entities=entities, sources=sources)
+        with self._lock:
+            self._entries[self._next_id] = entry
+            self._next_id += 1
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            self._matrix = None
+
+    def invalidate_pages(self, page_ids: Iterable[str]):
+        """Verwirft alle Antworten, die auf einer der Seiten beruhen."""
+        page_ids = set(page_ids)
+        with self._lock:
+            stale = [entry_id for entry_id, entry in self._entries.items() if page_ids & entry.sources.keys()]
+            for entry_id in stale:
+                del self._entries[entry_id]
+            if stale:
+                self._matrix = None
+        if stale:
+            self.logger.info("🧹 %d Antwort(en) wegen neu indizierter Seiten aus dem Cache entfernt", len(stale))
+
+    def similarity(self, question: str, other: str) -> float:
+        """Kosinus-Ähnlichkeit zweier Fragen, z. B. zur Evaluierung der Schwelle."""
+        return float(self._embed(question) @ self._embed(other))
+
+    def is_same_question(self, question: str, other: str) -> bool:
+        """Ob eine Antwort auf ``other`` aus dem Cache für ``question`` verwendet würde."""
+        return (self.extract_entities(question) == self.extract_entities(other)
+                and self.similarity(question, other) >= self.similarity_threshold)
+
+    @classmethod
+    def extract_entities(cls, question: str) -> FrozenSet[str]:
+        """Zahlen, Wochentage, Monate und relative Zeitangaben der Frage."""
+        return frozenset(match.lower().replace(",", ".") for match in cls.ENTITY_PATTERN.findall(question))
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._matrix = None
+
+    def _expires_at(self, entities: FrozenSet[str]) -> float:
+        now = time.time()
+        expires_at = now + self.max_age_seconds
+        if self._is_relative(entities):
+            tomorrow = datetime.fromtimestamp(now).date() + timedelta(days=1)
+            expires_at = min(expires_at, datetime.combine(tomorrow, day_time.min).timestamp())
+        return expires_at
+
+    @classmethod
+    def _is_relative(cls, entities: FrozenSet[str]) -> bool:
+        return any(
+            entity in cls.RELATIVE_TIME_ENTITIES or entity.startswith(("letzte", "nächste"))
+            for entity in entities
+        )
+
+    def _sources_unchanged(self, entry: CachedAnswer) -> bool:
+        result = self.db.get(where={"source": {"$in": list(entry.sources)}}, include=["metadatas"])
+        current = {}
+        for metadata in result["metadatas"]:
+            page_id = metadata.get("source")
+            current[page_id] = max(current.get(page_id, ""), metadata.get("last_edited") or "")
+        return current == entry.sources
+
+    def _remove(self, entry_id: int):
+        with self._lock:
+            if self._entries.pop(entry_id, None) is not None:
+                self._matrix = None
+
+    def _rebuild_matrix(self):
+        self._matrix_ids = list(self._entries)
+        if self._matrix_ids:
+            self._matrix = np.vstack([self._entries[entry_id].vector for entry_id in self._matrix_ids])
+        else:
+            self._matrix = np.zeros((0, 0), dtype=np.float32)
+
+    def _embed(self, question: str) -> np.ndarray:
+        vector = np.asarray(self.embeddings.embed_query(question.strip()), dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
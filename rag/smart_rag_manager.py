@@ -1,49 +1,206 @@
+import asyncio
 import logging
-from langchain.chains.llm import LLMChain
-from langchain_core.prompts import PromptTemplate
+import statistics
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Deque, Dict
+
 from langchain_openai import ChatOpenAI
 from rag.chroma_db_manager import ChromaDBManager
+from rag.query_router import LLMQueryRouter, LocalQueryRouter, RoutingDecision
+
+@dataclass
+class BranchStats:
+    """Laufzeiten und Abbrüche eines Zweigs der spekulativen Abfrage."""
+    name: str
+    started: int = 0
+    chosen: int = 0
+    cancelled: int = 0
+    failed: int = 0
+    durations: Deque[float] = field(default_factory=lambda: deque(maxlen=200))
+
+    @property
+    def median_seconds(self) -> float:
+        return statistics.median(self.durations) if self.durations else 0.0
+
+
+@dataclass
+class SpeculationStats:
+    """Kennzahlen der spekulativen Abfragen, um Latenz gegen Token-Kosten abzuwägen."""
+    queries: int = 0
+    branches: Dict[str, BranchStats] = field(default_factory=dict)
+
+    def branch(self, name: str) -> BranchStats:
+        return self.branches.setdefault(name, BranchStats(name))
+
+    def format(self) -> str:
+        lines = [f"{self.queries} spekulative Abfragen"]
+        for branch in self.branches.values():
+            lines.append(
+                f"  {branch.name:<10} gestartet {branch.started}, gewählt {branch.chosen}, "
+                f"abgebrochen {branch.cancelled}, Fehler {branch.failed}, Median {branch.median_seconds * 1000:.0f} ms"
+            )
+        return "\n".join(lines)
+
 
 class SmartRAGManager:
     """Steuert die dynamische Entscheidung, ob Retrieval genutzt wird."""
 
-    def __init__(self):
+    def __init__(self, llm_fallback: bool = True, speculative: bool = False):
+        """
+        Args:
+            llm_fallback (bool): Unsichere Routing-Entscheidungen zusätzlich vom LLM treffen lassen.
+            speculative (bool): Routing, RAG-Antwort und direkte Antwort standardmäßig parallel starten.
+        """
         self.logger = logging.getLogger(__name__)
         self.db_manager = ChromaDBManager()
         self.llm = ChatOpenAI(model="gpt-4o-mini")
 
-        # Entscheidungs-Prompt
-        self.decision_prompt = PromptTemplate.from_template(
-            """Beantworte mit 'yes' oder 'no'.
-    
-            Soll für die folgende Frage eine semantische Suche in der Datenbank genutzt werden?
-    
-            Frage: {question}
-    
-            Antworte mit 'yes' falls es sich um eine persönliche, projektbezogene oder spezifische Frage handelt.
-            Antworte mit 'no' falls es sich um allgemeines Wissen handelt."""
+        # Lokale Entscheidung in Millisekunden, das LLM nur für Grenzfälle
+        self.router = LocalQueryRouter(
+            self.db_manager.collection,
+            self.db_manager.embeddings,
+            fallback_router=LLMQueryRouter(self.llm) if llm_fallback else None
         )
+        self.speculative = speculative
+        self.speculation_stats = SpeculationStats()
+
+    def route(self, question: str) -> RoutingDecision:
+        """Entscheidet, ob eine semantische Suche notwendig ist, und liefert die dabei gefundenen Dokumente."""
+        decision = self.router.route(question)
+        self.logger.info("Entscheidung für Retrieval: %s (%s)", "yes" if decision.use_retrieval else "no", decision.source)
+        return decision
 
     def should_use_retrieval(self, question: str) -> bool:
-        """Lässt das LLM entscheiden, ob eine semantische Suche notwendig ist."""
-        decision_chain = LLMChain(llm=self.llm, prompt=self.decision_prompt)
-        result = decision_chain.run(question).strip().lower()
-        self.logger.info("Entscheidung für Retrieval: %s", result)
-        return result == "yes"
+        """Entscheidet, ob eine semantische Suche notwendig ist."""
+        return self.route(question).use_retrieval
 
-    def query(self, query: str, chat_history=None) -> str:
+    def query(self, query: str, chat_history=None, speculative=None) -> str:
         """Dynamische Entscheidungslogik für die Abfrage."""
         if chat_history is None:
             chat_history = []
+        if speculative if speculative is not None else self.speculative:
+            try:
+                asyncio.get_running_loop()
+            except RuntimeError:
+                return asyncio.run(self.aquery_speculative(query, chat_history))
+            raise RuntimeError("❌ query() läuft bereits in einem Event-Loop, bitte 'await aquery_speculative(...)' verwenden")
+        
+        cached_answer = self._cached_answer(query, chat_history)
+        if cached_answer is not None:
+            return cached_answer
             
-        use_retrieval = self.should_use_retrieval(query)
+        # Folgefragen erst mit dem Verlauf umformulieren, damit Routing und Suche die eigenständige Frage sehen
+        search_query = self._condense_question(query, chat_history)
+        decision = self.route(search_query)
             
-        if use_retrieval:
+        if decision.use_retrieval:
             self.logger.info("Verwende RAG für die Abfrage.")
-            result = self.db_manager.rag_chain.invoke({"input": query, "chat_history": chat_history})
-            return result["answer"]
+            # Die Dokumente der Routing-Suche direkt verwenden statt erneut zu suchen
+            answer = self.db_manager.question_answer_chain.invoke(
+                {"input": search_query, "chat_history": chat_history, "context": decision.documents}
+            )
+            self._store_answer(query, chat_history, answer, decision.documents)
+            return answer
             
         else:
             self.logger.info("Kein RAG notwendig, nutze direkte LLM-Antwort.")
-            direct_answer = self.llm.invoke(query)
-            return direct_answer.content
+            # Direkte Antworten haben keine Quellseiten, über die sie invalidiert werden könnten
+            return self.llm.invoke(query).content
+
+    async def aquery_speculative(self, query: str, chat_history=None) -> str:
+        """
+        Startet Vektorsuche und direkte Antwort gleichzeitig. Das Ergebnis der einen Suche
+        dient sowohl der Routing-Entscheidung als auch der RAG-Antwort, die sofort danach
+        startet. Sobald das Routing feststeht, wird der gewählte Zweig abgewartet und der
+        andere abgebrochen. Das kostet im Mittel zusätzliche Tokens, spart aber die
+        Wartezeit auf die Entscheidung; ``speculation_stats`` zeigt, ob sich das lohnt.
+        Folgefragen werden vor der Suche mit dem Verlauf umformuliert.
+        """
+        if chat_history is None:
+            chat_history = []
+        cached_answer = await asyncio.to_thread(self._cached_answer, query, chat_history)
+        if cached_answer is not None:
+            return cached_answer
+        self.speculation_stats.queries += 1
+
+        search = asyncio.create_task(self._search(query, chat_history))
+        retrieval = asyncio.create_task(self._timed_branch("retrieval", self._answer_from_search(chat_history, search)))
+        direct = asyncio.create_task(self._timed_branch("direct", self.llm.ainvoke(query)))
+
+        try:
+            decision = await self._timed_branch("routing", self._route_from_search(search))
+        except BaseException:
+            search.cancel()
+            retrieval.cancel()
+            direct.cancel()
+            raise
+
+        chosen, discarded = ("retrieval", "direct") if decision.use_retrieval else ("direct", "retrieval")
+        tasks = {"retrieval": retrieval, "direct": direct}
+        self.speculation_stats.branch(chosen).chosen += 1
+        if not tasks[discarded].done():
+            tasks[discarded].cancel()
+            self.speculation_stats.branch(discarded).cancelled += 1
+        # Fehler des verworfenen Zweigs abholen, damit asyncio sie nicht als unbehandelt meldet
+        tasks[discarded].add_done_callback(lambda task: task.cancelled() or task.exception())
+
+        self.logger.info("Spekulative Abfrage: %s gewählt (%s)", chosen, decision.source)
+        result = await tasks[chosen]
+        if decision.use_retrieval:
+            self._store_answer(query, chat_history, result["answer"], result["context"])
+            return result["answer"]
+        return result.content
+
+    async def _search(self, query: str, chat_history):
+        search_query = await self._acondense_question(query, chat_history)
+        return search_query, await asyncio.to_thread(self.router.search, search_query)
+
+    async def _route_from_search(self, search):
+        search_query, search_result = await asyncio.shield(search)
+        return await asyncio.to_thread(self.router.route, search_query, True, search_result)
+
+    async def _answer_from_search(self, chat_history, search):
+        search_query, (documents, _) = await asyncio.shield(search)
+        answer = await self.db_manager.question_answer_chain.ainvoke(
+            {"input": search_query, "chat_history": chat_history, "context": documents}
+        )
+        return {"answer": answer, "context": documents}
+
+    def _condense_question(self, query: str, chat_history) -> str:
+        # Ohne Verlauf ist die Frage bereits eigenständig und der LLM-Aufruf entfällt
+        if not chat_history:
+            return query
+        condensed = self.db_manager.condense_question_chain.invoke({"input": query, "chat_history": chat_history})
+        return condensed.strip() or query
+
+    async def _acondense_question(self, query: str, chat_history) -> str:
+        if not chat_history:
+            return query
+        condensed = await self.db_manager.condense_question_chain.ainvoke({"input": query, "chat_history": chat_history})
+        return condensed.strip() or query
+
+    def _cached_answer(self, query: str, chat_history):
+        # Folgefragen hängen vom Verlauf ab und werden daher nicht aus dem Cache beantwortet
+        if chat_history:
+            return None
+        return self.db_manager.answer_cache.lookup(query)
+
+    def _store_answer(self, query: str, chat_history, answer: str, documents=None):
+        if not chat_history:
+            self.db_manager.answer_cache.store(query, answer, documents)
+
+    async def _timed_branch(self, name: str, awaitable):
+        stats = self.speculation_stats.branch(name)
+        stats.started += 1
+        started = time.perf_counter()
+        try:
+            result = await awaitable
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            stats.failed += 1
+            raise
+        stats.durations.append(time.perf_counter() - started)
+        return result
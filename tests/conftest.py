@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Tests importieren die Pakete wie main.py vom Repository-Wurzelverzeichnis aus
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
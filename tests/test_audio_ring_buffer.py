@@ -0,0 +1,73 @@
+import threading
+
+import numpy as np
+
+from jarvis.audio.audio_ring_buffer import AudioRingBuffer
+
+
+def samples(start, end):
+    return np.arange(start, end, dtype=np.int16)
+
+
+def test_read_within_capacity():
+    buffer = AudioRingBuffer(10)
+    buffer.write(samples(0, 6))
+    assert buffer.written == 6
+    assert buffer.read(2, 5).tolist() == [2, 3, 4]
+
+
+def test_wraparound_read_is_contiguous():
+    buffer = AudioRingBuffer(10)
+    buffer.write(samples(0, 8))
+    buffer.write(samples(8, 14))
+    assert buffer.written == 14
+    assert buffer.read(6, 14).tolist() == list(range(6, 14))
+
+
+def test_overwritten_samples_are_missing():
+    buffer = AudioRingBuffer(10)
+    buffer.write(samples(0, 14))
+    assert buffer.read(0, 14).tolist() == list(range(4, 14))
+    assert buffer.read(0, 3).tolist() == []
+
+
+def test_write_larger_than_capacity_keeps_absolute_indices():
+    buffer = AudioRingBuffer(10)
+    buffer.write(samples(0, 3))
+    buffer.write(samples(3, 25))
+    assert buffer.written == 25
+    assert buffer.read(15, 25).tolist() == list(range(15, 25))
+
+
+def test_read_is_a_copy():
+    buffer = AudioRingBuffer(4)
+    buffer.write(samples(0, 4))
+    chunk = buffer.read(0, 4)
+    buffer.write(samples(10, 14))
+    assert chunk.tolist() == [0, 1, 2, 3]
+
+
+def test_read_past_written_is_clamped():
+    buffer = AudioRingBuffer(10)
+    buffer.write(samples(0, 5))
+    assert buffer.read(3, 100).tolist() == [3, 4]
+
+
+def test_reset_starts_indices_at_zero():
+    buffer = AudioRingBuffer(10)
+    buffer.write(samples(0, 7))
+    buffer.reset()
+    buffer.write(samples(100, 103))
+    assert buffer.read(0, 3).tolist() == [100, 101, 102]
+
+
+def test_wait_for_returns_when_enough_samples_arrive():
+    buffer = AudioRingBuffer(10)
+    threading.Timer(0.02, buffer.write, args=(samples(0, 5),)).start()
+    assert buffer.wait_for(5, timeout=1) == 5
+
+
+def test_wait_for_times_out():
+    buffer = AudioRingBuffer(10)
+    buffer.write(samples(0, 2))
+    assert buffer.wait_for(5, timeout=0.01) == 2
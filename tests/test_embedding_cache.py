@@ -0,0 +1,84 @@
+import itertools
+from types import SimpleNamespace
+
+import pytest
+
+from rag import embedding_cache
+from rag.embedding_cache import CachedEmbeddings, SQLiteEmbeddingCache
+
+
+@pytest.fixture(autouse=True)
+def fake_clock(monkeypatch):
+    # Jeder Aufruf ist eine Sekunde später, damit die LRU-Reihenfolge eindeutig ist
+    ticks = itertools.count(1)
+    monkeypatch.setattr(embedding_cache, "time", SimpleNamespace(time=lambda: float(next(ticks))))
+
+
+def make_cache(tmp_path, **kwargs):
+    return SQLiteEmbeddingCache(str(tmp_path / "cache.sqlite3"), **kwargs)
+
+
+def stored_keys(cache):
+    return {key for (key,) in cache._connection.execute("SELECT key FROM embeddings")}
+
+
+def test_round_trip(tmp_path):
+    cache = make_cache(tmp_path)
+    cache.put_many(["a"], [[0.5, 1.0]])
+    assert cache.get_many(["a", "missing"]) == [[0.5, 1.0], None]
+
+
+def test_evicts_least_recently_used(tmp_path):
+    cache = make_cache(tmp_path, max_entries=2, max_bytes=None)
+    cache.put_many(["a"], [[1.0]])
+    cache.put_many(["b"], [[2.0]])
+    cache.get_many(["a"])
+    cache.put_many(["c"], [[3.0]])
+    assert stored_keys(cache) == {"a", "c"}
+
+
+def test_evicts_by_size(tmp_path):
+    # Ein Vektor mit vier float32-Werten belegt 16 Bytes
+    cache = make_cache(tmp_path, max_entries=100, max_bytes=40)
+    for key in "abc":
+        cache.put_many([key], [[1.0] * 4])
+    assert stored_keys(cache) == {"b", "c"}
+    assert cache._total_bytes == 32
+
+
+def test_replacing_an_entry_is_not_counted_twice(tmp_path):
+    cache = make_cache(tmp_path, max_entries=2, max_bytes=None)
+    cache.put_many(["a", "b"], [[1.0], [2.0]])
+    cache.put_many(["a"], [[1.5]])
+    cache.put_many(["a", "a"], [[1.5], [1.5]])
+    assert cache._entry_count == 2
+    assert stored_keys(cache) == {"a", "b"}
+
+
+def test_counters_are_restored_when_reopened(tmp_path):
+    cache = make_cache(tmp_path)
+    cache.put_many(["a", "b"], [[1.0, 2.0], [3.0, 4.0]])
+    reopened = make_cache(tmp_path)
+    assert (reopened._entry_count, reopened._total_bytes) == (2, 16)
+
+
+class CountingEmbeddings:
+    def __init__(self):
+        self.calls = []
+
+    def embed_documents(self, texts):
+        self.calls.append(list(texts))
+        return [[float(len(text))] for text in texts]
+
+    def embed_query(self, text):
+        self.calls.append([text])
+        return [float(len(text))]
+
+
+def test_cached_embeddings_only_embed_missing_texts(tmp_path):
+    inner = CountingEmbeddings()
+    embeddings = CachedEmbeddings(inner, "model", make_cache(tmp_path))
+    assert embeddings.embed_documents(["ab", "abc"]) == [[2.0], [3.0]]
+    assert embeddings.embed_documents(["abc", "abcd"]) == [[3.0], [4.0]]
+    assert embeddings.embed_query("ab") == [2.0]
+    assert inner.calls == [["ab", "abc"], ["abcd"]]
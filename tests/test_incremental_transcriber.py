@@ -0,0 +1,115 @@
+import io
+import wave
+
+import numpy as np
+
+from jarvis.core.speech_to_text.incremental_transcriber import IncrementalTranscriber
+from jarvis.core.speech_to_text.transcription_backend import TranscriptionBackend
+
+SAMPLERATE = 100
+
+
+class FakeBackend(TranscriptionBackend):
+    """Liefert vorgegebene Texte und merkt sich die Länge des übergebenen Audios."""
+
+    def __init__(self, *texts):
+        self.texts = list(texts)
+        self.sample_counts = []
+
+    def transcribe(self, audio_bytes, file_name, language=None):
+        with wave.open(io.BytesIO(audio_bytes), "rb") as wf:
+            self.sample_counts.append(wf.getnframes())
+        return self.texts.pop(0)
+
+
+def make_transcriber(backend=None):
+    # 8 s Fenster = 800 Samples, 1,5 s Überlappung = 150 Samples
+    return IncrementalTranscriber(backend or FakeBackend(), SAMPLERATE)
+
+
+def stitch(committed, words):
+    return " ".join(IncrementalTranscriber.stitch(committed.split(), words.split()))
+
+
+def test_stitch_without_committed_text_returns_hypothesis():
+    assert stitch("", "hallo welt") == "hallo welt"
+
+
+def test_stitch_without_hypothesis_keeps_committed_text():
+    assert stitch("hallo welt", "") == "hallo welt"
+
+
+def test_stitch_removes_overlapping_words():
+    assert stitch("wie wird das wetter", "das wetter morgen in berlin") == "wie wird das wetter morgen in berlin"
+
+
+def test_stitch_prefers_longest_overlap():
+    assert stitch("ja ja ja", "ja ja nein") == "ja ja ja nein"
+
+
+def test_stitch_ignores_case_and_punctuation_in_overlap():
+    assert stitch("Schalte das Licht", "licht, bitte aus.") == "Schalte das Licht bitte aus."
+
+
+def test_stitch_replaces_revised_tail_at_two_word_anchor():
+    # Das unsichere Ende ("im Kalender") wurde im neuen Fenster anders erkannt
+    assert stitch("trag den termin im kalender", "den termin am montag ein") == "trag den termin am montag ein"
+
+
+def test_stitch_appends_when_nothing_overlaps():
+    assert stitch("guten morgen", "wie spät ist es") == "guten morgen wie spät ist es"
+
+
+def test_stitch_only_searches_within_max_overlap():
+    committed = ["eins"] + [f"w{i}" for i in range(20)]
+    words = ["eins", "zwei"]
+    assert IncrementalTranscriber.stitch(committed, words, max_overlap=5) == committed + words
+
+
+def test_update_returns_partial_without_committing_short_window():
+    transcriber = make_transcriber()
+    transcriber._window_start = 0
+
+    partial = transcriber._update("wie wird das wetter".split(), 500)
+
+    assert partial == "wie wird das wetter"
+    assert transcriber._committed == []
+    assert not transcriber._window_advanced
+
+
+def test_update_commits_stable_part_and_advances_window():
+    transcriber = make_transcriber()
+    transcriber._window_start = 0
+
+    transcriber._update("wie wird das wetter morgen in".split(), 800)
+
+    assert transcriber._committed == "wie wird das wetter".split()
+    assert transcriber._window_start == 800 - 150
+    assert transcriber._window_advanced
+
+    partial = transcriber._update("morgen in berlin".split(), 900)
+    assert partial == "wie wird das wetter morgen in berlin"
+
+
+def test_finalize_transcribes_whole_utterance_before_first_commit():
+    backend = FakeBackend("hallo welt")
+    transcriber = make_transcriber(backend)
+    transcriber._window_start = 120
+
+    text = transcriber.finalize(np.zeros(300, dtype=np.int16), audio_start=100)
+
+    assert text == "hallo welt"
+    assert backend.sample_counts == [300]
+
+
+def test_finalize_transcribes_only_last_window_and_stitches():
+    backend = FakeBackend("wetter morgen in berlin")
+    transcriber = make_transcriber(backend)
+    transcriber._window_start = 100
+    transcriber._update("wie wird das wetter morgen in".split(), 900)
+
+    text = transcriber.finalize(np.zeros(1000, dtype=np.int16), audio_start=100)
+
+    # Fenster beginnt bei 900 - 150 = 750, also 650 Samples nach Aufnahmebeginn
+    assert backend.sample_counts == [1000 - 650]
+    assert text == "wie wird das wetter morgen in berlin"
@@ -0,0 +1,147 @@
+import asyncio
+import time
+from email.utils import format_datetime
+from datetime import datetime, timedelta, timezone
+
+import httpx
+import pytest
+
+from tools.notion.core.notion_http_transport import NotionHttpTransport, TokenBucketRateLimiter
+
+
+def make_transport(handler, **kwargs):
+    transport = NotionHttpTransport(base_url="https://notion.test/v1", backoff_base=0.001, backoff_max=0.01,
+                                    requests_per_second=1000, burst=100, **kwargs)
+    client = httpx.AsyncClient(base_url=transport.base_url, transport=httpx.MockTransport(handler))
+    transport._get_client = lambda: client
+    return transport
+
+
+def counting_handler(responses):
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        result = responses[min(len(calls), len(responses)) - 1]
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    return handler, calls
+
+
+def test_bucket_allows_burst_then_waits_for_refill():
+    async def run():
+        limiter = TokenBucketRateLimiter(rate=20, capacity=3)
+        started = time.monotonic()
+        for _ in range(3):
+            await limiter.acquire()
+        burst_duration = time.monotonic() - started
+        await limiter.acquire()
+        return burst_duration, time.monotonic() - started
+
+    burst_duration, total = asyncio.run(run())
+    assert burst_duration < 0.02
+    assert total >= 0.04
+
+
+def test_bucket_pause_blocks_and_empties_bucket():
+    async def run():
+        limiter = TokenBucketRateLimiter(rate=1000, capacity=5)
+        limiter.pause(0.1)
+        started = time.monotonic()
+        await limiter.acquire()
+        return time.monotonic() - started
+
+    assert asyncio.run(run()) >= 0.09
+
+
+def test_bucket_pause_never_shortens_an_existing_pause():
+    limiter = TokenBucketRateLimiter(rate=1, capacity=1)
+    limiter.pause(10)
+    limiter.pause(1)
+    assert limiter._blocked_until - time.monotonic() > 9
+
+
+@pytest.mark.parametrize("header, expected", [
+    ("2", 2.0),
+    ("0.5", 0.5),
+    ("-3", 0.0),
+    ("120", 30.0),
+    ("soon", None),
+])
+def test_retry_after_seconds(header, expected):
+    transport = NotionHttpTransport(base_url="https://notion.test/v1")
+    response = httpx.Response(429, headers={"Retry-After": header})
+    assert transport._retry_after_delay(response) == expected
+
+
+def test_retry_after_http_date():
+    transport = NotionHttpTransport(base_url="https://notion.test/v1")
+    retry_at = datetime.now(timezone.utc) + timedelta(seconds=10)
+    response = httpx.Response(503, headers={"Retry-After": format_datetime(retry_at, usegmt=True)})
+    assert 8 <= transport._retry_after_delay(response) <= 10
+
+
+def test_retry_after_missing():
+    transport = NotionHttpTransport(base_url="https://notion.test/v1")
+    assert transport._retry_after_delay(httpx.Response(500)) is None
+
+
+@pytest.mark.parametrize("method, endpoint, expected", [
+    ("get", "blocks/abc/children", True),
+    ("post", "search", True),
+    ("post", "databases/abc/query", True),
+    ("post", "pages", False),
+    ("patch", "blocks/abc/children", False),
+])
+def test_read_only_requests(method, endpoint, expected):
+    assert NotionHttpTransport.is_read_only(method, endpoint) is expected
+
+
+def test_server_errors_are_retried_for_reads():
+    handler, calls = counting_handler([httpx.Response(502), httpx.Response(200, json={})])
+    transport = make_transport(handler)
+    response = asyncio.run(transport.request("post", "databases/abc/query", headers={}))
+    assert response.status_code == 200
+    assert len(calls) == 2
+
+
+def test_server_errors_are_not_retried_for_writes():
+    handler, calls = counting_handler([httpx.Response(502), httpx.Response(200, json={})])
+    transport = make_transport(handler)
+    response = asyncio.run(transport.request("post", "pages", headers={}, json={}))
+    assert response.status_code == 502
+    assert len(calls) == 1
+
+
+def test_rate_limited_writes_are_retried():
+    handler, calls = counting_handler([httpx.Response(429, headers={"Retry-After": "0"}), httpx.Response(200, json={})])
+    transport = make_transport(handler)
+    response = asyncio.run(transport.request("patch", "blocks/abc/children", headers={}, json={}))
+    assert response.status_code == 200
+    assert len(calls) == 2
+
+
+def test_read_timeouts_are_not_retried_for_writes():
+    handler, calls = counting_handler([httpx.ReadTimeout("timeout"), httpx.Response(200, json={})])
+    transport = make_transport(handler)
+    with pytest.raises(httpx.ReadTimeout):
+        asyncio.run(transport.request("post", "pages", headers={}, json={}))
+    assert len(calls) == 1
+
+
+def test_connect_errors_are_retried_for_writes():
+    handler, calls = counting_handler([httpx.ConnectError("refused"), httpx.Response(200, json={})])
+    transport = make_transport(handler)
+    response = asyncio.run(transport.request("post", "pages", headers={}, json={}))
+    assert response.status_code == 200
+    assert len(calls) == 2
+
+
+def test_gives_up_after_max_retries():
+    handler, calls = counting_handler([httpx.Response(503)])
+    transport = make_transport(handler, max_retries=2)
+    response = asyncio.run(transport.request("get", "blocks/abc/children", headers={}))
+    assert response.status_code == 503
+    assert len(calls) == 3
@@ -0,0 +1,79 @@
+from datetime import datetime
+
+import pytest
+
+from tools.notion.notion_sync_scheduler import CronExpression
+
+
+@pytest.mark.parametrize("field, low, high, expected", [
+    ("*", 0, 5, {0, 1, 2, 3, 4, 5}),
+    ("3", 0, 59, {3}),
+    ("1,15", 1, 31, {1, 15}),
+    ("9-12", 0, 23, {9, 10, 11, 12}),
+    ("*/15", 0, 59, {0, 15, 30, 45}),
+    ("0-30/10", 0, 59, {0, 10, 20, 30}),
+    ("5/20", 0, 59, {5, 25, 45}),
+    ("1-3,10", 1, 12, {1, 2, 3, 10}),
+])
+def test_parse_field(field, low, high, expected):
+    assert CronExpression._parse_field(field, low, high) == expected
+
+
+@pytest.mark.parametrize("expression", [
+    "* * * *",
+    "60 * * * *",
+    "* 24 * * *",
+    "* * 0 * *",
+    "* * * 13 *",
+    "5-1 * * * *",
+    "*/0 * * * *",
+    "x * * * *",
+])
+def test_invalid_expressions(expression):
+    with pytest.raises(ValueError):
+        CronExpression(expression)
+
+
+def test_sunday_is_zero_and_seven():
+    assert CronExpression("0 0 * * 7").weekdays == {0}
+    assert CronExpression("0 0 * * 0").weekdays == {0}
+
+
+def test_daily_at():
+    cron = CronExpression.daily_at("03:30")
+    assert cron.next_after(datetime(2025, 1, 1, 3, 29, 59)) == datetime(2025, 1, 1, 3, 30)
+    assert cron.next_after(datetime(2025, 1, 1, 3, 30)) == datetime(2025, 1, 2, 3, 30)
+
+
+def test_next_after_is_strictly_later():
+    cron = CronExpression("*/15 * * * *")
+    assert cron.next_after(datetime(2025, 1, 1, 10, 15)) == datetime(2025, 1, 1, 10, 30)
+    assert cron.next_after(datetime(2025, 1, 1, 10, 14, 30)) == datetime(2025, 1, 1, 10, 15)
+
+
+def test_next_after_rolls_over_year():
+    cron = CronExpression("0 9 1 1 *")
+    assert cron.next_after(datetime(2025, 6, 1)) == datetime(2026, 1, 1, 9, 0)
+
+
+def test_next_after_weekday():
+    # 2025-01-01 ist ein Mittwoch, der nächste Montag ist der 6.
+    cron = CronExpression("0 8 * * 1")
+    assert cron.next_after(datetime(2025, 1, 1, 12, 0)) == datetime(2025, 1, 6, 8, 0)
+
+
+def test_day_and_weekday_are_combined_with_or():
+    # Wie in cron: am 15. oder an jedem Freitag
+    cron = CronExpression("0 0 15 * 5")
+    assert cron.next_after(datetime(2025, 1, 1)) == datetime(2025, 1, 3)
+    assert cron.next_after(datetime(2025, 1, 11)) == datetime(2025, 1, 15)
+
+
+def test_leap_day():
+    cron = CronExpression("0 0 29 2 *")
+    assert cron.next_after(datetime(2025, 3, 1)) == datetime(2028, 2, 29)
+
+
+def test_never_matching_expression():
+    with pytest.raises(ValueError):
+        CronExpression("0 0 31 2 *").next_after(datetime(2025, 1, 1))
@@ -0,0 +1,50 @@
+import queue
+import threading
+
+import pytest
+
+from jarvis.core.reorder_buffer import ReorderBuffer
+
+
+def test_items_come_out_in_sequence_order():
+    buffer = ReorderBuffer()
+    for seq in (2, 0, 1):
+        buffer.put(seq, f"item {seq}")
+    assert [buffer.get(timeout=0) for _ in range(3)] == ["item 0", "item 1", "item 2"]
+
+
+def test_get_waits_for_the_missing_sequence():
+    buffer = ReorderBuffer()
+    buffer.put(1, "second")
+    with pytest.raises(queue.Empty):
+        buffer.get(timeout=0.01)
+
+    threading.Timer(0.02, buffer.put, args=(0, "first")).start()
+    assert buffer.get(timeout=1) == "first"
+    assert buffer.get(timeout=0) == "second"
+
+
+def test_duplicates_and_stale_items_are_ignored():
+    buffer = ReorderBuffer()
+    buffer.put(0, "original")
+    buffer.put(0, "duplicate")
+    assert buffer.get(timeout=0) == "original"
+    buffer.put(0, "late")
+    with pytest.raises(queue.Empty):
+        buffer.get(timeout=0)
+
+
+def test_skip_to_drops_earlier_items_and_wakes_waiters():
+    buffer = ReorderBuffer()
+    buffer.put(0, "dropped")
+    buffer.put(3, "kept")
+    buffer.skip_to(3)
+    assert buffer.next_seq == 3
+    assert buffer.get(timeout=0) == "kept"
+
+
+def test_skip_to_never_moves_backwards():
+    buffer = ReorderBuffer()
+    buffer.skip_to(5)
+    buffer.skip_to(2)
+    assert buffer.next_seq == 5
@@ -0,0 +1,148 @@
+import time
+import zlib
+from datetime import datetime
+
+import numpy as np
+import pytest
+from langchain_core.documents import Document
+
+from rag import semantic_answer_cache
+from rag.semantic_answer_cache import SemanticAnswerCache
+
+
+class FakeEmbeddings:
+    """Bettet Wort-Trigramme ein und ignoriert Zahlen und Zeitangaben, wie es echte Embeddings fast tun."""
+
+    def embed_query(self, text):
+        text = SemanticAnswerCache.ENTITY_PATTERN.sub("", text.lower())
+        vector = np.zeros(256, dtype=np.float32)
+        for word in text.split():
+            for start in range(max(1, len(word) - 2)):
+                vector[zlib.crc32(word[start:start + 3].encode()) % 256] += 1.0
+        return vector.tolist()
+
+
+class FakeDB:
+    """Liefert den ``last_edited``-Stand der Seiten wie Chroma.get."""
+
+    def __init__(self, pages):
+        self.pages = pages
+
+    def get(self, where, include):
+        page_ids = where["source"]["$in"]
+        return {"metadatas": [
+            {"source": page_id, "last_edited": self.pages[page_id]} for page_id in page_ids if page_id in self.pages
+        ]}
+
+
+class FakeClock:
+    def __init__(self, now):
+        self.now = now
+
+    def time(self):
+        return self.now
+
+    def perf_counter(self):
+        return time.perf_counter()
+
+
+def doc(page_id, last_edited="2026-10-01T10:00:00.000Z"):
+    return Document(page_content="...", metadata={"source": page_id, "last_edited": last_edited})
+
+
+@pytest.fixture
+def db():
+    return FakeDB({"page-a": "2026-10-01T10:00:00.000Z", "page-b": "2026-10-01T10:00:00.000Z"})
+
+
+@pytest.fixture
+def cache(db):
+    return SemanticAnswerCache(db, FakeEmbeddings())
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock(datetime(2026, 10, 18, 23, 0).timestamp())
+    monkeypatch.setattr(semantic_answer_cache, "time", clock)
+    return clock
+
+
+def test_same_question_is_answered_from_cache(cache):
+    cache.store("Wie lautet das WLAN-Passwort?", "geheim", [doc("page-a")])
+    assert cache.lookup("wie lautet das wlan-passwort") == "geheim"
+    assert cache.hits == 1
+
+
+def test_different_weekday_is_not_a_hit(cache):
+    cache.store("Was steht am Montag an?", "Zahnarzt", [doc("page-a")])
+    assert cache.similarity("Was steht am Montag an?", "Was steht am Dienstag an?") == pytest.approx(1.0)
+    assert cache.lookup("Was steht am Dienstag an?") is None
+
+
+def test_different_number_is_not_a_hit(cache):
+    cache.store("Was war in Sprint 12 geplant?", "Login", [doc("page-a")])
+    assert cache.lookup("Was war in Sprint 13 geplant?") is None
+
+
+def test_extract_entities_normalizes_case_and_decimal_comma():
+    entities = SemanticAnswerCache.extract_entities("Kostet es 3,5 Euro am MONTAG?")
+    assert entities == frozenset({"3.5", "montag"})
+
+
+def test_answer_without_sources_is_not_stored(cache):
+    cache.store("Wie geht es dir?", "Gut", [])
+    cache.store("Wie geht es dir?", "Gut", [Document(page_content="...", metadata={})])
+    assert cache.lookup("Wie geht es dir?") is None
+
+
+def test_invalidate_pages_drops_only_dependent_answers(cache):
+    cache.store("Wie lautet das WLAN-Passwort?", "geheim", [doc("page-a")])
+    cache.store("Wo steht der Drucker?", "Im Flur", [doc("page-b")])
+
+    cache.invalidate_pages(["page-a"])
+
+    assert cache.lookup("Wie lautet das WLAN-Passwort?") is None
+    assert cache.lookup("Wo steht der Drucker?") == "Im Flur"
+
+
+def test_invalidate_pages_everywhere_reaches_all_caches(db):
+    first = SemanticAnswerCache(db, FakeEmbeddings())
+    second = SemanticAnswerCache(db, FakeEmbeddings())
+    first.store("Wo steht der Drucker?", "Im Flur", [doc("page-b")])
+    second.store("Wo steht der Drucker?", "Im Flur", [doc("page-b")])
+
+    SemanticAnswerCache.invalidate_pages_everywhere(["page-b"])
+
+    assert first.lookup("Wo steht der Drucker?") is None
+    assert second.lookup("Wo steht der Drucker?") is None
+
+
+def test_changed_source_page_invalidates_answer(cache, db):
+    cache.store("Wo steht der Drucker?", "Im Flur", [doc("page-b")])
+    db.pages["page-b"] = "2026-10-02T08:00:00.000Z"
+    assert cache.lookup("Wo steht der Drucker?") is None
+
+
+def test_relative_time_answer_expires_at_midnight(cache, clock):
+    cache.store("Was steht heute an?", "Zahnarzt", [doc("page-a")])
+    cache.store("Wo steht der Drucker?", "Im Flur", [doc("page-b")])
+
+    clock.now += 59 * 60
+    assert cache.lookup("Was steht heute an?") == "Zahnarzt"
+
+    clock.now += 2 * 60
+    assert cache.lookup("Was steht heute an?") is None
+    assert cache.lookup("Wo steht der Drucker?") == "Im Flur"
+
+
+def test_weekday_and_next_are_relative_time():
+    assert SemanticAnswerCache._is_relative(SemanticAnswerCache.extract_entities("Was ist am Freitag?"))
+    assert SemanticAnswerCache._is_relative(SemanticAnswerCache.extract_entities("Termine nächste Woche"))
+    assert not SemanticAnswerCache._is_relative(SemanticAnswerCache.extract_entities("Was war am 3. März?"))
+
+
+def test_answer_expires_after_max_age(db, clock):
+    cache = SemanticAnswerCache(db, FakeEmbeddings(), max_age_seconds=60)
+    cache.store("Wo steht der Drucker?", "Im Flur", [doc("page-b")])
+    clock.now += 61
+    assert cache.lookup("Wo steht der Drucker?") is None
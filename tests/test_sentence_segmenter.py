@@ -0,0 +1,81 @@
+import pytest
+
+from jarvis.core.sentence_segmenter import SentenceSegmenter
+
+TEXT = (
+    "Guten Morgen! Heute ist der 3. März und es regnet ein wenig. "
+    "Dein Termin mit Dr. Müller ist z. B. um 14 Uhr, bzw. kurz danach. "
+    "Der Akku hat noch 3.5 Prozent, also bitte bald laden. "
+    "Außerdem stehen noch drei Aufgaben auf der Liste, u.a. die Steuererklärung usw. "
+    "Soll ich dich erinnern?"
+)
+
+
+def segment(text, chunk_size, **kwargs):
+    segmenter = SentenceSegmenter(**kwargs)
+    segments = []
+    for start in range(0, len(text), chunk_size):
+        segments.extend(segmenter.feed(text[start:start + chunk_size]))
+    return segments + segmenter.flush()
+
+
+def test_splits_at_sentence_ends():
+    segments = segment(TEXT, len(TEXT), min_chars=20, first_min_chars=10)
+    assert segments == [
+        "Guten Morgen!",
+        "Heute ist der 3. März und es regnet ein wenig.",
+        "Dein Termin mit Dr. Müller ist z. B. um 14 Uhr, bzw. kurz danach.",
+        "Der Akku hat noch 3.5 Prozent, also bitte bald laden.",
+        # "usw." ist eine Abkürzung und beendet daher keinen Satz
+        "Außerdem stehen noch drei Aufgaben auf der Liste, u.a. die Steuererklärung usw. Soll ich dich erinnern?",
+    ]
+
+
+@pytest.mark.parametrize("text", [
+    "Wir treffen uns am 3. März im Büro, bitte pünktlich sein. Danke!",
+    "Bring bitte Obst mit, z. B. Äpfel oder Birnen, und Brot. Danke!",
+    "Frag Dr. Müller nach dem Befund von gestern Abend. Danke!",
+    "Use a dict, e.g. a mapping from names to values, for that. Thanks!",
+])
+def test_abbreviations_and_ordinals_do_not_end_a_sentence(text):
+    segments = segment(text, len(text), min_chars=5, first_min_chars=5)
+    closing = text.split()[-1]
+    assert segments == [text[:-len(closing)].strip(), closing]
+
+
+def test_decimal_numbers_do_not_end_a_sentence():
+    segments = segment("Der Wert liegt bei 3.5 Prozent. Gut so.", 1, min_chars=5, first_min_chars=5)
+    assert segments == ["Der Wert liegt bei 3.5 Prozent.", "Gut so."]
+
+
+def test_short_sentences_are_merged_up_to_min_chars():
+    segments = segment("Ja. Nein. Vielleicht doch lieber morgen früh. Ok.", 3, min_chars=30, first_min_chars=30)
+    assert segments == ["Ja. Nein. Vielleicht doch lieber morgen früh.", "Ok."]
+
+
+def test_first_segment_uses_lower_minimum():
+    segments = segment("Alles klar. Ich suche die Termine für diese Woche heraus. Moment.", 2,
+                       min_chars=40, first_min_chars=10)
+    assert segments[0] == "Alles klar."
+
+
+def test_long_passages_are_cut_at_soft_breaks():
+    text = "eins zwei drei, " * 30
+    segments = segment(text, 5, min_chars=20, max_chars=100)
+    assert all(len(part) <= 100 for part in segments)
+    assert all(part.endswith(",") for part in segments[:-1])
+    assert " ".join(segments).split() == text.split()
+
+
+def test_paragraphs_are_always_boundaries():
+    segments = segment("Kurz\n\nAuch kurz", 1, min_chars=40)
+    assert segments == ["Kurz", "Auch kurz"]
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 5, 7, 13, 64])
+def test_segments_do_not_depend_on_chunk_size(chunk_size):
+    assert segment(TEXT, chunk_size) == segment(TEXT, len(TEXT))
+
+
+def test_text_is_preserved():
+    assert " ".join(segment(TEXT, 4)).split() == TEXT.split()
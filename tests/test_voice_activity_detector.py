@@ -0,0 +1,101 @@
+import numpy as np
+
+from jarvis.audio.voice_activity_detector import EnergyVAD
+
+FRAME = 320  # 20 ms bei 16 kHz
+QUIET = 10  # ca. -70 dBFS
+ROOM_NOISE = 300  # ca. -41 dBFS, über der festen Schwelle
+SPEECH = 3000  # ca. -21 dBFS
+
+
+def frames(count, amplitude):
+    return np.full(count * FRAME, amplitude, dtype=np.int16)
+
+
+def signal(*parts):
+    return np.concatenate([frames(count, amplitude) for count, amplitude in parts])
+
+
+def test_speech_from_first_frame_is_detected():
+    vad = EnergyVAD()
+    vad.process(frames(10, SPEECH))
+    assert vad.in_speech
+    assert vad.speech_start == 0
+
+
+def test_speech_start_and_end_after_silence():
+    vad = EnergyVAD()
+    vad.process(signal((50, QUIET), (20, SPEECH), (100, QUIET)))
+    assert not vad.in_speech
+    assert vad.speech_start == 50 * FRAME
+    assert vad.speech_end == 70 * FRAME
+
+
+def test_short_pause_is_bridged_by_hangover():
+    vad = EnergyVAD()
+    vad.process(signal((20, SPEECH), (30, QUIET), (20, SPEECH)))
+    assert vad.in_speech
+    assert vad.speech_end is None
+
+
+def test_long_pause_ends_speech_after_hangover():
+    vad = EnergyVAD()
+    vad.process(signal((20, SPEECH), (74, QUIET)))
+    assert vad.in_speech
+
+    vad.process(frames(1, QUIET))
+    assert not vad.in_speech
+    assert vad.speech_end == 20 * FRAME
+
+
+def test_short_blip_does_not_start_speech():
+    vad = EnergyVAD()
+    vad.process(signal((10, QUIET), (3, SPEECH), (10, QUIET)))
+    assert not vad.in_speech
+    assert vad.speech_start is None
+
+
+def test_loud_room_is_recognized_as_noise():
+    vad = EnergyVAD()
+    vad.process(frames(10, ROOM_NOISE))
+    assert vad.in_speech
+
+    # Nach dem Minimum-Fenster wird der Rauschpegel angehoben und die Scheinsprache verworfen
+    vad.process(frames(100, ROOM_NOISE))
+    assert not vad.in_speech
+    assert vad.speech_start is None
+
+    vad.process(frames(10, SPEECH))
+    assert vad.in_speech
+    assert vad.speech_start == 110 * FRAME
+
+
+def test_result_does_not_depend_on_chunk_size():
+    audio = signal((50, QUIET), (20, SPEECH), (100, QUIET))
+
+    whole = EnergyVAD()
+    whole.process(audio)
+
+    chunked = EnergyVAD()
+    for start in range(0, len(audio), 97):
+        chunked.process(audio[start:start + 97])
+
+    assert (chunked.speech_start, chunked.speech_end) == (whole.speech_start, whole.speech_end)
+
+
+def test_calibrate_suppresses_room_noise_from_the_start():
+    vad = EnergyVAD()
+    vad.calibrate(frames(50, ROOM_NOISE))
+    vad.process(frames(20, ROOM_NOISE))
+    assert not vad.in_speech
+
+    vad.process(frames(10, SPEECH))
+    assert vad.in_speech
+    assert vad.speech_start == 20 * FRAME
+
+
+def test_calibrate_ignores_too_short_input():
+    vad = EnergyVAD()
+    vad.calibrate(np.zeros(FRAME - 1, dtype=np.int16))
+    vad.process(frames(10, SPEECH))
+    assert vad.speech_start == 0
@@ -1,5 +1,6 @@
 
 from tools.notion.core.abstract_notion_client import AbstractNotionClient
+from tools.notion.core.notion_change_notifier import NotionChangeNotifier
 from tools.notion.core.notion_pages import NotionPages
 from tools.notion.core.parsing.notion_markdown_parser import NotionMarkdownParser
 
@@ -32,6 +33,7 @@ class NotionClipboardManager(AbstractNotionClient):
         
         if response.status_code == 200:
             self.logger.info("Text successfully added to clipboard page.")
+            NotionChangeNotifier.shared().notify(self.clipboard_page_id)
             return "Text successfully added to clipboard page."
         else:
             self.logger.error(f"Error adding text: {response.text}")
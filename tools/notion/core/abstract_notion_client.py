@@ -2,12 +2,19 @@ import os
 import logging
 import sys
 from abc import ABC
+from typing import Any, AsyncIterator, Callable, Dict, Optional
 from dotenv import load_dotenv
 import httpx
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../../../")))
 load_dotenv()
 
+from tools.notion.core.notion_http_transport import NotionHttpTransport
+
+class NotionPaginationError(RuntimeError):
+    """Raised when a later page of a paginated request fails, so the results so far would be incomplete."""
+
+
 class AbstractNotionClient(ABC):
     """Abstract base class for Notion API interactions."""
     
@@ -19,28 +26,68 @@ class AbstractNotionClient(ABC):
         "Notion-Version": "2022-06-28"
     }
 
-    def __init__(self):
-        self.client = httpx.AsyncClient()
+    def __init__(self, transport: Optional[NotionHttpTransport] = None):
+        self.transport = transport or NotionHttpTransport.shared()
         self.logger = logging.getLogger(self.__class__.__name__)
         logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
         self.logger.info("%s initialized.", self.__class__.__name__)
 
-    async def _make_request(self, method: str, endpoint: str, data=None):
-        """Makes a request to the Notion API."""
-        url = f"https://api.notion.com/v1/{endpoint}"
-        
+    async def _make_request(self, method: str, endpoint: str, data=None, params: Optional[Dict[str, Any]] = None):
+        """Makes a rate-limited request to the Notion API over the shared transport."""
+        if method.lower() not in ("get", "post", "patch"):
+            raise ValueError(f"Unsupported method: {method}")
+
         try:
-            if method.lower() == "get":
-                response = await self.client.get(url, headers=self.HEADERS)
-            elif method.lower() == "post":
-                response = await self.client.post(url, headers=self.HEADERS, json=data)
-            elif method.lower() == "patch":
-                response = await self.client.patch(url, headers=self.HEADERS, json=data)
-            else:
-                raise ValueError(f"Unsupported method: {method}")
+            json_data = data if method.lower() != "get" else None
+            response = await self.transport.request(method, endpoint, headers=self.HEADERS, json=json_data, params=params)
 
             response.raise_for_status()
             return response
 
         except httpx.HTTPStatusError as e:
-            return {"error": f"API request failed: {str(e)}"}
\ No newline at end of file
+            return {"error": f"API request failed: {str(e)}"}
+
+    async def _paginate(self, method: str, endpoint: str, data=None, page_size: int = 100,
+                        on_request: Optional[Callable[[], None]] = None,
+                        strict: bool = False) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Yields all results of a paginated Notion endpoint, following next_cursor until has_more is False.
+        
+        GET endpoints receive the cursor as query parameters, POST endpoints (database queries, search)
+        in the request body. Results are yielded as soon as their page arrives. ``on_request`` is
+        called once per page request. If the first page fails, the error is logged and nothing is
+        yielded (with ``strict`` NotionPaginationError is raised as well); if a later page fails,
+        NotionPaginationError is raised instead of silently returning a partial result.
+        """
+        cursor = None
+        
+        while True:
+            if method.lower() == "get":
+                params = {"page_size": page_size}
+                if cursor:
+                    params["start_cursor"] = cursor
+                response = await self._make_request(method, endpoint, params=params)
+            else:
+                body = dict(data or {})
+                body["page_size"] = page_size
+                if cursor:
+                    body["start_cursor"] = cursor
+                response = await self._make_request(method, endpoint, body)
+            if on_request:
+                on_request()
+            
+            if isinstance(response, dict):
+                self.logger.error("Pagination of %s aborted: %s", endpoint, response["error"])
+                if cursor:
+                    raise NotionPaginationError(f"Pagination of {endpoint} failed after the first page: {response['error']}")
+                if strict:
+                    raise NotionPaginationError(f"Pagination of {endpoint} failed: {response['error']}")
+                return
+            
+            payload = response.json()
+            for result in payload.get("results", []):
+                yield result
+            
+            cursor = payload.get("next_cursor")
+            if not payload.get("has_more") or not cursor:
+                return
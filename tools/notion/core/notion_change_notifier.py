@@ -0,0 +1,44 @@
+import logging
+import threading
+from typing import Callable, List, Optional
+
+PageChangeListener = Callable[[str], None]
+
+
+class NotionChangeNotifier:
+    """Process-wide hub that announces Notion pages written by Jarvis itself."""
+
+    _shared_instance: Optional["NotionChangeNotifier"] = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self):
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self._listeners: List[PageChangeListener] = []
+        self._lock = threading.Lock()
+
+    @classmethod
+    def shared(cls) -> "NotionChangeNotifier":
+        with cls._shared_lock:
+            if cls._shared_instance is None:
+                cls._shared_instance = cls()
+            return cls._shared_instance
+
+    def subscribe(self, listener: PageChangeListener):
+        with self._lock:
+            self._listeners.append(listener)
+
+    def unsubscribe(self, listener: PageChangeListener):
+        with self._lock:
+            if listener in self._listeners:
+                self._listeners.remove(listener)
+
+    def notify(self, page_id: str):
+        """Informs all listeners that a page was changed. Listeners must be thread-safe."""
+        with self._lock:
+            listeners = list(self._listeners)
+
+        for listener in listeners:
+            try:
+                listener(page_id)
+            except Exception as e:
+                self.logger.error("Page change listener failed for %s: %s", page_id, e)
@@ -0,0 +1,204 @@
+import os
+import re
+import asyncio
+import logging
+import random
+import threading
+import time
+import weakref
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, Optional
+
+import httpx
+
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+
+class TokenBucketRateLimiter:
+    """Token bucket shared by all Notion clients of the process."""
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._last_refill = time.monotonic()
+        self._blocked_until = 0.0
+        # threading.Lock instead of asyncio.Lock: the tools run their coroutines via asyncio.run,
+        # so the limiter is used from more than one event loop.
+        self._lock = threading.Lock()
+
+    async def acquire(self):
+        """Waits until a request may be sent."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+
+                wait_seconds = self._blocked_until - now
+                if wait_seconds <= 0:
+                    if self._tokens >= 1:
+                        self._tokens -= 1
+                        return
+                    wait_seconds = (1 - self._tokens) / self.rate
+
+            await asyncio.sleep(wait_seconds)
+
+    def pause(self, seconds: float):
+        """Blocks all requests for the given time, e.g. after a 429 with Retry-After."""
+        with self._lock:
+            self._blocked_until = max(self._blocked_until, time.monotonic() + seconds)
+            self._tokens = 0.0
+
+    def _refill(self, now: float):
+        elapsed = now - self._last_refill
+        self._tokens = min(self.capacity, self._tokens + elapsed * self.rate)
+        self._last_refill = now
+
+
+class NotionHttpTransport:
+    """Process-wide pooled HTTP transport for the Notion API with rate limiting and retries."""
+
+    BASE_URL = os.getenv("NOTION_API_BASE_URL", "https://api.notion.com/v1")
+    RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+    # POST endpoints that only read; everything else may have been applied despite a 5xx or timeout
+    READ_ONLY_POST_ENDPOINT = re.compile(r"^/?(search|databases/[^/]+/query)/?$")
+    # The request never reached Notion, so it can be repeated whatever the method
+    UNSENT_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+
+    _shared_instance: Optional["NotionHttpTransport"] = None
+    _shared_lock = threading.Lock()
+
+    def __init__(
+        self,
+        base_url: Optional[str] = None,
+        requests_per_second: float = 3.0,
+        burst: int = 3,
+        max_retries: int = 5,
+        backoff_base: float = 0.5,
+        backoff_max: float = 30.0,
+        max_connections: int = 10,
+        keepalive_expiry: float = 60.0,
+    ):
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.base_url = (base_url or self.BASE_URL).rstrip("/")
+        self.rate_limiter = TokenBucketRateLimiter(requests_per_second, burst)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_connections,
+            keepalive_expiry=keepalive_expiry
+        )
+        # httpx.AsyncClient is bound to the event loop it was created in, so one pool per loop.
+        self._clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = weakref.WeakKeyDictionary()
+
+    @classmethod
+    def shared(cls) -> "NotionHttpTransport":
+        """Returns the transport shared by all Notion clients."""
+        with cls._shared_lock:
+            if cls._shared_instance is None:
+                cls._shared_instance = cls()
+            return cls._shared_instance
+
+    @classmethod
+    def set_shared(cls, transport: "NotionHttpTransport"):
+        """Replaces the shared transport, e.g. with one pointing at a local mock server."""
+        with cls._shared_lock:
+            cls._shared_instance = transport
+
+    async def request(
+        self,
+        method: str,
+        endpoint: str,
+        headers: Dict[str, str],
+        json: Any = None,
+        params: Optional[Dict[str, Any]] = None,
+    ) -> httpx.Response:
+        """
+        Sends a rate-limited request. 429 responses are retried for every method, because Notion
+        rejects them without applying them. 5xx responses and transport errors are only retried
+        for read-only requests, so a write that timed out is not applied twice.
+        """
+        client = self._get_client()
+        read_only = self.is_read_only(method, endpoint)
+
+        for attempt in range(self.max_retries + 1):
+            await self.rate_limiter.acquire()
+
+            try:
+                response = await client.request(method.upper(), endpoint, headers=headers, json=json, params=params)
+            except httpx.TransportError as e:
+                if attempt == self.max_retries or not (read_only or isinstance(e, self.UNSENT_ERRORS)):
+                    raise
+                delay = self._backoff_delay(attempt)
+                self.logger.warning("Transport error on %s (%s), retrying in %.2f s", endpoint, e, delay)
+                await asyncio.sleep(delay)
+                continue
+
+            if response.status_code not in self.RETRY_STATUS_CODES or attempt == self.max_retries:
+                return response
+            if response.status_code != 429 and not read_only:
+                return response
+
+            delay = self._retry_after_delay(response)
+            if delay is None:
+                delay = self._backoff_delay(attempt)
+            else:
+                delay += random.uniform(0, self.backoff_base)
+
+            if response.status_code == 429:
+                self.rate_limiter.pause(delay)
+            self.logger.warning("Notion responded %d on %s, retrying in %.2f s", response.status_code, endpoint, delay)
+            await asyncio.sleep(delay)
+
+        return response
+
+    @classmethod
+    def is_read_only(cls, method: str, endpoint: str) -> bool:
+        """Whether repeating the request cannot create or modify anything."""
+        method = method.lower()
+        return method == "get" or (method == "post" and bool(cls.READ_ONLY_POST_ENDPOINT.match(endpoint)))
+
+    async def aclose(self):
+        """Closes the connection pool of the running event loop."""
+        client = self._clients.pop(asyncio.get_running_loop(), None)
+        if client:
+            await client.aclose()
+
+    def _get_client(self) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        client = self._clients.get(loop)
+        if client is None or client.is_closed:
+            client = httpx.AsyncClient(
+                base_url=self.base_url,
+                http2=HTTP2_AVAILABLE,
+                limits=self.limits,
+                timeout=httpx.Timeout(30.0, connect=10.0)
+            )
+            self._clients[loop] = client
+        return client
+
+    def _backoff_delay(self, attempt: int) -> float:
+        """Exponential backoff with full jitter."""
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    def _retry_after_delay(self, response: httpx.Response) -> Optional[float]:
+        retry_after = response.headers.get("Retry-After")
+        if not retry_after:
+            return None
+
+        try:
+            return min(self.backoff_max, max(0.0, float(retry_after)))
+        except ValueError:
+            pass
+
+        try:
+            retry_at = parsedate_to_datetime(retry_after)
+        except (TypeError, ValueError):
+            return None
+        return min(self.backoff_max, max(0.0, retry_at.timestamp() - time.time()))
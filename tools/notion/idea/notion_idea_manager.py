@@ -1,5 +1,5 @@
 
-from tools.notion.core.abstract_notion_client import AbstractNotionClient
+from tools.notion.core.abstract_notion_client import AbstractNotionClient, NotionPaginationError
 from tools.notion.core.notion_pages import NotionPages
 
 class NotionIdeaManager(AbstractNotionClient):
@@ -49,13 +49,6 @@ class NotionIdeaManager(AbstractNotionClient):
     async def get_all_ideas(self):
         """Retrieves all ideas from the Notion database."""
         try:
-            response = await self._make_request("post", f"databases/{self.database_id}/query")
-
-            if response.status_code != 200:
-                self.logger.error(f"❌ Error retrieving ideas: {response.text}")
-                return f"❌ Error retrieving ideas: {response.text}"
-
-            results = response.json().get("results", [])
             ideas = [
                 {
                     "id": item["id"],
@@ -63,11 +56,15 @@ class NotionIdeaManager(AbstractNotionClient):
                     "status": item["properties"]["Status"]["status"]["name"],
                     "tags": [tag["name"] for tag in item["properties"].get("Art", {}).get("multi_select", [])]
                 }
-                for item in results
+                async for item in self._paginate("post", f"databases/{self.database_id}/query", strict=True)
             ]
 
             return ideas
 
+        except NotionPaginationError as e:
+            self.logger.error(f"❌ Error retrieving ideas: {str(e)}")
+            return f"❌ Error retrieving ideas: {str(e)}"
+
         except Exception as e:
             self.logger.error(f"❌ API call failed: {str(e)}")
             return f"❌ API call failed: {str(e)}"
\ No newline at end of file
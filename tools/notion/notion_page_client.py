@@ -1,22 +1,37 @@
 import asyncio
 import re
-from typing import Any, Dict, Optional
+import time
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
 from tools.notion.core.abstract_notion_client import AbstractNotionClient
+from tools.notion.core.notion_http_transport import NotionHttpTransport
 from tools.notion.core.parsing.notion_block import NotionBlock
 from tools.notion.core.parsing.notion_markdown_converter import NotionMarkdownConverter
 
+@dataclass
+class PageFetchStats:
+    """Laufzeitstatistik für das Laden eines Seitenbaums."""
+    page_id: str
+    duration_seconds: float = 0.0
+    request_count: int = 0
+    block_count: int = 0
+    max_depth: int = 0
+
 class NotionPageClient(AbstractNotionClient):
     """Client für die Interaktion mit Notion-Seiten."""
     
-    def __init__(self):
+    def __init__(self, max_concurrent_requests: int = 8, transport: Optional[NotionHttpTransport] = None):
         """
         Initialisiert den Client mit einem Markdown-Konverter.
         
         Args:
-            markdown_converter (NotionMarkdownConverter, optional): Benutzerdefinierter Konverter.
+            max_concurrent_requests (int): Maximale Anzahl paralleler Kinder-Anfragen beim Laden einer Seite.
+            transport (NotionHttpTransport, optional): Transport, standardmäßig der prozessweit geteilte.
         """
-        super().__init__()
+        super().__init__(transport)
         self._markdown_converter = NotionMarkdownConverter()
+        self.max_concurrent_requests = max_concurrent_requests
+        self.last_fetch_stats: Optional[PageFetchStats] = None
     
     async def get_page_metadata(self, page_id: str) -> Optional[str]:
         endpoint = f"pages/{page_id}"
@@ -25,7 +40,84 @@ class NotionPageClient(AbstractNotionClient):
 
         return response_json.get("last_edited_time") if "error" not in response_json else None
 
-    async def _parse_block(self, block: Dict[str, Any], depth: int = 0) -> NotionBlock:
+    async def get_pages_edited_since(self, watermark: Optional[str]) -> AsyncIterator[Tuple[str, str]]:
+        """
+        Liefert (page_id, last_edited_time) aller Seiten, die seit dem Wasserzeichen bearbeitet wurden.
+
+        Nutzt die Notion-Suche absteigend nach last_edited_time und bricht ab, sobald
+        ältere Seiten erreicht sind. Ohne Wasserzeichen werden alle Seiten geliefert.
+        """
+        data = {
+            "filter": {"property": "object", "value": "page"},
+            "sort": {"direction": "descending", "timestamp": "last_edited_time"}
+        }
+
+        async for page in self._paginate("post", "search", data):
+            last_edited_time = page.get("last_edited_time")
+            if watermark and last_edited_time and last_edited_time < watermark:
+                return
+            yield page["id"], last_edited_time
+
+    async def fetch_page_blocks(self, page_id: str) -> NotionBlock:
+        """
+        Lädt den Blockbaum einer Seite ebenenweise (Breitensuche).
+
+        Alle Kinder-Anfragen einer Ebene werden parallel gestellt, begrenzt durch
+        ``max_concurrent_requests``. Die Reihenfolge der Kinder entspricht der
+        Reihenfolge, die Notion liefert.
+
+        Returns:
+            NotionBlock: Stammblock der Seite mit allen Kinderblöcken.
+        """
+        stats = PageFetchStats(page_id=page_id)
+        start_time = time.perf_counter()
+        semaphore = asyncio.Semaphore(self.max_concurrent_requests)
+
+        root_block = NotionBlock(type="page", text="", depth=0)
+        current_level = [(page_id, root_block)]
+
+        while current_level:
+            children_per_parent = await asyncio.gather(
+                *(self._fetch_children(block_id, semaphore, stats) for block_id, _ in current_level)
+            )
+
+            next_level = []
+            for (_, parent), children_blocks in zip(current_level, children_per_parent):
+                for child_block in children_blocks:
+                    child = self._create_block(child_block, parent.depth + 1)
+                    if not child:
+                        continue
+
+                    parent.children.append(child)
+                    stats.block_count += 1
+                    stats.max_depth = max(stats.max_depth, child.depth)
+
+                    if child_block.get("has_children", False):
+                        next_level.append((child_block["id"], child))
+
+            current_level = next_level
+
+        stats.duration_seconds = time.perf_counter() - start_time
+        self.last_fetch_stats = stats
+        self.logger.info(
+            "⏱️ Seite %s geladen: %d Blöcke, %d Anfragen, Tiefe %d in %.2f s",
+            page_id, stats.block_count, stats.request_count, stats.max_depth, stats.duration_seconds
+        )
+
+        return root_block
+
+    async def _fetch_children(self, block_id: str, semaphore: asyncio.Semaphore, stats: PageFetchStats) -> List[Dict[str, Any]]:
+        def count_request():
+            stats.request_count += 1
+
+        async with semaphore:
+            children_blocks = [
+                block async for block in self._paginate("get", f"blocks/{block_id}/children", on_request=count_request)
+            ]
+
+        return children_blocks
+
+    def _create_block(self, block: Dict[str, Any], depth: int) -> Optional[NotionBlock]:
         block_type = block.get("type")
         rich_text = block.get(block_type, {}).get("rich_text", [])
         text = "".join([t.get("plain_text", "") for t in rich_text]).strip()
@@ -33,34 +125,26 @@ class NotionPageClient(AbstractNotionClient):
         if not text and not block.get("has_children", False):
             return None
 
-        notion_block = NotionBlock(
+        return NotionBlock(
             type=block_type,
             text=text,
             depth=depth
         )
 
-        # Rekursives Laden von Kinderblöcken
-        if block.get("has_children", False):
-            children_endpoint = f"blocks/{block['id']}/children"
-            response = await self._make_request("get", children_endpoint)
-            children_blocks = response.json().get("results", [])
-            
-            for child_block in children_blocks:
-                child = await self._parse_block(child_block, depth + 1)
-                if child:
-                    notion_block.children.append(child)
-
-        return notion_block
-
     async def get_page_markdown_content(self, page_id: str) -> str:
         """
         Returns:
             str: Markdown-formatierter Seiteninhalt.
         """
         # Hole den Stammblock der Seite
-        root_block = await self._parse_block({"id": page_id, "type": "page", "has_children": True})
+        root_block = await self.fetch_page_blocks(page_id)
         
-        # Konvertiere Block in Markdown
+        return self.convert_to_markdown(root_block)
+
+    def convert_to_markdown(self, root_block: NotionBlock) -> str:
+        """
+        Konvertiert einen geladenen Blockbaum in bereinigtes Markdown.
+        """
         markdown_lines = self._markdown_converter.convert_block_to_markdown(root_block)
         
         # Bereinige und formatiere Markdown
@@ -0,0 +1,64 @@
+import os
+import json
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Optional
+
+DEFAULT_MANIFEST_PATH = os.path.abspath(
+    os.path.join(os.path.dirname(__file__), "..", "..", "rag", "chroma_db", "notion_sync_manifest.json")
+)
+
+
+class NotionSyncManifest:
+    """
+    Lokales Verzeichnis der synchronisierten Seiten (page_id → last_edited_time)
+    und des Zeitpunkts der letzten erfolgreichen Synchronisation.
+    """
+
+    # Notion liefert last_edited_time nur minutengenau, daher wird das Wasserzeichen etwas zurückgesetzt
+    WATERMARK_SAFETY_MARGIN = timedelta(minutes=2)
+
+    def __init__(self, path: str = DEFAULT_MANIFEST_PATH):
+        self.logger = logging.getLogger(__name__)
+        self.path = path
+        self.watermark: Optional[str] = None
+        self.pages: Dict[str, str] = {}
+        self._load()
+
+    def get(self, page_id: str) -> Optional[str]:
+        return self.pages.get(self._normalize(page_id))
+
+    def set(self, page_id: str, last_edited_time: str):
+        self.pages[self._normalize(page_id)] = last_edited_time
+
+    def contains(self, page_id: str) -> bool:
+        return self._normalize(page_id) in self.pages
+
+    def mark_synced(self, started_at: datetime):
+        """Setzt das Wasserzeichen auf den Startzeitpunkt eines vollständig erfolgreichen Laufs."""
+        watermark = started_at.astimezone(timezone.utc) - self.WATERMARK_SAFETY_MARGIN
+        self.watermark = watermark.strftime("%Y-%m-%dT%H:%M:00.000Z")
+
+    def save(self):
+        """Schreibt das Manifest atomar auf die Festplatte."""
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"watermark": self.watermark, "pages": self.pages}, f, indent=2)
+        os.replace(tmp_path, self.path)
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                data = json.load(f)
+            self.watermark = data.get("watermark")
+            self.pages = data.get("pages", {})
+        except (OSError, ValueError) as e:
+            self.logger.warning("⚠️ Sync-Manifest %s konnte nicht gelesen werden, starte leer: %s", self.path, e)
+
+    @staticmethod
+    def _normalize(page_id: str) -> str:
+        return page_id.replace("-", "")
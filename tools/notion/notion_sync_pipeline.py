@@ -0,0 +1,317 @@
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from langchain_core.documents import Document
+
+from rag.chroma_db_manager import ChromaDBManager, PageSyncPlan
+from tools.notion.core.parsing.notion_block import NotionBlock
+from tools.notion.notion_page_client import NotionPageClient
+from tools.notion.notion_sync_manifest import NotionSyncManifest
+
+
+@dataclass
+class PageSyncJob:
+    """Zustand einer Seite auf ihrem Weg durch die Sync-Pipeline."""
+    page_id: str
+    last_edited_time: Optional[str] = None
+    force: bool = False
+    root_block: Optional[NotionBlock] = None
+    markdown_text: str = ""
+    docs: List[Document] = field(default_factory=list)
+    plan: Optional[PageSyncPlan] = None
+    embeddings: List[List[float]] = field(default_factory=list)
+
+
+@dataclass
+class StageStats:
+    """Durchsatz einer Pipeline-Stufe."""
+    name: str
+    workers: int
+    pages: int = 0
+    chunks: int = 0
+    failed: int = 0
+    busy_seconds: float = 0.0
+    first_start: Optional[float] = None
+    last_end: Optional[float] = None
+
+    @property
+    def active_seconds(self) -> float:
+        if self.first_start is None or self.last_end is None:
+            return 0.0
+        return self.last_end - self.first_start
+
+    @property
+    def pages_per_second(self) -> float:
+        return self.pages / self.active_seconds if self.active_seconds else 0.0
+
+    @property
+    def chunks_per_second(self) -> float:
+        return self.chunks / self.active_seconds if self.active_seconds else 0.0
+
+
+@dataclass
+class PipelineReport:
+    """Zusammenfassung eines Pipeline-Laufs."""
+    total_pages: int
+    updated_pages: int = 0
+    duration_seconds: float = 0.0
+    stages: List[StageStats] = field(default_factory=list)
+
+    @property
+    def failed_pages(self) -> int:
+        return sum(stage.failed for stage in self.stages)
+
+    def format(self) -> str:
+        lines = [
+            f"{self.updated_pages}/{self.total_pages} Seiten aktualisiert in {self.duration_seconds:.2f} s"
+        ]
+        for stage in self.stages:
+            lines.append(
+                f"  {stage.name:<10} x{stage.workers}: {stage.pages} Seiten ({stage.pages_per_second:.2f}/s), "
+                f"{stage.chunks} Chunks ({stage.chunks_per_second:.2f}/s), {stage.failed} Fehler, "
+                f"{stage.busy_seconds:.2f} s beschäftigt"
+            )
+        return "\n".join(lines)
+
+
+StageHandler = Callable[[PageSyncJob], Awaitable[Optional[PageSyncJob]]]
+
+
+class EmbeddingBatcher:
+    """
+    Sammelt die Texte mehrerer Seiten zu gemeinsamen Embedding-Anfragen.
+
+    Ein Notion-Workspace besteht meist aus vielen kleinen Seiten; einzeln eingebettet
+    kostet jede von ihnen einen eigenen Roundtrip. Der Batcher schickt die gesammelten
+    Texte ab, sobald ``batch_size`` erreicht ist oder ``flush_seconds`` nach dem ersten
+    wartenden Text verstrichen sind, und verteilt die Vektoren wieder auf die Aufrufer.
+    """
+
+    def __init__(self, embeddings, batch_size: int = 128, flush_seconds: float = 0.05):
+        self.embeddings = embeddings
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+        self.requests = 0
+        self._pending: List[tuple] = []
+        self._pending_texts = 0
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks = set()
+
+    async def embed(self, texts: List[str]) -> List[List[float]]:
+        """Bettet die Texte ein, gegebenenfalls zusammen mit denen anderer Seiten."""
+        if not texts:
+            return []
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((texts, future))
+        self._pending_texts += len(texts)
+
+        if self._pending_texts >= self.batch_size:
+            self.flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.flush_seconds, self.flush)
+        return await future
+
+    def flush(self):
+        """Schickt alle wartenden Texte sofort ab."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._pending:
+            return
+
+        pending, self._pending, self._pending_texts = self._pending, [], 0
+        task = asyncio.get_running_loop().create_task(self._embed_pending(pending))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _embed_pending(self, pending: List[tuple]):
+        texts = [text for page_texts, _ in pending for text in page_texts]
+        try:
+            vectors = []
+            for start in range(0, len(texts), self.batch_size):
+                self.requests += 1
+                vectors.extend(await self.embeddings.aembed_documents(texts[start:start + self.batch_size]))
+        except Exception as e:
+            for _, future in pending:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        offset = 0
+        for page_texts, future in pending:
+            if not future.done():
+                future.set_result(vectors[offset:offset + len(page_texts)])
+            offset += len(page_texts)
+
+
+class NotionSyncPipeline:
+    """
+    Gestufte, nebenläufige Pipeline für die Synchronisation von Notion-Seiten in die Vektordatenbank.
+
+    Metadaten-Prüfung → Blöcke laden → Markdown → Splitten → Embedding → Chroma-Schreiben.
+    Zwischen den Stufen liegen begrenzte Queues, sodass z. B. das Laden von Seite N+1
+    mit dem Einbetten von Seite N überlappt. Die Embedding-Worker warten nur auf den
+    gemeinsamen ``EmbeddingBatcher``; ihre Anzahl bestimmt, wie viele Seiten sich eine
+    Embedding-Anfrage höchstens teilen.
+    """
+
+    DEFAULT_WORKERS = {
+        "metadata": 4,
+        "fetch": 2,
+        "markdown": 1,
+        "split": 1,
+        "embed": 8,
+        "write": 1,
+    }
+
+    def __init__(
+        self,
+        client: NotionPageClient,
+        chroma_db: ChromaDBManager,
+        manifest: NotionSyncManifest,
+        workers: Optional[Dict[str, int]] = None,
+        queue_size: int = 4,
+        embedding_batch_size: int = 128,
+        embedding_flush_seconds: float = 0.05,
+    ):
+        self.logger = logging.getLogger(__name__)
+        self.client = client
+        self.chroma_db = chroma_db
+        self.manifest = manifest
+        self.workers = {**self.DEFAULT_WORKERS, **(workers or {})}
+        self.queue_size = queue_size
+        self.embedding_batch_size = embedding_batch_size
+        self.embedding_flush_seconds = embedding_flush_seconds
+        self._embedding_batcher: Optional[EmbeddingBatcher] = None
+
+        self._stages: List[tuple] = [
+            ("metadata", self._check_metadata),
+            ("fetch", self._fetch_blocks),
+            ("markdown", self._convert_markdown),
+            ("split", self._split_chunks),
+            ("embed", self._embed_chunks),
+            ("write", self._write_chunks),
+        ]
+
+    async def run(self, page_ids: List[str], known_edit_times: Optional[Dict[str, str]] = None,
+                  force: bool = False) -> PipelineReport:
+        """
+        Synchronisiert die angegebenen Seiten und liefert einen Durchsatzbericht.
+
+        Args:
+            page_ids (List[str]): Zu synchronisierende Seiten.
+            known_edit_times (Dict[str, str], optional): Bereits bekannte last_edited_time-Werte,
+                für diese Seiten entfällt die Metadaten-Anfrage.
+            force (bool): Seiten auch dann neu einlesen, wenn ihr last_edited_time dem Manifest
+                entspricht. Notion aktualisiert den Zeitstempel nur minutengenau, sodass mehrere
+                Änderungen innerhalb einer Minute sonst übersehen würden.
+        """
+        known_edit_times = known_edit_times or {}
+        start_time = time.perf_counter()
+        report = PipelineReport(total_pages=len(page_ids))
+        self._embedding_batcher = EmbeddingBatcher(
+            self.chroma_db.embeddings, self.embedding_batch_size, self.embedding_flush_seconds
+        )
+
+        queues = [asyncio.Queue(maxsize=self.queue_size) for _ in self._stages]
+        queues.append(None)
+
+        stage_tasks = []
+        for index, (name, handler) in enumerate(self._stages):
+            stats = StageStats(name=name, workers=self.workers[name])
+            report.stages.append(stats)
+            stage_tasks.append([
+                asyncio.create_task(self._stage_worker(handler, stats, queues[index], queues[index + 1], report))
+                for _ in range(stats.workers)
+            ])
+
+        try:
+            for page_id in page_ids:
+                await queues[0].put(PageSyncJob(page_id=page_id, last_edited_time=known_edit_times.get(page_id), force=force))
+
+            # Stufe für Stufe leerlaufen lassen und deren Worker beenden
+            for queue, tasks in zip(queues, stage_tasks):
+                await queue.join()
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+        finally:
+            for tasks in stage_tasks:
+                for task in tasks:
+                    task.cancel()
+
+        report.duration_seconds = time.perf_counter() - start_time
+        return report
+
+    async def _stage_worker(
+        self,
+        handler: StageHandler,
+        stats: StageStats,
+        input_queue: asyncio.Queue,
+        output_queue: Optional[asyncio.Queue],
+        report: PipelineReport,
+    ):
+        while True:
+            job = await input_queue.get()
+            started = time.perf_counter()
+            if stats.first_start is None:
+                stats.first_start = started
+
+            try:
+                result = await handler(job)
+            except Exception as e:
+                stats.failed += 1
+                result = None
+                self.logger.error("❌ Stufe %s für Seite %s fehlgeschlagen: %s", stats.name, job.page_id, e)
+            finally:
+                finished = time.perf_counter()
+                stats.busy_seconds += finished - started
+                stats.last_end = finished
+
+            if result is not None:
+                stats.pages += 1
+                stats.chunks += len(result.docs)
+                if output_queue is not None:
+                    await output_queue.put(result)
+                else:
+                    report.updated_pages += 1
+
+            input_queue.task_done()
+
+    async def _check_metadata(self, job: PageSyncJob) -> Optional[PageSyncJob]:
+        if job.last_edited_time is None:
+            job.last_edited_time = await self.client.get_page_metadata(job.page_id)
+        if job.last_edited_time is None:
+            raise RuntimeError("last_edited_time konnte nicht abgerufen werden")
+        if not job.force and self.manifest.get(job.page_id) == job.last_edited_time:
+            self.logger.info("✅ Keine Änderungen für Seite %s. Kein Update erforderlich.", job.page_id)
+            return None
+        return job
+
+    async def _fetch_blocks(self, job: PageSyncJob) -> PageSyncJob:
+        job.root_block = await self.client.fetch_page_blocks(job.page_id)
+        return job
+
+    async def _convert_markdown(self, job: PageSyncJob) -> PageSyncJob:
+        job.markdown_text = self.client.convert_to_markdown(job.root_block)
+        job.root_block = None
+        return job
+
+    async def _split_chunks(self, job: PageSyncJob) -> PageSyncJob:
+        job.docs = self.chroma_db.split_page_documents(job.page_id, job.markdown_text, job.last_edited_time)
+        job.plan = await asyncio.to_thread(self.chroma_db.plan_page_sync, job.page_id, job.docs)
+        return job
+
+    async def _embed_chunks(self, job: PageSyncJob) -> PageSyncJob:
+        job.embeddings = await self._embedding_batcher.embed([doc.page_content for doc in job.plan.new_docs])
+        return job
+
+    async def _write_chunks(self, job: PageSyncJob) -> PageSyncJob:
+        await asyncio.to_thread(self.chroma_db.write_page_chunks, job.page_id, job.plan, job.embeddings)
+        self.manifest.set(job.page_id, job.last_edited_time)
+        return job
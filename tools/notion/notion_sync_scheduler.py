@@ -0,0 +1,206 @@
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Iterable, List, Optional, Set
+
+from tools.notion.core.notion_change_notifier import NotionChangeNotifier
+
+
+class CronExpression:
+    """
+    Minimaler Cron-Ausdruck mit fünf Feldern: Minute Stunde Tag Monat Wochentag.
+
+    Unterstützt ``*``, Listen (``1,15``), Bereiche (``9-17``) und Schrittweiten (``*/15``, ``0-30/10``).
+    Wochentag 0 und 7 stehen für Sonntag.
+    """
+
+    FIELD_RANGES = [(0, 59), (0, 23), (1, 31), (1, 12), (0, 7)]
+
+    def __init__(self, expression: str):
+        fields = expression.split()
+        if len(fields) != 5:
+            raise ValueError(f"Cron-Ausdruck braucht 5 Felder: '{expression}'")
+
+        self.expression = expression
+        parsed = [self._parse_field(field, low, high) for field, (low, high) in zip(fields, self.FIELD_RANGES)]
+        self.minutes, self.hours, self.days, self.months, weekdays = parsed
+        self.weekdays = {0 if day == 7 else day for day in weekdays}
+        self._day_restricted = fields[2] != "*"
+        self._weekday_restricted = fields[4] != "*"
+
+    @classmethod
+    def daily_at(cls, time_of_day: str) -> "CronExpression":
+        """Erzeugt einen täglichen Ausdruck aus 'HH:MM'."""
+        hour, minute = (int(part) for part in time_of_day.split(":"))
+        return cls(f"{minute} {hour} * * *")
+
+    def next_after(self, moment: datetime) -> datetime:
+        """Liefert den nächsten passenden Zeitpunkt strikt nach ``moment``."""
+        candidate = moment.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = candidate + timedelta(days=366 * 5)
+
+        while candidate < limit:
+            if candidate.month not in self.months:
+                candidate = (candidate.replace(day=1, hour=0, minute=0) + timedelta(days=32)).replace(day=1)
+                continue
+            if not self._matches_day(candidate):
+                candidate = candidate.replace(hour=0, minute=0) + timedelta(days=1)
+                continue
+            if candidate.hour not in self.hours:
+                candidate = candidate.replace(minute=0) + timedelta(hours=1)
+                continue
+            if candidate.minute not in self.minutes:
+                candidate += timedelta(minutes=1)
+                continue
+            return candidate
+
+        raise ValueError(f"Cron-Ausdruck '{self.expression}' trifft nie zu")
+
+    def _matches_day(self, moment: datetime) -> bool:
+        day_match = moment.day in self.days
+        # Python: Montag=0, Cron: Sonntag=0
+        weekday_match = (moment.weekday() + 1) % 7 in self.weekdays
+
+        # Wie in cron: sind Tag und Wochentag eingeschränkt, reicht einer der beiden
+        if self._day_restricted and self._weekday_restricted:
+            return day_match or weekday_match
+        return day_match and weekday_match
+
+    @staticmethod
+    def _parse_field(field: str, low: int, high: int) -> Set[int]:
+        values = set()
+        for part in field.split(","):
+            range_part, _, step_part = part.partition("/")
+            step = int(step_part) if step_part else 1
+
+            if range_part == "*":
+                start, end = low, high
+            elif "-" in range_part:
+                start, end = (int(value) for value in range_part.split("-", 1))
+            else:
+                start = int(range_part)
+                end = high if step_part else start
+
+            if start < low or end > high or start > end or step < 1:
+                raise ValueError(f"Ungültiges Cron-Feld '{field}'")
+            values.update(range(start, end + 1, step))
+        return values
+
+
+class NotionSyncScheduler:
+    """
+    Plant Synchronisationen des NotionVectorDBUpdater.
+
+    Auslöser sind ein festes Intervall, ein Cron-Ausdruck und Ereignisse (``trigger`` bzw. der
+    NotionChangeNotifier). Gleichzeitige Auslöser werden zusammengefasst; es läuft nie mehr als
+    eine Synchronisation gleichzeitig.
+    """
+
+    def __init__(
+        self,
+        updater,
+        interval_seconds: Optional[float] = None,
+        cron: Optional[str] = None,
+        debounce_seconds: float = 2.0,
+        notifier: Optional[NotionChangeNotifier] = None,
+    ):
+        self.logger = logging.getLogger(__name__)
+        self.updater = updater
+        self.interval_seconds = interval_seconds
+        self.cron = CronExpression(cron) if cron else None
+        self.debounce_seconds = debounce_seconds
+        self.notifier = notifier or NotionChangeNotifier.shared()
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._pending_pages: Set[str] = set()
+        self._pending_full_sync = False
+
+    def trigger(self, page_ids: Optional[Iterable[str]] = None):
+        """
+        Fordert eine Synchronisation an. Thread-sicher.
+
+        Args:
+            page_ids (Iterable[str], optional): Betroffene Seiten. Ohne Angabe wird ein vollständiger Sync angefordert.
+        """
+        page_ids = list(page_ids) if page_ids is not None else None
+        if self._loop is None:
+            self.logger.warning("⚠️ Scheduler läuft nicht, Auslöser wird verworfen.")
+            return
+
+        try:
+            running_loop = asyncio.get_running_loop()
+        except RuntimeError:
+            running_loop = None
+
+        if running_loop is self._loop:
+            self._enqueue(page_ids)
+        else:
+            self._loop.call_soon_threadsafe(self._enqueue, page_ids)
+
+    async def run(self):
+        """Startet die Zeitgeber und verarbeitet Auslöser, bis der Task abgebrochen wird."""
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        self.notifier.subscribe(self._on_page_changed)
+
+        timers = []
+        if self.interval_seconds:
+            timers.append(asyncio.create_task(self._run_interval_timer()))
+        if self.cron:
+            timers.append(asyncio.create_task(self._run_cron_timer()))
+
+        try:
+            await self._process_triggers()
+        except asyncio.CancelledError:
+            self.logger.warning("⚠️ Der Scheduler wurde abgebrochen.")
+        finally:
+            self.notifier.unsubscribe(self._on_page_changed)
+            for timer in timers:
+                timer.cancel()
+            self._loop = None
+
+    def _on_page_changed(self, page_id: str):
+        self.logger.info("📝 Seite %s wurde geändert, plane Update.", page_id)
+        self.trigger([page_id])
+
+    def _enqueue(self, page_ids: Optional[List[str]]):
+        if page_ids is None:
+            self._pending_full_sync = True
+        else:
+            self._pending_pages.update(page_ids)
+        self._wakeup.set()
+
+    async def _process_triggers(self):
+        while True:
+            await self._wakeup.wait()
+            # Kurz warten, damit schnell aufeinanderfolgende Auslöser zusammengefasst werden
+            await asyncio.sleep(self.debounce_seconds)
+            self._wakeup.clear()
+
+            full_sync, page_ids = self._pending_full_sync, self._pending_pages
+            self._pending_full_sync, self._pending_pages = False, set()
+
+            try:
+                if full_sync:
+                    await self.updater.update_all_pages()
+                    # Ein vollständiger Sync erfasst geänderte Einzelseiten nur, wenn sie Projektseiten sind
+                    page_ids -= set(self.updater.tracked_page_ids())
+                if page_ids:
+                    await self.updater.update_pages(sorted(page_ids))
+            except Exception as e:
+                self.logger.error("❌ Fehler beim geplanten Update: %s", e)
+
+    async def _run_interval_timer(self):
+        while True:
+            self.logger.info("⏳ Nächstes Update in %d Sekunden...", self.interval_seconds)
+            await asyncio.sleep(self.interval_seconds)
+            self.trigger()
+
+    async def _run_cron_timer(self):
+        while True:
+            next_run = self.cron.next_after(datetime.now())
+            wait_seconds = (next_run - datetime.now()).total_seconds()
+            self.logger.info("⏳ Nächstes Update um %s (in %d Sekunden)...", next_run.isoformat(timespec="minutes"), wait_seconds)
+            await asyncio.sleep(max(0.0, wait_seconds))
+            self.trigger()
@@ -1,15 +1,23 @@
 import asyncio
 import logging
-from datetime import datetime, timedelta
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
 
 from rag.chroma_db_manager import ChromaDBManager
 from tools.notion.core.notion_pages import NotionPages
 from tools.notion.notion_page_client import NotionPageClient
+from tools.notion.notion_sync_manifest import NotionSyncManifest
+from tools.notion.notion_sync_pipeline import NotionSyncPipeline
+from tools.notion.notion_sync_scheduler import CronExpression, NotionSyncScheduler
 
 class NotionVectorDBUpdater:
     def __init__(
         self, 
         update_time: str = "00:00",
+        pipeline_workers: Optional[Dict[str, int]] = None,
+        pipeline_queue_size: int = 4,
+        update_interval_seconds: Optional[float] = None,
+        update_cron: Optional[str] = None,
     ):
         logging.basicConfig(
             level=logging.INFO,
@@ -19,74 +27,107 @@ class NotionVectorDBUpdater:
 
         self.client = NotionPageClient()
         self.chroma_db = ChromaDBManager()
+        self.manifest = NotionSyncManifest()
+        self.pipeline = NotionSyncPipeline(
+            self.client,
+            self.chroma_db,
+            self.manifest,
+            workers=pipeline_workers,
+            queue_size=pipeline_queue_size
+        )
         
         self.update_time = update_time
+        self._sync_lock = asyncio.Lock()
+
+        if update_cron is None and update_interval_seconds is None:
+            update_cron = CronExpression.daily_at(update_time).expression
+        self.scheduler = NotionSyncScheduler(
+            self,
+            interval_seconds=update_interval_seconds,
+            cron=update_cron
+        )
 
     async def update_page(self, page_id: str):
         """Aktualisiert eine einzelne Notion-Seite in der Vektordatenbank."""
-        try:
-            last_edited_time = await self.client.get_page_metadata(page_id)
-            existing_docs = self.chroma_db.get_existing_page_docs(page_id)
+        await self.update_pages([page_id])
 
-            # Prüfen, ob bereits ein Eintrag existiert und sich die Seite geändert hat
-            if existing_docs and existing_docs["documents"]:
-                stored_last_edited_time = existing_docs["metadatas"][0].get("last_edited", None)
-                if stored_last_edited_time == last_edited_time:
-                    self.logger.info("✅ Keine Änderungen für Seite %s. Kein Update erforderlich.", page_id)
-                    return  
-            else:
-                self.logger.info("ℹ️ Kein bestehender Eintrag für %s gefunden. Speichere die Seite neu.", page_id)
+    async def find_changed_pages(self, page_ids: List[str]) -> Dict[str, Optional[str]]:
+        """
+        Ermittelt mit einer Notion-Suche, welche der Seiten sich seit dem letzten Sync geändert haben.
 
-            # Notion-Inhalt abrufen
-            markdown_text = await self.client.get_page_markdown_content(page_id)
+        Returns:
+            Dict[str, Optional[str]]: page_id → last_edited_time. Seiten, die noch nie synchronisiert
+            wurden, aber nicht in der Suche auftauchen, haben den Wert None.
+        """
+        tracked_pages = {page_id.replace("-", ""): page_id for page_id in page_ids}
+        changed_pages = {}
 
-            # Alte Einträge löschen
-            self.chroma_db.delete_page_docs(page_id)
+        async for found_id, last_edited_time in self.client.get_pages_edited_since(self.manifest.watermark):
+            page_id = tracked_pages.get(found_id.replace("-", ""))
+            if page_id and self.manifest.get(page_id) != last_edited_time:
+                changed_pages[page_id] = last_edited_time
 
-            # Neue Dokumente hinzufügen
-            self.chroma_db.add_page_documents(page_id, markdown_text, last_edited_time)
+        for page_id in page_ids:
+            if page_id not in changed_pages and not self.manifest.contains(page_id):
+                changed_pages[page_id] = None
 
-        except Exception as e:
-            self.logger.error("❌ Fehler beim Aktualisieren von Seite %s: %s", page_id, e)
+        return changed_pages
 
     async def update_all_pages(self):
-        """Aktualisiert alle Notion-Seiten."""
-        page_ids = NotionPages.list_all_project_pages()
-        self.logger.info("🔄 Starte Update für %d Seiten...", len(page_ids))
-        
-        for page_id in page_ids:
-            await self.update_page(page_id)
-        
-        self.logger.info("✅ Alle Seiten wurden aktualisiert.")
+        """Aktualisiert alle Notion-Seiten, die sich seit dem letzten erfolgreichen Sync geändert haben."""
+        async with self._sync_lock:
+            started_at = datetime.now(timezone.utc)
+            page_ids = self.tracked_page_ids()
 
-    async def start_scheduled_updates(self):
-        """
-        Startet tägliche Updates um Mitternacht.
-        """
-        while True:
-            wait_seconds = self._determine_time_till_midnight()
-            self.logger.info("⏳ Nächstes Update in %d Sekunden (um Mitternacht)...", wait_seconds)
+            changed_pages = await self.find_changed_pages(page_ids)
+            self.logger.info("🔄 Starte Update für %d von %d Seiten...", len(changed_pages), len(page_ids))
             
             try:
-                await asyncio.sleep(wait_seconds)
-            except asyncio.CancelledError:
-                self.logger.warning("⚠️ Der Scheduler wurde abgebrochen.")
-                break
-            except Exception as e:
-                self.logger.error("❌ Fehler beim Warten auf Mitternacht: %s", e)
+                report = await self.pipeline.run(
+                    list(changed_pages),
+                    known_edit_times={page_id: edited for page_id, edited in changed_pages.items() if edited}
+                )
+                if report.failed_pages == 0:
+                    self.manifest.mark_synced(started_at)
+            finally:
+                self.manifest.save()
             
+            self.logger.info("✅ Alle Seiten wurden aktualisiert.\n%s", report.format())
+            return report
+
+    async def update_pages(self, page_ids: List[str], force: bool = True):
+        """
+        Aktualisiert gezielt die angegebenen Seiten, ohne das Wasserzeichen zu verändern.
+
+        Gezielte Updates folgen auf Änderungsereignisse und werden daher standardmäßig erzwungen:
+        Eine zweite Änderung in derselben Minute hat denselben last_edited_time. Unveränderte
+        Chunks werden dank des Inhalts-Hashes dennoch nicht neu eingebettet.
+        """
+        async with self._sync_lock:
+            self.logger.info("🔄 Starte Update für %d geänderte Seiten...", len(page_ids))
             try:
-                self.logger.info("🌙 Es ist Mitternacht! Starte tägliches Update...")
-                await self.update_all_pages()
-            except Exception as e:
-                self.logger.error("❌ Fehler beim täglichen Update: %s", e)
-
-    def _determine_time_till_midnight(self) -> int:
-        now = datetime.now()
-        next_midnight = (now + timedelta(days=1)).replace(
-            hour=0, minute=0, second=0, microsecond=0
-        )
-        return int((next_midnight - now).total_seconds())
+                report = await self.pipeline.run(page_ids, force=force)
+            finally:
+                self.manifest.save()
+
+            self.logger.info("✅ Seiten wurden aktualisiert.\n%s", report.format())
+            return report
+
+    def tracked_page_ids(self) -> List[str]:
+        """Seiten, die bei einem vollständigen Update berücksichtigt werden."""
+        return NotionPages.list_all_project_pages()
+
+    async def start_scheduled_updates(self):
+        """
+        Startet geplante Updates: im festen Intervall, falls konfiguriert, sonst per Cron-Ausdruck
+        (standardmäßig täglich zur update_time). Zusätzlich lösen von Jarvis geschriebene Seiten
+        ein sofortiges Update der betroffenen Seite aus.
+        """
+        await self.scheduler.run()
+
+    def request_update(self, page_ids: Optional[List[str]] = None):
+        """Fordert ein Update außerhalb des Zeitplans an (thread-sicher)."""
+        self.scheduler.trigger(page_ids)
 
 async def main():
     """
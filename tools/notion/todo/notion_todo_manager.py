@@ -1,5 +1,5 @@
 import asyncio
-from tools.notion.core.abstract_notion_client import AbstractNotionClient
+from tools.notion.core.abstract_notion_client import AbstractNotionClient, NotionPaginationError
 from tools.notion.core.notion_pages import NotionPages
 
 
@@ -45,7 +45,11 @@ class NotionTodoManager(AbstractNotionClient):
 
     async def get_all_todos(self):
         """Retrieves only open TODOs (Fertig = False) and sorts them by priority."""
-        raw_todos = await self._get_raw_todos()
+        try:
+            raw_todos = await self._get_raw_todos()
+        except NotionPaginationError as e:
+            self.logger.error(f"❌ Error retrieving TODOs: {str(e)}")
+            return f"❌ TODOs konnten nicht abgerufen werden: {str(e)}"
         return self._format_todo_list(raw_todos)
 
     async def get_daily_top_tasks(self):
@@ -56,6 +60,9 @@ class NotionTodoManager(AbstractNotionClient):
 
             return self._format_todo_list(daily_top_tasks)
 
+        except NotionPaginationError as e:
+            self.logger.error(f"❌ Error retrieving TODOs: {str(e)}")
+            return f"❌ TODOs konnten nicht abgerufen werden: {str(e)}"
         except Exception as e:
             self.logger.error(f"❌ API call failed: {str(e)}")
             return f"API call failed: {str(e)}"
@@ -72,14 +79,15 @@ class NotionTodoManager(AbstractNotionClient):
             
             return sorted_todos
             
+        except NotionPaginationError:
+            # Unvollständige Listen nicht als „keine TODOs“ ausgeben
+            raise
         except Exception as e:
             self.logger.error(f"❌ API call failed: {str(e)}")
             return []
 
     async def _fetch_todos_from_notion(self):
-        response = await self._make_request("post", f"databases/{self.database_id}/query")
-        
-        return response.json().get("results", [])
+        return [item async for item in self._paginate("post", f"databases/{self.database_id}/query", strict=True)]
 
     def _process_todo_results(self, results):
         open_todos = []
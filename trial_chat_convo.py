@@ -3,7 +3,7 @@ from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain.schema import SystemMessage, HumanMessage, AIMessage
 from jarvis.core.speech_to_text.gemini_content_extractor import GeminiContentExtractor
 from jarvis.core.text_to_speech_streamer import TextToSpeechStreamer
-from jarvis.core.voice_generator import VoiceGenerator
+from jarvis.core.voice_generator import GREETING, VoiceGenerator
 
 load_dotenv()
 
@@ -24,6 +24,7 @@ system_prompt = SystemMessage(
 chat_history.append(system_prompt)
 
 print("🔵 Jarvis AI gestartet. Gib 'exit' ein, um das Gespräch zu beenden.")
+tts.speak(GREETING)
 
 while True:
     user_input = input("\n🟢 Du: ")